@@ -1,8 +1,10 @@
 from fastapi import APIRouter
-from app.api.api_v1.endpoints import users, websocket, calls, agents
+from app.api.api_v1.endpoints import users, websocket, calls, agents, campaigns, exports
 
 api_router = APIRouter()
 api_router.include_router(users.router, prefix="/users", tags=["users"])
 api_router.include_router(websocket.router, prefix="/ws", tags=["websocket"]) 
 api_router.include_router(calls.router, prefix="/calls", tags=["calls"])
-api_router.include_router(agents.router, prefix="/agents", tags=["agents"])
\ No newline at end of file
+api_router.include_router(agents.router, prefix="/agents", tags=["agents"])
+api_router.include_router(campaigns.router, prefix="/campaigns", tags=["campaigns"])
+api_router.include_router(exports.router, prefix="/exports", tags=["exports"])
@@ -1,10 +1,13 @@
-from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
-from typing import List
-from app.models.base import get_db
-from app.models.call import Agent
-from pydantic import BaseModel
-from datetime import datetime
+from fastapi import APIRouter, HTTPException, Depends, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from app.core.response_cache import ALL_AGENTS, CachedResponse, get_agent_response_cache, make_etag
+from app.db.session import get_async_db, get_read_db
+from app.repositories.agent_repository import AgentRepository
+from app.repositories.stats_repository import COUNTER_COLUMNS, StatsRepository
+from app.services.agent_config import get_agent_config_cache
+from pydantic import BaseModel, TypeAdapter
+from datetime import date, datetime, timedelta, timezone
 
 router = APIRouter()
 
@@ -29,42 +32,111 @@ class AgentResponse(BaseModel):
     class Config:
         from_attributes = True
 
+AgentList = TypeAdapter(List[AgentResponse])
+
+class AgentDayStats(BaseModel):
+    day: date | None = None
+    calls: int = 0
+    answered: int = 0
+    completed: int = 0
+    no_answer: int = 0
+    busy: int = 0
+    dropped: int = 0
+    failed: int = 0
+    talk_seconds: float = 0.0
+    ring_seconds: float = 0.0
+
+    class Config:
+        from_attributes = True
+
+class AgentStatsResponse(BaseModel):
+    agent_id: int
+    date_from: date
+    date_to: date
+    totals: AgentDayStats
+    days: List[AgentDayStats]
+
 @router.post("/", response_model=AgentResponse)
-def create_agent(agent: AgentCreate, db: Session = Depends(get_db)):
-    db_agent = Agent(
+async def create_agent(agent: AgentCreate, db: AsyncSession = Depends(get_async_db)):
+    repo = AgentRepository(db)
+    db_agent = await repo.create_agent(
         name=agent.name,
         prompt=agent.prompt,
         agent_type=agent.agent_type
     )
-    db.add(db_agent)
-    db.commit()
-    db.refresh(db_agent)
+    get_agent_response_cache().invalidate(ALL_AGENTS)
     return db_agent
 
 @router.put("/{agent_id}", response_model=AgentResponse)
-def update_agent(agent_id: int, agent: AgentUpdate, db: Session = Depends(get_db)):
-    db_agent = db.query(Agent).filter(Agent.id == agent_id).first()
+async def update_agent(agent_id: int, agent: AgentUpdate, db: AsyncSession = Depends(get_async_db)):
+    repo = AgentRepository(db)
+    db_agent = await repo.update_agent(
+        agent_id,
+        name=agent.name,
+        prompt=agent.prompt,
+        agent_type=agent.agent_type
+    )
     if not db_agent:
         raise HTTPException(status_code=404, detail="Agent not found")
-    
-    if agent.name is not None:
-        db_agent.name = agent.name
-    if agent.prompt is not None:
-        db_agent.prompt = agent.prompt
-    if agent.agent_type is not None:
-        db_agent.agent_type = agent.agent_type
-    
-    db.commit()
-    db.refresh(db_agent)
+    get_agent_config_cache().invalidate(agent_id)
+    cache = get_agent_response_cache()
+    cache.invalidate(agent_id)
+    cache.invalidate(ALL_AGENTS)
     return db_agent
 
+def agent_version(agent) -> str:
+    # The same version AgentConfig carries; changes on every update
+    return (agent.updated_at or agent.created_at).isoformat()
+
 @router.get("/", response_model=List[AgentResponse])
-def get_agents(db: Session = Depends(get_db)):
-    return db.query(Agent).all()
+async def get_agents(request: Request, db: AsyncSession = Depends(get_read_db)):
+    """List all agents. Served from the response cache, with an ETag for conditional requests."""
+    cache = get_agent_response_cache()
+    cached = cache.get(ALL_AGENTS)
+    if cached is None:
+        generation = cache.generation
+        repo = AgentRepository(db)
+        agents = await repo.get_all_agents()
+        cached = CachedResponse(
+            body=AgentList.dump_json([AgentResponse.model_validate(a) for a in agents]),
+            etag=make_etag(*(f"{a.id}@{agent_version(a)}" for a in agents)),
+        )
+        cache.set(ALL_AGENTS, cached, generation)
+    return cache.respond(request, cached)
 
 @router.get("/{agent_id}", response_model=AgentResponse)
-def get_agent(agent_id: int, db: Session = Depends(get_db)):
-    db_agent = db.query(Agent).filter(Agent.id == agent_id).first()
-    if not db_agent:
-        raise HTTPException(status_code=404, detail="Agent not found")
-    return db_agent 
\ No newline at end of file
+async def get_agent(agent_id: int, request: Request, db: AsyncSession = Depends(get_read_db)):
+    """Get an agent. Served from the response cache, with an ETag for conditional requests."""
+    cache = get_agent_response_cache()
+    cached = cache.get(agent_id)
+    if cached is None:
+        generation = cache.generation
+        repo = AgentRepository(db)
+        db_agent = await repo.get_agent(agent_id)
+        if not db_agent:
+            raise HTTPException(status_code=404, detail="Agent not found")
+        cached = CachedResponse(
+            body=AgentResponse.model_validate(db_agent).model_dump_json().encode(),
+            etag=make_etag(db_agent.id, agent_version(db_agent)),
+        )
+        cache.set(agent_id, cached, generation)
+    return cache.respond(request, cached)
+
+@router.get("/{agent_id}/stats", response_model=AgentStatsResponse)
+async def get_agent_stats(
+    agent_id: int,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Daily call counts, outcomes and talk time for an agent (UTC days, last 30 by default).
+
+    Served from the pre-aggregated daily stats, which are updated as each call ends.
+    """
+    date_to = date_to or datetime.now(timezone.utc).date()
+    date_from = date_from or date_to - timedelta(days=29)
+    if date_from > date_to:
+        raise HTTPException(status_code=400, detail="date_from is after date_to")
+    days = [AgentDayStats.model_validate(row) for row in await StatsRepository(db).get_daily(agent_id, date_from, date_to)]
+    totals = AgentDayStats(**{name: sum(getattr(d, name) for d in days) for name in COUNTER_COLUMNS})
+    return AgentStatsResponse(agent_id=agent_id, date_from=date_from, date_to=date_to, totals=totals, days=days)
@@ -1,11 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 from pydantic import BaseModel
 from datetime import datetime
+import base64
 
-from app.models.base import get_db
+from app.core.response_cache import CachedResponse, get_call_response_cache, make_etag
+from app.db.session import get_read_db
 from app.repositories.call_repository import CallRepository
+from app.repositories.search_repository import SearchRepository
 
 router = APIRouter()
 
@@ -13,6 +16,12 @@ class CallHistoryResponse(BaseModel):
     id: int
     role: str
     message: str
+    # Reply latency in seconds, on agent turns
+    eou_delay: float | None = None
+    stt_delay: float | None = None
+    llm_ttft: float | None = None
+    tts_ttfb: float | None = None
+    response_latency: float | None = None
     created_at: datetime
     
     class Config:
@@ -24,28 +33,182 @@ class CallResponse(BaseModel):
     phone_number: str
     duration: float | None
     outcome: str | None
+    answered_at: datetime | None = None
+    ended_at: datetime | None = None
+    sip_status: int | None = None
+    disconnect_reason: str | None = None
     summary: str | None
+    summary_status: str | None
     created_at: datetime
     history: List[CallHistoryResponse] | None
     
     class Config:
         from_attributes = True
 
-@router.get("/calls/", response_model=List[CallResponse])
-def get_all_calls(db: Session = Depends(get_db)):
-    """Get all calls with their summaries."""
+class CallListItem(BaseModel):
+    id: int
+    agent_id: int
+    defaulter_name: str | None
+    phone_number: str | None
+    duration: float | None
+    outcome: str | None
+    answered_at: datetime | None
+    ended_at: datetime | None
+    summary_status: str | None
+    created_at: datetime
+    summary: str | None = None
+    history: List[CallHistoryResponse] | None = None
+
+class CallPage(BaseModel):
+    items: List[CallListItem]
+    next_cursor: str | None
+
+class SearchHighlight(BaseModel):
+    source: str  # 'agent', 'defaulter', 'summary' or 'name'
+    snippet: str  # HTML-escaped, matches wrapped in <mark>
+
+class SearchHit(BaseModel):
+    call_id: int
+    agent_id: int
+    defaulter_name: str | None
+    outcome: str | None
+    created_at: datetime
+    score: float
+    matches: int
+    highlights: List[SearchHighlight]
+
+class SearchPage(BaseModel):
+    items: List[SearchHit]
+    next_offset: int | None
+
+def encode_cursor(call_id: int) -> str:
+    return base64.urlsafe_b64encode(str(call_id).encode()).decode()
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        return int(base64.urlsafe_b64decode(cursor.encode()).decode())
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+@router.get("/calls/", response_model=CallPage, response_model_exclude_unset=True)
+async def get_all_calls(
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    agent_id: Optional[int] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    outcome: Optional[str] = None,
+    include_history: bool = False,
+    include_summary: bool = False,
+    db: AsyncSession = Depends(get_read_db),
+):
+    """List calls newest first, one page at a time.
+
+    Summaries and history are left out unless requested with `include_summary`
+    and `include_history`. Pass `next_cursor` back as `cursor` to get the next page.
+    """
     repo = CallRepository(db)
-    calls = repo.get_all_calls()
-    return calls
+    calls = await repo.list_calls(
+        limit=limit + 1,
+        before_id=decode_cursor(cursor) if cursor else None,
+        agent_id=agent_id,
+        created_from=created_from,
+        created_to=created_to,
+        outcome=outcome,
+        include_history=include_history,
+        include_summary=include_summary,
+    )
+    has_more = len(calls) > limit
+    calls = calls[:limit]
+
+    items = []
+    for call in calls:
+        item = CallListItem(
+            id=call.id,
+            agent_id=call.agent_id,
+            defaulter_name=call.defaulter_name,
+            phone_number=call.phone_number,
+            duration=call.duration,
+            outcome=call.outcome,
+            answered_at=call.answered_at,
+            ended_at=call.ended_at,
+            summary_status=call.summary_status,
+            created_at=call.created_at,
+        )
+        if include_summary:
+            item.summary = call.summary
+        if include_history:
+            item.history = [CallHistoryResponse.model_validate(h) for h in call.history]
+        items.append(item)
+
+    return CallPage(
+        items=items,
+        next_cursor=encode_cursor(calls[-1].id) if has_more else None,
+    )
+
+@router.get("/search", response_model=SearchPage)
+async def search_calls(
+    q: str = Query(..., min_length=1, max_length=200),
+    agent_id: Optional[int] = None,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=10_000),
+    highlights: int = Query(3, ge=0, le=10),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Find calls whose transcript, summary or defaulter name matches `q`, best match first.
+
+    Every word must appear in the same turn, summary or name; put words in
+    double quotes to match them as a phrase, e.g. `"payment promise"`. Each
+    hit carries up to `highlights` snippets of its best matching turns. Only
+    the SEARCH_MAX_CANDIDATES most recent matching turns are ranked. Pass
+    `next_offset` back as `offset` to get the next page.
+    """
+    ranked = await SearchRepository(db).search(
+        q, limit=limit + 1, offset=offset, agent_id=agent_id, highlights=highlights
+    )
+    has_more = len(ranked) > limit
+    ranked = ranked[:limit]
+    calls = {call.id: call for call in await CallRepository(db).get_calls([row["call_id"] for row in ranked])}
+
+    items = []
+    for row in ranked:
+        call = calls.get(row["call_id"])
+        if call is None:
+            continue
+        items.append(SearchHit(
+            call_id=call.id,
+            agent_id=call.agent_id,
+            defaulter_name=call.defaulter_name,
+            outcome=call.outcome,
+            created_at=call.created_at,
+            score=row["score"],
+            matches=row["matches"],
+            highlights=row["highlights"],
+        ))
+    return SearchPage(items=items, next_offset=offset + limit if has_more else None)
 
 @router.get("/calls/{call_id}", response_model=CallResponse)
-def get_call_details(call_id: int, db: Session = Depends(get_db)):
-    """Get detailed information about a specific call including its history."""
-    repo = CallRepository(db)
-    call = repo.get_call(call_id)
-    if not call:
-        raise HTTPException(status_code=404, detail="Call not found")
-    
-    # Get call history
-    call.history = repo.get_call_history(call_id)
-    return call 
\ No newline at end of file
+async def get_call_details(call_id: int, request: Request, db: AsyncSession = Depends(get_read_db)):
+    """Get detailed information about a specific call including its history.
+
+    A call that has ended and whose summary is done (or has failed) does not
+    change again, so it is served from the response cache, with an ETag for
+    conditional requests. Finishing a call and completing or failing its
+    summary invalidate the entry.
+    """
+    cache = get_call_response_cache()
+    cached = cache.get(call_id)
+    if cached is None:
+        generation = cache.generation
+        repo = CallRepository(db)
+        call = await repo.get_call(call_id, with_history=True)
+        if not call:
+            raise HTTPException(status_code=404, detail="Call not found")
+        if call.ended_at is None or call.summary_status not in ("done", "failed"):
+            return call
+        cached = CachedResponse(
+            body=CallResponse.model_validate(call).model_dump_json().encode(),
+            etag=make_etag(call.id, (call.updated_at or call.ended_at or call.created_at).isoformat()),
+        )
+        cache.set(call_id, cached, generation)
+    return cache.respond(request, cached)
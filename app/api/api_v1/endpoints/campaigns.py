@@ -0,0 +1,187 @@
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import AsyncIterator, List, Optional
+from pydantic import BaseModel, Field, ValidationError
+from datetime import datetime
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+import codecs
+import csv
+import json
+
+from app.core.config import settings
+from app.db.session import get_async_db, get_read_db
+from app.repositories.agent_repository import AgentRepository
+from app.repositories.campaign_repository import CampaignRepository
+
+router = APIRouter()
+
+class ContactIn(BaseModel):
+    phone_number: str = Field(min_length=1, max_length=20)
+    defaulter_name: str | None = None
+
+class CampaignCreate(BaseModel):
+    name: str
+    agent_id: int
+    trunk_id: str | None = None
+    rate_per_second: float = Field(1.0, gt=0)
+    max_concurrent: int = Field(10, ge=1)
+    window_start: str = Field("09:00", pattern=r"^\d{2}:\d{2}$")
+    window_end: str = Field("20:00", pattern=r"^\d{2}:\d{2}$")
+    timezone: str = "UTC"
+    max_attempts: int = Field(3, ge=1)
+    retry_delay_seconds: int = Field(1800, ge=0)
+    retry_outcomes: List[str] = ["no-answer", "busy"]
+    contacts: List[ContactIn] = []
+
+class CampaignProgress(BaseModel):
+    total: int
+    pending: int
+    dialing: int
+    completed: int
+    failed: int
+    attempts: int
+
+class CampaignResponse(BaseModel):
+    id: int
+    name: str
+    agent_id: int
+    status: str
+    trunk_id: str | None
+    rate_per_second: float
+    max_concurrent: int
+    window_start: str
+    window_end: str
+    timezone: str
+    max_attempts: int
+    retry_delay_seconds: int
+    created_at: datetime
+    progress: CampaignProgress | None = None
+
+    class Config:
+        from_attributes = True
+
+class UploadResult(BaseModel):
+    inserted: int
+    rejected: int
+
+async def iter_lines(request: Request) -> AsyncIterator[str]:
+    """Yield decoded lines from the request body as it streams in."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in request.stream():
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+async def iter_contacts(request: Request) -> AsyncIterator[Optional[ContactIn]]:
+    """Parse a streamed CSV (with a header row) or NDJSON body; yields None for rejected rows.
+
+    CSV fields must not contain line breaks.
+    """
+    content_type = request.headers.get("content-type", "")
+    lines = iter_lines(request)
+    if "ndjson" in content_type:
+        async for line in lines:
+            if not line.strip():
+                continue
+            try:
+                yield ContactIn.model_validate(json.loads(line))
+            except (ValueError, ValidationError):
+                yield None
+        return
+
+    header = None
+    async for line in lines:
+        if not line.strip():
+            continue
+        row = next(csv.reader([line]))
+        if header is None:
+            header = [column.strip().lower() for column in row]
+            if "phone_number" not in header:
+                raise HTTPException(status_code=400, detail="CSV header must include phone_number")
+            continue
+        try:
+            yield ContactIn.model_validate(dict(zip(header, row)))
+        except ValidationError:
+            yield None
+
+@router.post("/", response_model=CampaignResponse)
+async def create_campaign(campaign: CampaignCreate, db: AsyncSession = Depends(get_async_db)):
+    """Create a campaign, optionally with its first contacts. Add more with POST /{id}/contacts."""
+    try:
+        ZoneInfo(campaign.timezone)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise HTTPException(status_code=400, detail="Unknown timezone")
+    if not await AgentRepository(db).get_agent(campaign.agent_id):
+        raise HTTPException(status_code=404, detail="Agent not found")
+
+    repo = CampaignRepository(db)
+    fields = campaign.model_dump(exclude={"contacts"})
+    fields["retry_outcomes"] = ",".join(campaign.retry_outcomes)
+    db_campaign = await repo.create_campaign(status="active", **fields)
+
+    contacts = [contact.model_dump() for contact in campaign.contacts]
+    for i in range(0, len(contacts), settings.CAMPAIGN_UPLOAD_BATCH_SIZE):
+        await repo.add_contacts(db_campaign.id, contacts[i:i + settings.CAMPAIGN_UPLOAD_BATCH_SIZE])
+    return db_campaign
+
+@router.post("/{campaign_id}/contacts", response_model=UploadResult)
+async def upload_contacts(campaign_id: int, request: Request, db: AsyncSession = Depends(get_async_db)):
+    """Stream contacts into a campaign.
+
+    Send `text/csv` with a `phone_number,defaulter_name` header, or
+    `application/x-ndjson` with one contact object per line. The body is parsed
+    and inserted in batches as it arrives, so uploads of any size use constant memory.
+    """
+    repo = CampaignRepository(db)
+    if not await repo.get_campaign(campaign_id):
+        raise HTTPException(status_code=404, detail="Campaign not found")
+
+    inserted = rejected = 0
+    batch = []
+    async for contact in iter_contacts(request):
+        if contact is None:
+            rejected += 1
+            continue
+        batch.append(contact.model_dump())
+        if len(batch) >= settings.CAMPAIGN_UPLOAD_BATCH_SIZE:
+            await repo.add_contacts(campaign_id, batch)
+            inserted += len(batch)
+            batch = []
+    await repo.add_contacts(campaign_id, batch)
+    inserted += len(batch)
+
+    # New contacts reopen a finished campaign
+    campaign = await repo.get_campaign(campaign_id)
+    if inserted and campaign.status == "completed":
+        await repo.set_status(campaign_id, "active")
+    return UploadResult(inserted=inserted, rejected=rejected)
+
+@router.get("/{campaign_id}", response_model=CampaignResponse)
+async def get_campaign(campaign_id: int, db: AsyncSession = Depends(get_read_db)):
+    """Campaign settings with progress counters."""
+    repo = CampaignRepository(db)
+    campaign = await repo.get_campaign(campaign_id)
+    if not campaign:
+        raise HTTPException(status_code=404, detail="Campaign not found")
+    response = CampaignResponse.model_validate(campaign)
+    response.progress = CampaignProgress(**await repo.get_progress(campaign_id))
+    return response
+
+@router.post("/{campaign_id}/pause", response_model=CampaignResponse)
+async def pause_campaign(campaign_id: int, db: AsyncSession = Depends(get_async_db)):
+    campaign = await CampaignRepository(db).set_status(campaign_id, "paused")
+    if not campaign:
+        raise HTTPException(status_code=404, detail="Campaign not found")
+    return campaign
+
+@router.post("/{campaign_id}/resume", response_model=CampaignResponse)
+async def resume_campaign(campaign_id: int, db: AsyncSession = Depends(get_async_db)):
+    campaign = await CampaignRepository(db).set_status(campaign_id, "active")
+    if not campaign:
+        raise HTTPException(status_code=404, detail="Campaign not found")
+    return campaign
@@ -0,0 +1,105 @@
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from typing import Optional
+from datetime import datetime, timedelta, timezone
+
+from app.core.config import settings
+from app.db.session import ReadSessionLocal
+from app.models.call import TURN_LATENCY_FIELDS, Call, CallHistory
+from app.repositories.transcript_repository import TranscriptRepository
+from app.services.export import FORMATS, parquet_available, stream_export
+
+router = APIRouter()
+
+CALL_COLUMNS = (
+    Call.id, Call.agent_id, Call.defaulter_name, Call.phone_number, Call.duration, Call.outcome,
+    Call.answered_at, Call.ended_at, Call.sip_status, Call.disconnect_reason, Call.summary,
+    Call.summary_status, Call.created_at, Call.updated_at,
+)
+
+HISTORY_COLUMNS = (
+    CallHistory.id, CallHistory.call_id, CallHistory.role, CallHistory.message,
+    *(getattr(CallHistory, name) for name in TURN_LATENCY_FIELDS),
+    CallHistory.created_at, CallHistory.updated_at,
+)
+
+FORMAT_PATTERN = "^(" + "|".join(FORMATS) + ")$"
+
+def export_window(since: Optional[datetime]) -> tuple:
+    """Bounds of an incremental export: rows with `since` < updated_at <= watermark.
+
+    The watermark trails now by EXPORT_WATERMARK_LAG so rows still being
+    committed are left for the next export instead of being skipped.
+    """
+    if since is not None:
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        # Timestamps are stored in UTC (and compared as text on SQLite)
+        since = since.astimezone(timezone.utc)
+    watermark = datetime.now(timezone.utc) - timedelta(seconds=settings.EXPORT_WATERMARK_LAG)
+    return since, watermark
+
+def export_response(statement, format: str, dataset: str, watermark: datetime, more_rows=None) -> StreamingResponse:
+    if format == "parquet" and not parquet_available():
+        raise HTTPException(status_code=400, detail="Parquet export needs pyarrow installed")
+    media_type, extension = FORMATS[format]
+    return StreamingResponse(
+        stream_export(ReadSessionLocal, statement, format=format, dataset=dataset, more_rows=more_rows),
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="{dataset}-{watermark:%Y%m%dT%H%M%SZ}.{extension}"',
+            # Pass back as `since` to get the rows added or changed after this export
+            "X-Export-Watermark": watermark.isoformat(),
+        },
+    )
+
+@router.get("/calls")
+async def export_calls(
+    format: str = Query("ndjson", pattern=FORMAT_PATTERN),
+    since: Optional[datetime] = None,
+    agent_id: Optional[int] = None,
+):
+    """Stream every call added or changed after `since`, oldest change first.
+
+    Rows are read from a server-side cursor and written out in chunks, so
+    exports of any size use the same memory. The `X-Export-Watermark` response
+    header is the `since` to use for the next incremental export.
+    """
+    since, watermark = export_window(since)
+    statement = select(*CALL_COLUMNS).where(Call.updated_at <= watermark)
+    if since is not None:
+        statement = statement.where(Call.updated_at > since)
+    if agent_id is not None:
+        statement = statement.where(Call.agent_id == agent_id)
+    statement = statement.order_by(Call.updated_at, Call.id)
+    return export_response(statement, format, "calls", watermark)
+
+@router.get("/call-history")
+async def export_call_history(
+    format: str = Query("ndjson", pattern=FORMAT_PATTERN),
+    since: Optional[datetime] = None,
+    call_id: Optional[int] = None,
+):
+    """Stream the transcript turns added or changed after `since`.
+
+    Works like the calls export; join the two on `call_id`. Turns still in
+    call_history come first, oldest change first, then those of compacted
+    transcripts, call by call. Compacting a transcript does not change its
+    turns' `updated_at`, so they are not exported again.
+    """
+    since, watermark = export_window(since)
+    statement = select(*HISTORY_COLUMNS).where(CallHistory.updated_at <= watermark)
+    if since is not None:
+        statement = statement.where(CallHistory.updated_at > since)
+    if call_id is not None:
+        statement = statement.where(CallHistory.call_id == call_id)
+    statement = statement.order_by(CallHistory.updated_at, CallHistory.id)
+
+    # Read after call_history, so a call compacted mid-export is seen in one tier or both, never neither
+    async def compacted_rows(db, chunk_size: int):
+        turns = TranscriptRepository(db).stream_turns(watermark, since, call_id=call_id, chunk_size=chunk_size)
+        async for chunk in turns:
+            yield [tuple(turn[column.key] for column in HISTORY_COLUMNS) for turn in chunk]
+
+    return export_response(statement, format, "call-history", watermark, more_rows=compacted_rows)
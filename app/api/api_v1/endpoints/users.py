@@ -1,8 +1,8 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
-from livekit import api
-from app.core.config import settings
-import json
+from app.api.deps import get_dispatch_client
+from app.services.agent_config import get_agent_config_cache
+from app.services.dispatch_client import DispatchClient
 from typing import Optional
 import uuid
 
@@ -10,35 +10,34 @@ router = APIRouter()
 
 class CallRequest(BaseModel):
     phone_number: str
-    system_prompt:str
     defaulter_name: str
     agentId: int
 
 @router.post("/start-call")
-async def start_call(req: CallRequest):
+async def start_call(req: CallRequest, dispatch: DispatchClient = Depends(get_dispatch_client)):
+    # The worker resolves the prompt from the agent id; the version lets it
+    # detect that its cached copy of the agent is out of date
+    agent = await get_agent_config_cache().get(req.agentId)
+    if agent is None:
+        raise HTTPException(status_code=404, detail="Agent not found")
+
     # Generate a unique room name
     room_name = f"call-{uuid.uuid4()}"
 
-    lkapi = api.LiveKitAPI(
-        url=settings.LIVEKIT_URL,
-        api_key=settings.LIVEKIT_API_KEY,
-        api_secret=settings.LIVEKIT_API_SECRET
-    )
-
-    await lkapi.agent_dispatch.create_dispatch(
-        api.CreateAgentDispatchRequest(
-            agent_name="groq-call-agent",
-            room=room_name,
-            metadata=json.dumps({
+    try:
+        await dispatch.create_dispatch(
+            room_name=room_name,
+            metadata={
                 "phone_number": req.phone_number,
-                "system_prompt": req.system_prompt,
                 "defaulter_name": req.defaulter_name,
-                "agentId": req.agentId
-            })
+                "agentId": req.agentId,
+                "agentVersion": agent.version,
+            }
         )
-    )
+    except RuntimeError as e:
+        # LiveKit credentials are not configured for this API
+        raise HTTPException(status_code=503, detail=f"Calls are unavailable: {e}")
 
-    await lkapi.aclose()
     return {
         "status": "Call started", 
         "phone_number": req.phone_number,
@@ -0,0 +1,80 @@
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator
+import json
+
+from app.core.config import settings
+from app.services.events import Subscription, get_event_hub
+
+router = APIRouter()
+
+# Close code for subscribers dropped for falling behind ("Try Again Later")
+SLOW_CONSUMER_CLOSE_CODE = 1013
+
+def is_call_end(topic: str, event: dict) -> bool:
+    return topic.startswith("call:") and event.get("type") == "call_state" and event.get("state") == "ended"
+
+async def stream_websocket(websocket: WebSocket, topic: str) -> None:
+    await websocket.accept()
+    subscription = get_event_hub().subscribe(topic)
+    try:
+        while True:
+            event = await subscription.get(timeout=settings.EVENTS_HEARTBEAT_INTERVAL)
+            if event is None:
+                if subscription.dropped:
+                    await websocket.close(code=SLOW_CONSUMER_CLOSE_CODE, reason="Subscriber too slow")
+                    return
+                await websocket.send_json({"type": "heartbeat"})
+                continue
+            await websocket.send_json(event)
+            if is_call_end(topic, event):
+                await websocket.close()
+                return
+    except (WebSocketDisconnect, RuntimeError):
+        # RuntimeError: the client went away between two sends
+        pass
+    finally:
+        subscription.close()
+
+async def sse_events(subscription: Subscription) -> AsyncIterator[str]:
+    try:
+        while True:
+            event = await subscription.get(timeout=settings.EVENTS_HEARTBEAT_INTERVAL)
+            if event is None:
+                if subscription.dropped:
+                    yield "event: dropped\ndata: {}\n\n"
+                    return
+                yield ": heartbeat\n\n"
+                continue
+            yield f"event: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+            if is_call_end(subscription.topic, event):
+                return
+    finally:
+        subscription.close()
+
+def stream_sse(topic: str) -> StreamingResponse:
+    return StreamingResponse(
+        sse_events(get_event_hub().subscribe(topic)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.websocket("/calls/{call_id}")
+async def call_events_websocket(websocket: WebSocket, call_id: int):
+    """Live transcript turns and state changes for one call. Closes after the call ends."""
+    await stream_websocket(websocket, f"call:{call_id}")
+
+@router.websocket("/agents/{agent_id}")
+async def agent_events_websocket(websocket: WebSocket, agent_id: int):
+    """Live events for every call handled by an agent."""
+    await stream_websocket(websocket, f"agent:{agent_id}")
+
+@router.get("/calls/{call_id}/sse")
+async def call_events_sse(call_id: int):
+    """Server-sent events version of the call stream."""
+    return stream_sse(f"call:{call_id}")
+
+@router.get("/agents/{agent_id}/sse")
+async def agent_events_sse(agent_id: int):
+    """Server-sent events version of the agent stream."""
+    return stream_sse(f"agent:{agent_id}")
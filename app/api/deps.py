@@ -0,0 +1,7 @@
+from fastapi import Request
+
+from app.services.dispatch_client import DispatchClient
+
+def get_dispatch_client(request: Request) -> DispatchClient:
+    """The process-wide dispatch client created in main.py's lifespan."""
+    return request.app.state.dispatch_client
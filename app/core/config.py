@@ -1,48 +1,193 @@
+from pydantic import AliasChoices, Field
 from pydantic_settings import BaseSettings
-from typing import Optional
-from dotenv import load_dotenv
+from typing import Dict, Optional
 import os
 
-load_dotenv()
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def to_async_url(url: str) -> str:
+    """Swap a sync SQLAlchemy URL for its asyncio driver equivalent."""
+    if url.startswith("postgresql://"):
+        return url.replace("postgresql://", "postgresql+asyncpg://", 1)
+    if url.startswith("sqlite://"):
+        return url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    return url
 
 class Settings(BaseSettings):
     PROJECT_NAME: str = "FastAPI Backend"
     API_V1_STR: str = "/api/v1"
     
+    # Logging
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"  # "json" or "text"
+    LOG_QUEUE_SIZE: int = 10000  # records buffered for the writer thread before new ones are dropped
+    LOG_TRANSCRIPT_SAMPLE_RATES: Dict[str, float] = {"DEBUG": 0.0, "INFO": 0.1}  # fraction of transcript lines kept
+
+    # Call search: how many of the most recent matching documents a query ranks
+    SEARCH_MAX_CANDIDATES: int = 10000
+
+    # Exports: rows fetched and encoded per chunk, and how far behind now the
+    # watermark is set so rows still being committed are not skipped
+    EXPORT_CHUNK_SIZE: int = 5000
+    EXPORT_WATERMARK_LAG: float = 5.0
+
+    # Run migrations when the API starts instead of with migrate.py (convenient for development)
+    MIGRATE_ON_STARTUP: bool = False
+
+    # Database: "sqlite" (default, file under app/db) or "postgres"
+    DATABASE_BACKEND: str = "sqlite"
+    SQLITE_PATH: str = os.path.join(os.path.dirname(os.path.dirname(__file__)), "db", "calls.db")
     POSTGRES_SERVER: str = "localhost"
     POSTGRES_USER: str = "postgres"
     POSTGRES_PASSWORD: str = "postgres"
     POSTGRES_DB: str = "app"
     SQLALCHEMY_DATABASE_URI: Optional[str] = None
+    # Optional read replica for analytics reads; defaults to the primary
+    SQLALCHEMY_READ_DATABASE_URI: Optional[str] = None
+
+    # Connection pool (applies to both backends)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30  # seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 1800  # seconds
+    DB_POOL_PRE_PING: bool = True
 
-    LIVEKIT_URL: str = os.getenv("LIVEKIT_URL")
-    LIVEKIT_API_KEY: str = os.getenv("LIVEKIT_API_KEY")
-    LIVEKIT_API_SECRET: str = os.getenv("LIVEKIT_API_SECRET")
-    LIVEKIT_TRUNK_ID: str = os.getenv("LIVEKIT_TRUNK_ID")
+    # SQLite pragmas
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024
+
+    LIVEKIT_URL: Optional[str] = None
+    LIVEKIT_API_KEY: Optional[str] = None
+    LIVEKIT_API_SECRET: Optional[str] = None
+    LIVEKIT_TRUNK_ID: Optional[str] = None
+    LIVEKIT_AGENT_NAME: str = "groq-call-agent"
+    # LiveKit worker scaling (worker.py)
+    WORKER_PROCESSES: int = 1  # worker processes started per host
+    WORKER_INDEX: int = 0  # set for each child process by worker.py
+    WORKER_MAX_CONCURRENT_CALLS: int = 10  # per worker process
+    WORKER_CPU_LIMIT: float = 0.8  # host CPU fraction at which a worker reports full load
+    WORKER_HTTP_PORT: int = 8081  # health check port of the first worker; the others count up from it
+    WORKER_DRAIN_TIMEOUT: int = 1800  # seconds a stopping worker waits for its calls to end (`start` mode)
+    # Pooled dispatch client used by the API
+    LIVEKIT_DISPATCH_MAX_CONNECTIONS: int = 100
+    LIVEKIT_DISPATCH_MAX_IN_FLIGHT: int = 200
+    LIVEKIT_DISPATCH_KEEPALIVE: float = 30.0  # seconds an idle connection is kept open
+    LIVEKIT_DISPATCH_TIMEOUT: float = 10.0  # seconds per dispatch request
     # Twilio Configuration
 
-    TWILIO_ACCOUNT_SID: str = os.getenv("TWILIO_ACCOUNT_SID")
-    TWILIO_AUTH_TOKEN: str = os.getenv("TWILIO_AUTH_TOKEN")
-    TWILIO_PHONE_NUMBER: str = os.getenv("TWILIO_PHONE_NUMBER")
+    TWILIO_ACCOUNT_SID: Optional[str] = None
+    TWILIO_AUTH_TOKEN: Optional[str] = None
+    TWILIO_PHONE_NUMBER: Optional[str] = None
 
     # SIP Configuration
-    TRUNK_USERNAME: str = os.getenv("TRUNK_USERNAME")
-    TRUNK_PASSWORD: str = os.getenv("TRUNK_PASSWORD")
-    TRUNK_HOST: str = os.getenv("TRUNK_HOST")
+    TRUNK_USERNAME: Optional[str] = None
+    TRUNK_PASSWORD: Optional[str] = None
+    TRUNK_HOST: Optional[str] = None
+
+    GROQ_API_KEY: Optional[str] = None
+    CARTESIA_API_KEY: Optional[str] = None
+    GEMINI_API_KEY: Optional[str] = None
+    # SAVRAM_API_KEY is the name older deployments use
+    SARVAM_API_KEY: Optional[str] = Field(
+        default=None, validation_alias=AliasChoices("SARVAM_API_KEY", "SAVRAM_API_KEY")
+    )
+
+    # Transcript writer
+    TRANSCRIPT_BATCH_SIZE: int = 50
+    TRANSCRIPT_FLUSH_INTERVAL: float = 0.5  # seconds
+    TRANSCRIPT_QUEUE_SIZE: int = 10000
+
+    # Agent configuration cache (API, campaign and LiveKit workers)
+    AGENT_CACHE_TTL: float = 60.0  # seconds; bounds staleness in processes that did not see the update
+    AGENT_CACHE_SIZE: int = 1024
+
+    # API response cache (agent reads and finished call details)
+    RESPONSE_CACHE_SIZE: int = 4096  # entries per cache, per process
+    RESPONSE_CACHE_AGENT_TTL: float = 5.0  # seconds; bounds staleness in API processes that did not see the update
+    RESPONSE_CACHE_CALL_TTL: float = 3600.0  # finished calls do not change
+    RESPONSE_CACHE_SHARED_PATH: str = ""  # SQLite file shared by the API processes on a host; empty to disable
+
+    # Live call events
+    EVENTS_BROKER: str = "socket"  # "socket" (workers -> API over a Unix socket) or "memory" (single process)
+    EVENTS_SOCKET_PATH: str = "/tmp/riverline-events.sock"  # of the first API process; the others add ".<index>"
+    API_PROCESSES: int = 1  # API processes on this host, each sent every event; set by serve.py
+    API_INDEX: int = 0  # set for each API process by serve.py
+    EVENTS_SUBSCRIBER_QUEUE_SIZE: int = 256  # events a subscriber may fall behind before it is dropped
+    EVENTS_PUBLISH_QUEUE_SIZE: int = 10000
+    EVENTS_HEARTBEAT_INTERVAL: float = 15.0  # seconds between keepalives on idle streams
 
-    GROQ_API_KEY: str = os.getenv("GROQ_API_KEY")
-    CARTESIA_API_KEY: str = os.getenv("CARTESIA_API_KEY")
-    GEMINI_API_KEY: str = os.getenv("GEMINI_API_KEY")
-    SARVAM_API_KEY: str = os.getenv("SAVRAM_API_KEY")
+    # Campaign dialing
+    CAMPAIGN_TICK_INTERVAL: float = 0.2  # seconds between scheduler passes
+    CAMPAIGN_TRUNK_MAX_CONCURRENT: int = 20  # calls in progress per SIP trunk
+    CAMPAIGN_DIALING_TIMEOUT: float = 3600.0  # seconds before an unreported dial attempt is retried
+    CAMPAIGN_UPLOAD_BATCH_SIZE: int = 1000
+
+    # Summary job queue
+    SUMMARY_BACKEND: str = "gemini"  # "gemini" or "fake"
+    SUMMARY_MODEL: str = "gemini-2.0-flash"
+    SUMMARY_FAKE_LATENCY: float = 0.0  # seconds, for the fake backend
+    SUMMARY_CONCURRENCY: int = 4
+    SUMMARY_MAX_ATTEMPTS: int = 5
+    SUMMARY_RETRY_BASE_DELAY: float = 5.0  # seconds, doubled on every attempt
+    SUMMARY_RETRY_MAX_DELAY: float = 300.0
+    SUMMARY_POLL_INTERVAL: float = 1.0
+    SUMMARY_STALE_AFTER: float = 600.0  # seconds before a 'running' job is considered abandoned
+    SUMMARY_TIMEOUT: float = 120.0  # seconds one summary attempt may take before it is retried
+    SUMMARY_CHUNK_TURNS: int = 24  # transcript turns per map-reduce window
+    SUMMARY_MAP_CONCURRENCY: int = 4
+    SUMMARY_CHUNK_CACHE_SIZE: int = 1024
+    SUMMARY_LIVE_CHUNKING: bool = True  # summarize windows while the call is running
+    SUMMARY_LIVE_DRAIN_TIMEOUT: float = 5.0
+
+    # Low-latency turn pipeline (LiveKit worker): after VOICE_SPECULATION_SILENCE of
+    # silence the user's speech is transcribed and a reply (LLM and TTS) started;
+    # it is played if the turn then ends, after VOICE_TURN_SILENCE, with that transcript
+    VOICE_LOW_LATENCY: bool = False
+    VOICE_SPECULATION_SILENCE: float = 0.25  # seconds
+    VOICE_TURN_SILENCE: float = 0.55  # seconds; the VAD's own default, so turns end as they do without the mode
+
+    # Call finalization
+    CALL_FINALIZE_TIMEOUT: float = 5.0  # seconds for the outcome and duration write when a call ends
+    CALL_SHUTDOWN_TIMEOUT: float = 30.0  # whole shutdown hook; LiveKit kills the job process after 60
+    CALL_RECONCILE_INTERVAL: float = 60.0  # seconds between reconciler sweeps
+    CALL_RECONCILE_AFTER: float = 900.0  # seconds without a transcript turn before an open call is closed
+    CALL_RECONCILE_BATCH_SIZE: int = 100
+
+    # Transcript compaction (summary worker): ended calls' call_history rows -> one compressed blob
+    TRANSCRIPT_CODEC: str = "zstd"  # "zstd" (needs the zstandard package, else gzip is used) or "gzip"
+    TRANSCRIPT_COMPACT_AFTER: float = 3600.0  # seconds after a call ends before its turns are compacted
+    TRANSCRIPT_COMPACT_INTERVAL: float = 60.0  # seconds between sweeps
+    TRANSCRIPT_COMPACT_BATCH_SIZE: int = 100  # calls per sweep
+
+    # Production runner (serve.py)
+    SUPERVISOR_STOP_TIMEOUT: float = 30.0  # seconds a non-draining process gets to exit before it is killed
+    SUPERVISOR_RESTART_DELAY: float = 1.0  # seconds before restarting a crashed process, doubled per crash
+    SUPERVISOR_MAX_RESTART_DELAY: float = 60.0
 
     @property
     def get_database_url(self) -> str:
         if self.SQLALCHEMY_DATABASE_URI:
             return self.SQLALCHEMY_DATABASE_URI
+        if self.DATABASE_BACKEND == "sqlite":
+            return f"sqlite:///{self.SQLITE_PATH}"
         return f"postgresql://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_SERVER}/{self.POSTGRES_DB}"
 
+    @property
+    def get_read_database_url(self) -> str:
+        return self.SQLALCHEMY_READ_DATABASE_URI or self.get_database_url
+
+    @property
+    def get_async_database_url(self) -> str:
+        return to_async_url(self.get_database_url)
+
+    @property
+    def get_async_read_database_url(self) -> str:
+        return to_async_url(self.get_read_database_url)
+
     class Config:
         case_sensitive = True
-        env_file = ".env"
+        # Read by pydantic-settings rather than loaded into os.environ; the
+        # project root's .env is found whatever the working directory
+        env_file = (os.path.join(ROOT_DIR, ".env"), ".env")
 
 settings = Settings() 
\ No newline at end of file
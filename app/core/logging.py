@@ -0,0 +1,173 @@
+import atexit
+import contextvars
+import copy
+import json
+import logging
+import queue
+import random
+import re
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+from app.core.metrics import LOG_RECORDS_DROPPED
+
+# Transcript lines are logged here so they can be sampled separately
+TRANSCRIPT_LOGGER = "app.transcript"
+
+# Phone numbers: "+" followed by 7-15 digits (optionally separated), or 10-15 bare digits
+PHONE_NUMBER = re.compile(r"\+\d(?:[\s\-().]?\d){6,14}|(?<![\w.])\d{10,15}(?![\w.])")
+
+_context: contextvars.ContextVar[Dict[str, Any]] = contextvars.ContextVar("log_context", default={})
+_service: Optional[str] = None
+_listener: Optional[QueueListener] = None
+
+# Libraries that install their own handlers; their records go through ours instead
+_ROUTED_LOGGERS = ("uvicorn", "uvicorn.error", "uvicorn.access")
+
+# Attributes every LogRecord has; anything else was passed with extra= or bound as context
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+
+def redact(text: str) -> str:
+    """Mask phone numbers, keeping the last four digits."""
+    def mask(match: re.Match) -> str:
+        digits = re.sub(r"\D", "", match.group())
+        return "*" * (len(digits) - 4) + digits[-4:]
+    return PHONE_NUMBER.sub(mask, text)
+
+
+def bind_log_context(**fields: Any) -> None:
+    """Attach fields (call_id, room, agent_id, ...) to every record logged from this task onwards.
+
+    Tasks created afterwards inherit them, so binding at the top of a job covers
+    the session's event handlers too.
+    """
+    _context.set({**_context.get(), **fields})
+
+
+def _install_record_factory() -> None:
+    base_factory = logging.getLogRecordFactory()
+    if getattr(base_factory, "_riverline", False):
+        return
+
+    def factory(*args, **kwargs) -> logging.LogRecord:
+        record = base_factory(*args, **kwargs)
+        record.service = _service
+        for key, value in _context.get().items():
+            setattr(record, key, value)
+        # Redact before the record leaves this process (LiveKit job processes
+        # forward records to the worker's handlers)
+        if isinstance(record.msg, str):
+            record.msg = redact(record.msg)
+        if record.args:
+            if isinstance(record.args, dict):
+                record.args = {k: redact(v) if isinstance(v, str) else v for k, v in record.args.items()}
+            else:
+                record.args = tuple(redact(a) if isinstance(a, str) else a for a in record.args)
+        return record
+
+    factory._riverline = True
+    logging.setLogRecordFactory(factory)
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps a fraction of records per level; levels without a rate are always kept."""
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = {logging.getLevelName(level.upper()): rate for level, rate in rates.items()}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        rate = self.rates.get(record.levelno)
+        return rate is None or random.random() < rate
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and value is not None:
+                entry[key] = redact(value) if isinstance(value, str) else value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)-7s %(name)s - %(message)s%(context)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        context = {k: v for k, v in record.__dict__.items() if k not in _RECORD_ATTRS and v is not None
+                   and k not in ("service", "context")}
+        record.context = f" {context}" if context else ""
+        return super().format(record)
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """Hands records to the listener thread; drops them instead of blocking when the queue is full."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge args now (they may be mutated later) but leave formatting to the listener thread
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.inc()
+
+
+def setup_logging(service: str, install_handlers: bool = True) -> None:
+    """Configure logging for this process. Safe to call more than once.
+
+    Every record gets the service name and the bound call context, and phone
+    numbers are redacted. Transcript lines are sampled per LOG_TRANSCRIPT_SAMPLE_RATES.
+    With `install_handlers`, records are written as JSON lines (or text with
+    LOG_FORMAT=text) to stdout by a background thread, so logging never blocks
+    the event loop. The LiveKit worker passes False: its CLI installs its own
+    handlers and forwards job process records to them.
+    """
+    global _service, _listener
+    _service = service
+    _install_record_factory()
+
+    transcript_logger = logging.getLogger(TRANSCRIPT_LOGGER)
+    if not any(isinstance(f, SamplingFilter) for f in transcript_logger.filters):
+        transcript_logger.addFilter(SamplingFilter(settings.LOG_TRANSCRIPT_SAMPLE_RATES))
+
+    if not install_handlers or _listener is not None:
+        return
+
+    stream = logging.StreamHandler(sys.stdout)
+    stream.setFormatter(TextFormatter() if settings.LOG_FORMAT == "text" else JsonFormatter())
+    log_queue: queue.Queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+    _listener = QueueListener(log_queue, stream, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(NonBlockingQueueHandler(log_queue))
+    root.setLevel(settings.LOG_LEVEL)
+    for name in _ROUTED_LOGGERS:
+        routed = logging.getLogger(name)
+        routed.handlers.clear()
+        routed.propagate = True
@@ -0,0 +1,206 @@
+import os
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+# The LiveKit worker runs every job in its own process. Set PROMETHEUS_MULTIPROC_DIR
+# to a shared directory so the API's /metrics endpoint aggregates all of them.
+
+TRANSCRIPT_QUEUE_DEPTH = Gauge(
+    "transcript_queue_depth",
+    "Transcript turns waiting to be written to call_history",
+    multiprocess_mode="livesum",
+)
+TRANSCRIPT_FLUSH_SECONDS = Histogram(
+    "transcript_flush_seconds",
+    "Time taken to write one batch of transcript turns",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+TRANSCRIPT_FLUSH_BATCH_SIZE = Histogram(
+    "transcript_flush_batch_size",
+    "Number of transcript turns written per batch",
+    buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500),
+)
+TRANSCRIPT_TURNS_DROPPED = Counter(
+    "transcript_turns_dropped_total",
+    "Transcript turns dropped because the queue was full or the write failed",
+)
+
+DB_POOL_CHECKOUTS = Counter(
+    "db_pool_checkouts_total",
+    "Connections checked out of the pool",
+    ["pool"],
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out",
+    "Connections currently checked out of the pool",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_WAIT_SECONDS = Histogram(
+    "db_pool_wait_seconds",
+    "Time spent waiting for a pooled connection",
+    ["pool"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0, 30.0),
+)
+
+EVENTS_PUBLISHED = Counter(
+    "call_events_published_total",
+    "Live call events received by the API's event hub",
+)
+EVENTS_DROPPED = Counter(
+    "call_events_dropped_total",
+    "Live call events a worker could not deliver to the API",
+)
+EVENTS_SUBSCRIBERS = Gauge(
+    "call_event_subscribers",
+    "Open WebSocket and SSE event subscriptions",
+    multiprocess_mode="livesum",
+)
+EVENTS_SLOW_CONSUMERS_DROPPED = Counter(
+    "call_event_slow_consumers_dropped_total",
+    "Event subscribers disconnected for falling too far behind",
+)
+AGENT_CONFIG_CACHE_LOOKUPS = Counter(
+    "agent_config_cache_lookups_total",
+    "Agent configuration lookups by cache result",
+    ["result"],
+)
+WORKER_LOAD = Gauge(
+    "worker_load",
+    "Load last reported to LiveKit by a worker process (1.0 = full)",
+    multiprocess_mode="max",
+)
+WORKER_LOOP_LAG_SECONDS = Histogram(
+    "worker_loop_lag_seconds",
+    "How late a LiveKit job process's event loop ran a periodic timer during a call",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+WORKER_JOBS_REJECTED = Counter(
+    "worker_jobs_rejected_total",
+    "Jobs a worker turned down because it was at its concurrent call limit",
+)
+VOICE_LATENCY_BUCKETS = (0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0)
+VOICE_EOU_DELAY_SECONDS = Histogram(
+    "voice_eou_delay_seconds",
+    "Time from VAD end of speech to the end of the user's turn",
+    buckets=VOICE_LATENCY_BUCKETS,
+)
+VOICE_STT_DELAY_SECONDS = Histogram(
+    "voice_stt_delay_seconds",
+    "Time from VAD end of speech to the final transcript",
+    ["model"],
+    buckets=VOICE_LATENCY_BUCKETS,
+)
+VOICE_LLM_TTFT_SECONDS = Histogram(
+    "voice_llm_ttft_seconds",
+    "LLM time to first token",
+    ["model"],
+    buckets=VOICE_LATENCY_BUCKETS,
+)
+VOICE_TTS_TTFB_SECONDS = Histogram(
+    "voice_tts_ttfb_seconds",
+    "TTS time to first audio byte",
+    ["model"],
+    buckets=VOICE_LATENCY_BUCKETS,
+)
+VOICE_RESPONSE_LATENCY_SECONDS = Histogram(
+    "voice_response_latency_seconds",
+    "Time from the user stopping speaking to the agent starting to speak",
+    ["llm", "tts"],
+    buckets=VOICE_LATENCY_BUCKETS,
+)
+VOICE_SPECULATIVE_REPLIES = Counter(
+    "voice_speculative_replies_total",
+    "Replies started before the user's turn was committed (VOICE_LOW_LATENCY), by result: "
+    "used, or discarded because the turn went on or its transcript differed",
+    ["result"],
+)
+AGENT_PREWARM_SECONDS = Histogram(
+    "agent_prewarm_seconds",
+    "Time taken to prewarm a LiveKit worker process (VAD model and provider clients)",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+CALL_ANSWER_TO_FIRST_AUDIO_SECONDS = Histogram(
+    "call_answer_to_first_agent_audio_seconds",
+    "Time from the callee answering to the agent first starting to speak",
+    ["prewarmed"],
+    buckets=(0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0, 10.0, 30.0),
+)
+
+CALL_SHUTDOWN_SECONDS = Histogram(
+    "call_shutdown_seconds",
+    "Time taken by the shutdown hook of a call, from the job ending to its slot being free",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0),
+)
+CALL_FINALIZE_STEP_FAILURES = Counter(
+    "call_finalize_step_failures_total",
+    "Shutdown hook steps that failed or ran out of time, left for the reconciler",
+    ["step", "reason"],
+)
+CALLS_RECONCILED = Counter(
+    "calls_reconciled_total",
+    "Finalization work done by the reconciler for calls whose shutdown hook did not finish",
+    ["action"],
+)
+
+PROCESS_DRAIN_SECONDS = Histogram(
+    "process_drain_seconds",
+    "Time from SIGTERM until a supervised process exited (LiveKit workers first drain their calls), "
+    "by outcome: exited, or killed after its timeout",
+    ["service", "outcome"],
+    buckets=(0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0, 900.0, 1200.0, 1800.0, 3600.0),
+)
+PROCESS_RESTARTS = Counter(
+    "process_restarts_total",
+    "Supervised processes restarted after exiting unexpectedly",
+    ["service"],
+)
+
+RESPONSE_CACHE_LOOKUPS = Counter(
+    "response_cache_lookups_total",
+    "API response cache lookups by cache and result (hit, shared_hit or miss)",
+    ["cache", "result"],
+)
+RESPONSE_NOT_MODIFIED = Counter(
+    "response_not_modified_total",
+    "Cached API responses answered with 304 Not Modified",
+    ["cache"],
+)
+
+TRANSCRIPTS_COMPACTED = Counter(
+    "transcripts_compacted_total",
+    "Ended calls whose call_history rows were compacted into one compressed transcript",
+)
+TRANSCRIPT_COMPACTION_BYTES = Counter(
+    "transcript_compaction_bytes_total",
+    "Size of compacted transcripts, before (raw) and after (compressed) compression",
+    ["stage"],
+)
+
+EXPORT_ROWS = Counter(
+    "export_rows_total",
+    "Rows streamed by the export endpoints",
+    ["dataset", "format"],
+)
+
+LOG_RECORDS_DROPPED = Counter(
+    "log_records_dropped_total",
+    "Log records dropped because the logging queue was full",
+)
+
+
+def render_latest() -> tuple[bytes, str]:
+    """Render all metrics in the Prometheus text exposition format."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
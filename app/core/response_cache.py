@@ -0,0 +1,191 @@
+import hashlib
+import logging
+import sqlite3
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Hashable, Optional
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.metrics import RESPONSE_CACHE_LOOKUPS, RESPONSE_NOT_MODIFIED
+
+if TYPE_CHECKING:
+    from starlette.requests import Request
+    from starlette.responses import Response
+
+logger = logging.getLogger(__name__)
+
+# Agent response cache key of the agent list
+ALL_AGENTS = "all"
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    body: bytes  # serialized JSON
+    etag: str
+
+
+def make_etag(*versions) -> str:
+    """A strong ETag for a response built from rows with the given versions, e.g. `id, updated_at`."""
+    digest = hashlib.blake2b("|".join(map(str, versions)).encode(), digest_size=12).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses the weak comparison, so W/ tags match too
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+class SharedResponseCache:
+    """Responses in a SQLite file, shared by every API process on the host.
+
+    Reads are single-row lookups in a local file, cheap enough to run on the
+    event loop. A lookup or write that fails, or waits on a writer for longer
+    than `timeout` seconds, is logged and treated as a miss.
+    """
+
+    # Expired rows are deleted on every this many writes
+    PURGE_EVERY = 256
+
+    def __init__(self, path: str, timeout: float = 0.05):
+        # Setup waits longer, as every API process on the host may be starting at once
+        self._db = sqlite3.connect(path, timeout=5.0, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses "
+            "(key TEXT PRIMARY KEY, etag TEXT NOT NULL, body BLOB NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._db.execute(f"PRAGMA busy_timeout = {int(timeout * 1000)}")
+        self._writes = 0
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        try:
+            row = self._db.execute(
+                "SELECT etag, body FROM responses WHERE key = ? AND expires_at > ?", (key, time.time())
+            ).fetchone()
+        except sqlite3.Error:
+            logger.warning("Shared response cache lookup failed", exc_info=True)
+            return None
+        return CachedResponse(body=row[1], etag=row[0]) if row else None
+
+    def set(self, key: str, response: CachedResponse, ttl: float) -> None:
+        now = time.time()
+        try:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, etag, body, expires_at) VALUES (?, ?, ?, ?)",
+                (key, response.etag, response.body, now + ttl),
+            )
+            self._writes += 1
+            if self._writes % self.PURGE_EVERY == 0:
+                self._db.execute("DELETE FROM responses WHERE expires_at <= ?", (now,))
+        except sqlite3.Error:
+            logger.warning("Shared response cache write failed", exc_info=True)
+
+    def invalidate(self, key: str) -> None:
+        try:
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+        except sqlite3.Error:
+            # The entry expires after its TTL instead
+            logger.warning("Shared response cache invalidation failed", exc_info=True)
+
+
+class ResponseCache:
+    """Serialized JSON responses and their ETags, in an in-process LRU with a TTL,
+    optionally in front of a SharedResponseCache.
+
+    `invalidate` clears this process's LRU and the shared file. Other processes
+    keep an invalidated entry in their LRU until its TTL runs out, so the TTL
+    bounds how stale a response that can change may be.
+    """
+
+    def __init__(self, name: str, ttl: float, max_size: int = settings.RESPONSE_CACHE_SIZE,
+                 shared: Optional[SharedResponseCache] = None):
+        self.name = name
+        self.ttl = ttl
+        self.shared = shared
+        self._local = TTLCache(max_size=max_size, ttl=ttl)
+        self._generation = 0
+
+    @property
+    def generation(self) -> int:
+        """Read before loading a response from the database and pass it to `set`, so a
+        response loaded before an invalidation is not cached after it."""
+        return self._generation
+
+    def _shared_key(self, key: Hashable) -> str:
+        return f"{self.name}:{key}"
+
+    def get(self, key: Hashable) -> Optional[CachedResponse]:
+        response = self._local.get(key)
+        if response is not None:
+            RESPONSE_CACHE_LOOKUPS.labels(cache=self.name, result="hit").inc()
+            return response
+        if self.shared is not None:
+            response = self.shared.get(self._shared_key(key))
+            if response is not None:
+                RESPONSE_CACHE_LOOKUPS.labels(cache=self.name, result="shared_hit").inc()
+                self._local.set(key, response)
+                return response
+        RESPONSE_CACHE_LOOKUPS.labels(cache=self.name, result="miss").inc()
+        return None
+
+    def set(self, key: Hashable, response: CachedResponse, generation: Optional[int] = None) -> None:
+        if generation is not None and generation != self._generation:
+            return
+        self._local.set(key, response)
+        if self.shared is not None:
+            self.shared.set(self._shared_key(key), response, self.ttl)
+
+    def invalidate(self, key: Hashable) -> None:
+        self._generation += 1
+        self._local.invalidate(key)
+        if self.shared is not None:
+            self.shared.invalidate(self._shared_key(key))
+
+    def respond(self, request: "Request", response: CachedResponse) -> "Response":
+        """The cached response, or 304 Not Modified if the request's If-None-Match has its ETag."""
+        # Imported here so the LiveKit and summary workers, which invalidate but never respond, do not load it
+        from starlette.responses import Response
+
+        # Clients may keep the response but must revalidate it before reuse
+        headers = {"ETag": response.etag, "Cache-Control": "no-cache"}
+        if etag_matches(request.headers.get("if-none-match"), response.etag):
+            RESPONSE_NOT_MODIFIED.labels(cache=self.name).inc()
+            return Response(status_code=304, headers=headers)
+        return Response(content=response.body, media_type="application/json", headers=headers)
+
+
+_shared: Optional[SharedResponseCache] = None
+_agent_cache: Optional[ResponseCache] = None
+_call_cache: Optional[ResponseCache] = None
+
+
+def get_shared_response_cache() -> Optional[SharedResponseCache]:
+    """The host's shared response cache, or None if RESPONSE_CACHE_SHARED_PATH is not set."""
+    global _shared
+    if _shared is None and settings.RESPONSE_CACHE_SHARED_PATH:
+        _shared = SharedResponseCache(settings.RESPONSE_CACHE_SHARED_PATH)
+    return _shared
+
+
+def get_agent_response_cache() -> ResponseCache:
+    """`GET /agents/` (key ALL_AGENTS) and `GET /agents/{id}` (key: the agent id)."""
+    global _agent_cache
+    if _agent_cache is None:
+        _agent_cache = ResponseCache("agents", ttl=settings.RESPONSE_CACHE_AGENT_TTL,
+                                     shared=get_shared_response_cache())
+    return _agent_cache
+
+
+def get_call_response_cache() -> ResponseCache:
+    """`GET /calls/calls/{id}` of finished calls, keyed by call id."""
+    global _call_cache
+    if _call_cache is None:
+        _call_cache = ResponseCache("calls", ttl=settings.RESPONSE_CACHE_CALL_TTL,
+                                    shared=get_shared_response_cache())
+    return _call_cache
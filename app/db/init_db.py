@@ -1,12 +1,39 @@
-from app.models.base import Base, engine
-from app.models.call import Call, CallHistory
+import logging
+import os
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect
+
+from app.db.session import create_sync_engine
+
+logger = logging.getLogger(__name__)
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Revision matching the schema that Base.metadata.create_all used to produce
+LEGACY_SCHEMA_REVISION = "0001"
+
+def get_alembic_config() -> Config:
+    config = Config(os.path.join(ROOT_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(ROOT_DIR, "migrations"))
+    config.attributes["configure_logger"] = False
+    return config
 
 def init_database():
-    """Initialize the database by creating all tables."""
-    print("Creating database tables...")
+    """Bring the database schema up to date by running Alembic migrations."""
+    logger.info("Running database migrations")
+    config = get_alembic_config()
+    engine = create_sync_engine()
     try:
-        Base.metadata.create_all(bind=engine)
-        print("✅ Database tables created successfully")
-    except Exception as e:
-        print(f"❌ Error creating database tables: {str(e)}")
-        raise e 
\ No newline at end of file
+        tables = set(inspect(engine).get_table_names())
+        if "calls" in tables and "alembic_version" not in tables:
+            # Database created by the old create_all() bootstrap: adopt it
+            command.stamp(config, LEGACY_SCHEMA_REVISION)
+        command.upgrade(config, "head")
+        logger.info("Database migrations applied")
+    except Exception:
+        logger.exception("Error running database migrations")
+        raise
+    finally:
+        engine.dispose()
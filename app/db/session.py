@@ -1,13 +1,106 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+import os
+import time
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
 from app.core.config import settings
+from app.core.metrics import DB_POOL_CHECKED_OUT, DB_POOL_CHECKOUTS, DB_POOL_WAIT_SECONDS
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long callers wait for a connection."""
+
+    pool_name = "write"
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_WAIT_SECONDS.labels(self.pool_name).observe(time.perf_counter() - started)
+
+
+def _pool_class(name: str) -> type:
+    return type(f"InstrumentedPool_{name}", (InstrumentedPool,), {"pool_name": name})
+
+
+def _set_sqlite_pragmas(engine: Engine, read_only: bool) -> None:
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.execute(f"PRAGMA mmap_size={settings.SQLITE_MMAP_SIZE}")
+        if read_only:
+            cursor.execute("PRAGMA query_only=ON")
+        cursor.close()
+
 
-engine = create_engine(settings.get_database_url)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def _track_checkouts(engine: Engine, name: str) -> None:
+    @event.listens_for(engine, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        DB_POOL_CHECKOUTS.labels(name).inc()
+        DB_POOL_CHECKED_OUT.labels(name).inc()
+
+    @event.listens_for(engine, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        DB_POOL_CHECKED_OUT.labels(name).dec()
+
+
+def create_db_engine(
+    url: str,
+    name: str = "write",
+    read_only: bool = False,
+    pool_size: int = settings.DB_POOL_SIZE,
+    max_overflow: int = settings.DB_MAX_OVERFLOW,
+) -> AsyncEngine:
+    """Build an async engine for `url` with the pool and pragma settings from Settings."""
+    is_sqlite = url.startswith("sqlite")
+    if is_sqlite:
+        os.makedirs(os.path.dirname(settings.SQLITE_PATH), exist_ok=True)
+
+    engine = create_async_engine(
+        url,
+        poolclass=_pool_class(name),
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+    )
+    if is_sqlite:
+        _set_sqlite_pragmas(engine.sync_engine, read_only)
+    elif read_only:
+        engine = engine.execution_options(postgresql_readonly=True)
+    _track_checkouts(engine.sync_engine, name)
+    return engine
+
+
+def create_sync_engine(url: str = settings.get_database_url) -> Engine:
+    """Blocking engine for schema management only (DDL, migrations)."""
+    if url.startswith("sqlite"):
+        os.makedirs(os.path.dirname(settings.SQLITE_PATH), exist_ok=True)
+        engine = create_engine(url, connect_args={"check_same_thread": False})
+        _set_sqlite_pragmas(engine, read_only=False)
+        return engine
+    return create_engine(url, pool_pre_ping=True)
+
+
+# Read-write engine for live call writes; read-only engine for API and analytics reads
+engine = create_db_engine(settings.get_async_database_url, name="write")
+read_engine = create_db_engine(settings.get_async_read_database_url, name="read", read_only=True)
+
+AsyncSessionLocal = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+ReadSessionLocal = async_sessionmaker(read_engine, autoflush=False, expire_on_commit=False)
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_read_db():
+    async with ReadSessionLocal() as db:
         yield db
-    finally:
-        db.close() 
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Float
+from sqlalchemy import Column, Integer, String, DateTime, Date, ForeignKey, Text, Float, Index, LargeBinary, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from .base import Base
@@ -23,15 +23,60 @@ class Call(Base):
     defaulter_name = Column(String(255))
     phone_number = Column(String(20))
     agent_id = Column(Integer, ForeignKey('agents.id'), nullable=False)
-    duration = Column(Float)  # Duration in seconds
-    outcome = Column(Text)  # Final outcome/summary
+    duration = Column(Float)  # Duration in seconds, from answer to disconnect
+    outcome = Column(Text)  # 'completed', 'no-answer', 'busy', 'dropped' or 'failed'; null while in progress
+    answered_at = Column(DateTime(timezone=True))
+    ended_at = Column(DateTime(timezone=True))
+    sip_status = Column(Integer)  # SIP response code when the call could not be connected
+    disconnect_reason = Column(String(50))  # why the callee left the room
     summary = Column(Text)  # AI generated summary
+    summary_status = Column(String(20))  # 'pending', 'done' or 'failed'
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Set on insert too, so exports can pick up new and changed rows by updated_at
+    updated_at = Column(DateTime(timezone=True), default=func.now(), onupdate=func.now())
     
     # Relationships
     agent = relationship("Agent", back_populates="calls")
-    history = relationship("CallHistory", back_populates="call")
+    history = relationship("CallHistory", back_populates="call", order_by="CallHistory.id")
+
+    __table_args__ = (
+        Index("ix_calls_agent_id_created_at", "agent_id", "created_at"),
+        # Serves the keyset-paginated per-agent listing, which orders by id
+        Index("ix_calls_agent_id_id", "agent_id", "id"),
+        Index("ix_calls_created_at", "created_at"),
+        Index("ix_calls_phone_number", "phone_number"),
+        Index("ix_calls_updated_at_id", "updated_at", "id"),
+        # Partial indexes for the reconciler's sweeps: calls still open, and
+        # answered calls that were never queued for a summary
+        Index("ix_calls_open_created_at", "created_at",
+              sqlite_where=text("ended_at IS NULL"), postgresql_where=text("ended_at IS NULL")),
+        Index("ix_calls_unsummarized_ended_at", "ended_at",
+              sqlite_where=text("summary_status IS NULL AND answered_at IS NOT NULL"),
+              postgresql_where=text("summary_status IS NULL AND answered_at IS NOT NULL")),
+    )
+
+# Values of Call.outcome once the call has ended
+CALL_OUTCOMES = ("completed", "no-answer", "busy", "dropped", "failed")
+
+class AgentDailyStats(Base):
+    """Per-agent, per-day call counters, updated as each call ends (days are UTC)."""
+    __tablename__ = 'agent_daily_stats'
+
+    agent_id = Column(Integer, ForeignKey('agents.id'), primary_key=True)
+    day = Column(Date, primary_key=True)
+    calls = Column(Integer, nullable=False, default=0)
+    answered = Column(Integer, nullable=False, default=0)
+    completed = Column(Integer, nullable=False, default=0)
+    no_answer = Column(Integer, nullable=False, default=0)
+    busy = Column(Integer, nullable=False, default=0)
+    dropped = Column(Integer, nullable=False, default=0)
+    failed = Column(Integer, nullable=False, default=0)
+    talk_seconds = Column(Float, nullable=False, default=0.0)  # sum of durations
+    ring_seconds = Column(Float, nullable=False, default=0.0)  # sum of dial -> answer times
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+# Latency span columns on CallHistory
+TURN_LATENCY_FIELDS = ("eou_delay", "stt_delay", "llm_ttft", "tts_ttfb", "response_latency")
 
 class CallHistory(Base):
     __tablename__ = 'call_history'
@@ -40,8 +85,70 @@ class CallHistory(Base):
     call_id = Column(Integer, ForeignKey('calls.id'))
     role = Column(String(50))  # 'defaulter' or 'agent'
     message = Column(Text)
+    # Latency of the agent's reply, in seconds (agent turns only)
+    eou_delay = Column(Float)  # VAD end of speech -> end of user turn
+    stt_delay = Column(Float)  # VAD end of speech -> final transcript
+    llm_ttft = Column(Float)  # LLM request -> first token
+    tts_ttfb = Column(Float)  # TTS request -> first audio byte
+    response_latency = Column(Float)  # user stops speaking -> agent starts speaking
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), default=func.now(), onupdate=func.now())
     
     # Relationship with call
-    call = relationship("Call", back_populates="history") 
\ No newline at end of file
+    call = relationship("Call", back_populates="history")
+
+    __table_args__ = (
+        Index("ix_call_history_call_id_created_at", "call_id", "created_at"),
+        Index("ix_call_history_updated_at_id", "updated_at", "id"),
+        # Ids of turns compacted into call_transcripts must never be handed out again
+        {"sqlite_autoincrement": True},
+    )
+
+class CallTranscript(Base):
+    """The transcript of a finished call, compacted from its call_history rows into one compressed blob.
+
+    call_history holds the turns of live and recently ended calls (the hot
+    tier); the TranscriptCompactor moves them here once the call is done with
+    them (the cold tier). Read turns through CallRepository.get_call_history,
+    which looks in both.
+    """
+    __tablename__ = 'call_transcripts'
+
+    call_id = Column(Integer, ForeignKey('calls.id'), primary_key=True)
+    codec = Column(String(10), nullable=False)  # 'zstd' or 'gzip'
+    turns = Column(Integer, nullable=False)
+    raw_size = Column(Integer, nullable=False)  # bytes before compression
+    data = Column(LargeBinary, nullable=False)
+    started_at = Column(DateTime(timezone=True), nullable=False)  # turn timestamps are offsets from this
+    # Latest updated_at of its turns, so incremental exports can skip the rest
+    turns_updated_at = Column(DateTime(timezone=True), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_call_transcripts_turns_updated_at", "turns_updated_at"),
+    )
+
+class SummaryJob(Base):
+    __tablename__ = 'summary_jobs'
+
+    id = Column(Integer, primary_key=True)
+    call_id = Column(Integer, ForeignKey('calls.id'), nullable=False, unique=True)  # one job per call
+    status = Column(String(20), nullable=False, default='pending')  # 'pending', 'running', 'done' or 'failed'
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime(timezone=True), server_default=func.now())
+    locked_at = Column(DateTime(timezone=True))
+    last_error = Column(Text)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    __table_args__ = (
+        Index("ix_summary_jobs_status_next_attempt_at", "status", "next_attempt_at"),
+    ) 
+
+class SummaryChunk(Base):
+    __tablename__ = 'summary_chunks'
+
+    # sha256 of the backend, prompt version and chunk transcript
+    content_hash = Column(String(64), primary_key=True)
+    summary = Column(Text, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,50 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Float, Text, Index
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from .base import Base
+
+class Campaign(Base):
+    __tablename__ = 'campaigns'
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String(255), nullable=False)
+    agent_id = Column(Integer, ForeignKey('agents.id'), nullable=False)
+    status = Column(String(20), nullable=False, default='active')  # 'active', 'paused' or 'completed'
+    trunk_id = Column(String(100))  # defaults to LIVEKIT_TRUNK_ID
+    rate_per_second = Column(Float, nullable=False, default=1.0)  # dispatches per second
+    max_concurrent = Column(Integer, nullable=False, default=10)  # calls in progress at once
+    window_start = Column(String(5), nullable=False, default='09:00')  # local time, HH:MM
+    window_end = Column(String(5), nullable=False, default='20:00')
+    timezone = Column(String(64), nullable=False, default='UTC')
+    max_attempts = Column(Integer, nullable=False, default=3)
+    retry_delay_seconds = Column(Integer, nullable=False, default=1800)
+    retry_outcomes = Column(String(255), nullable=False, default='no-answer,busy')  # comma separated
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    contacts = relationship("CampaignContact", back_populates="campaign")
+
+class CampaignContact(Base):
+    __tablename__ = 'campaign_contacts'
+
+    id = Column(Integer, primary_key=True)
+    campaign_id = Column(Integer, ForeignKey('campaigns.id'), nullable=False)
+    phone_number = Column(String(20), nullable=False)
+    defaulter_name = Column(String(255))
+    status = Column(String(20), nullable=False, default='pending')  # 'pending', 'dialing', 'completed' or 'failed'
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime(timezone=True), server_default=func.now())
+    dialed_at = Column(DateTime(timezone=True))
+    last_outcome = Column(String(50))
+    last_error = Column(Text)
+    call_id = Column(Integer, ForeignKey('calls.id'))
+    room_name = Column(String(100))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    campaign = relationship("Campaign", back_populates="contacts")
+
+    __table_args__ = (
+        Index("ix_campaign_contacts_campaign_id_status_next_attempt_at", "campaign_id", "status", "next_attempt_at"),
+        Index("ix_campaign_contacts_status_dialed_at", "status", "dialed_at"),
+    )
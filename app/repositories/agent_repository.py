@@ -0,0 +1,41 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from app.models.call import Agent
+
+class AgentRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create_agent(self, name: str, prompt: str, agent_type: str) -> Agent:
+        agent = Agent(
+            name=name,
+            prompt=prompt,
+            agent_type=agent_type
+        )
+        self.db.add(agent)
+        await self.db.commit()
+        await self.db.refresh(agent)
+        return agent
+
+    async def update_agent(self, agent_id: int, **fields) -> Optional[Agent]:
+        agent = await self.db.get(Agent, agent_id)
+        if agent:
+            for name, value in fields.items():
+                if value is not None:
+                    setattr(agent, name, value)
+            # Set here rather than by the database so it has sub-second precision:
+            # updated_at is the version cached agent configs are checked against
+            agent.updated_at = datetime.now(timezone.utc)
+            await self.db.commit()
+            await self.db.refresh(agent)
+        return agent
+
+    async def get_agent(self, agent_id: int) -> Optional[Agent]:
+        return await self.db.get(Agent, agent_id)
+
+    async def get_all_agents(self) -> List[Agent]:
+        result = await self.db.execute(select(Agent))
+        return list(result.scalars().all())
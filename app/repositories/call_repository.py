@@ -1,50 +1,231 @@
-from sqlalchemy.orm import Session
-from datetime import datetime
+from sqlalchemy import func, insert, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+from datetime import datetime, timezone
 from typing import List, Optional
 
+from app.core.response_cache import get_call_response_cache
 from app.models.call import Call, CallHistory
+from app.repositories.search_repository import SearchRepository
+from app.repositories.stats_repository import StatsRepository
+from app.repositories.transcript_repository import TranscriptRepository
+
+
+def _merge_tiers(hot: List[CallHistory], cold: List[CallHistory]) -> List[CallHistory]:
+    """Turns from call_history and call_transcripts, in id order. A turn compacted
+    between the two reads is in both and kept once."""
+    turns = {turn.id: turn for turn in cold}
+    turns.update((turn.id, turn) for turn in hot)
+    return [turns[turn_id] for turn_id in sorted(turns)]
+
 
 class CallRepository:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
 
-    def create_call(self, defaulter_name: str, phone_number: str, agentId: int) -> Call:
+    async def create_call(self, defaulter_name: str, phone_number: str, agentId: int) -> Call:
         call = Call(
             defaulter_name=defaulter_name,
             phone_number=phone_number,
             agent_id=agentId
         )
         self.db.add(call)
-        self.db.commit()
-        self.db.refresh(call)
+        await self.db.flush()
+        await SearchRepository(self.db).index([{"call_id": call.id, "source": "name", "body": defaulter_name}])
+        await self.db.commit()
+        await self.db.refresh(call)
         return call
 
-    def add_call_history(self, call_id: int, role: str, message: str) -> CallHistory:
+    async def add_call_history(self, call_id: int, role: str, message: str) -> CallHistory:
         history = CallHistory(
             call_id=call_id,
             role=role,
             message=message
         )
         self.db.add(history)
-        self.db.commit()
-        self.db.refresh(history)
+        await SearchRepository(self.db).index([{"call_id": call_id, "source": role, "body": message}])
+        await self.db.commit()
+        await self.db.refresh(history)
         return history
 
-    def update_call(self, call_id: int, duration: float, outcome: str, summary: str) -> Optional[Call]:
-        call = self.db.query(Call).filter(Call.id == call_id).first()
-        if call:
-            call.duration = duration
-            call.outcome = outcome
-            call.summary = summary
-            self.db.commit()
-            self.db.refresh(call)
+    async def add_call_history_bulk(self, turns: List[dict]) -> None:
+        """Insert many call history rows in a single statement and commit once.
+
+        The turns are added to the search index in the same transaction.
+        """
+        if not turns:
+            return
+        await self.db.execute(insert(CallHistory), turns)
+        await SearchRepository(self.db).index(
+            [{"call_id": turn["call_id"], "source": turn["role"], "body": turn["message"]} for turn in turns]
+        )
+        await self.db.commit()
+
+    async def finish_call(
+        self,
+        call_id: int,
+        outcome: str,
+        ended_at: datetime,
+        answered_at: Optional[datetime] = None,
+        sip_status: Optional[int] = None,
+        disconnect_reason: Optional[str] = None,
+    ) -> Optional[Call]:
+        """Record how and when a call ended and add it to the agent's daily stats.
+
+        The duration runs from answer to `ended_at`. Both writes commit together,
+        and a call that has already ended is left alone so it is counted once,
+        even when the shutdown hook and the reconciler race to finish it.
+        """
+        call = await self.db.get(Call, call_id)
+        if call is None or call.ended_at is not None:
+            return call
+        dialed_at = call.created_at
+        if dialed_at is not None and dialed_at.tzinfo is None:
+            # SQLite hands timestamps back without their zone; they are stored in UTC
+            dialed_at = dialed_at.replace(tzinfo=timezone.utc)
+
+        duration = (ended_at - answered_at).total_seconds() if answered_at else 0.0
+        ring_seconds = (answered_at or ended_at) - dialed_at if dialed_at else None
+        result = await self.db.execute(
+            update(Call)
+            .where(Call.id == call_id, Call.ended_at.is_(None))
+            .values(
+                outcome=outcome,
+                answered_at=answered_at,
+                ended_at=ended_at,
+                sip_status=sip_status,
+                disconnect_reason=disconnect_reason,
+                duration=duration,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount != 1:
+            # Finished by someone else since it was read
+            await self.db.rollback()
+            await self.db.refresh(call)
+            return call
+
+        await StatsRepository(self.db).add_call(
+            agent_id=call.agent_id,
+            day=(dialed_at or ended_at).astimezone(timezone.utc).date(),
+            outcome=outcome,
+            answered=answered_at is not None,
+            talk_seconds=duration,
+            ring_seconds=max(0.0, ring_seconds.total_seconds()) if ring_seconds else 0.0,
+        )
+        await self.db.commit()
+        # Its cached details (a call cached before it ended) are out of date
+        get_call_response_cache().invalidate(call_id)
+        await self.db.refresh(call)
+        return call
+
+    async def get_unfinished_calls(self, idle_before: datetime, limit: int) -> List[tuple]:
+        """Calls that never ended and have been quiet since before `idle_before`.
+
+        Calls that already have an outcome were finished and are left alone.
+        Returns (call id, created_at, first turn at, last turn at) rows; the turn
+        times are None for calls without a transcript.
+        """
+        first_turn = func.min(CallHistory.created_at)
+        last_turn = func.max(CallHistory.created_at)
+        result = await self.db.execute(
+            select(Call.id, Call.created_at, first_turn, last_turn)
+            .outerjoin(CallHistory, CallHistory.call_id == Call.id)
+            .where(Call.ended_at.is_(None), Call.outcome.is_(None), Call.created_at < idle_before)
+            .group_by(Call.id, Call.created_at)
+            .having(or_(last_turn.is_(None), last_turn < idle_before))
+            .order_by(Call.id)
+            .limit(limit)
+        )
+        return [tuple(row) for row in result.all()]
+
+    async def get_unsummarized_calls(self, ended_before: datetime, limit: int) -> List[int]:
+        """Answered calls that ended before `ended_before` but were never queued for a summary."""
+        result = await self.db.execute(
+            select(Call.id)
+            .where(
+                Call.summary_status.is_(None),
+                Call.answered_at.is_not(None),
+                Call.ended_at < ended_before,
+            )
+            .order_by(Call.id)
+            .limit(limit)
+        )
+        return list(result.scalars().all())
+
+    async def get_call(self, call_id: int, with_history: bool = False) -> Optional[Call]:
+        query = select(Call).where(Call.id == call_id)
+        if with_history:
+            query = query.options(selectinload(Call.history))
+        result = await self.db.execute(query)
+        call = result.scalar_one_or_none()
+        if call is not None and with_history:
+            await self._load_compacted_history([call])
         return call
 
-    def get_call(self, call_id: int) -> Optional[Call]:
-        return self.db.query(Call).filter(Call.id == call_id).first()
+    async def get_calls(self, call_ids: List[int]) -> List[Call]:
+        """Calls with the given ids, without their summaries, in no particular order."""
+        if not call_ids:
+            return []
+        result = await self.db.execute(
+            select(Call).where(Call.id.in_(call_ids)).options(defer(Call.summary))
+        )
+        return list(result.scalars().all())
+
+    async def list_calls(
+        self,
+        limit: int,
+        before_id: Optional[int] = None,
+        agent_id: Optional[int] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        outcome: Optional[str] = None,
+        include_history: bool = False,
+        include_summary: bool = False,
+    ) -> List[Call]:
+        """Return up to `limit` calls, newest first, older than `before_id` (keyset pagination)."""
+        query = select(Call)
+        if before_id is not None:
+            query = query.where(Call.id < before_id)
+        if agent_id is not None:
+            query = query.where(Call.agent_id == agent_id)
+        if created_from is not None:
+            query = query.where(Call.created_at >= created_from)
+        if created_to is not None:
+            query = query.where(Call.created_at < created_to)
+        if outcome is not None:
+            query = query.where(Call.outcome == outcome)
+        if not include_summary:
+            query = query.options(defer(Call.summary))
+        if include_history:
+            query = query.options(selectinload(Call.history))
+        query = query.order_by(Call.id.desc()).limit(limit)
+        result = await self.db.execute(query)
+        calls = list(result.scalars().all())
+        if include_history:
+            await self._load_compacted_history(calls)
+        return calls
 
-    def get_all_calls(self) -> List[Call]:
-        return self.db.query(Call).all()
+    async def _load_compacted_history(self, calls: List[Call]) -> None:
+        """Add the compacted turns of calls that have them to their call_history rows."""
+        if not calls:
+            return
+        histories = await TranscriptRepository(self.db).get_histories([call.id for call in calls])
+        for call in calls:
+            if call.id in histories:
+                # Loaded state rather than a change, so the transcript is not written back as new rows
+                set_committed_value(call, "history", _merge_tiers(call.history, histories[call.id]))
 
-    def get_call_history(self, call_id: int) -> List[CallHistory]:
-        return self.db.query(CallHistory).filter(CallHistory.call_id == call_id).all() 
\ No newline at end of file
+    async def get_call_history(self, call_id: int) -> List[CallHistory]:
+        """A call's turns in order, from call_history and, once compacted, call_transcripts.
+
+        A call can have turns in both: those written after it was compacted stay
+        in call_history until the next compaction.
+        """
+        result = await self.db.execute(
+            select(CallHistory).where(CallHistory.call_id == call_id).order_by(CallHistory.id)
+        )
+        history = list(result.scalars().all())
+        compacted = await TranscriptRepository(self.db).get_history(call_id)
+        return _merge_tiers(history, compacted) if compacted else history
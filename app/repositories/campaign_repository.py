@@ -0,0 +1,166 @@
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from app.models.call import Call
+from app.models.campaign import Campaign, CampaignContact
+
+class CampaignRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create_campaign(self, **fields) -> Campaign:
+        campaign = Campaign(**fields)
+        self.db.add(campaign)
+        await self.db.commit()
+        await self.db.refresh(campaign)
+        return campaign
+
+    async def get_campaign(self, campaign_id: int) -> Optional[Campaign]:
+        return await self.db.get(Campaign, campaign_id)
+
+    async def get_active_campaigns(self) -> List[Campaign]:
+        result = await self.db.execute(select(Campaign).where(Campaign.status == "active"))
+        return list(result.scalars().all())
+
+    async def set_status(self, campaign_id: int, status: str) -> Optional[Campaign]:
+        campaign = await self.db.get(Campaign, campaign_id)
+        if campaign:
+            campaign.status = status
+            await self.db.commit()
+            await self.db.refresh(campaign)
+        return campaign
+
+    async def add_contacts(self, campaign_id: int, contacts: List[dict]) -> None:
+        """Insert a batch of contacts in one statement."""
+        if not contacts:
+            return
+        await self.db.execute(
+            insert(CampaignContact),
+            [
+                {
+                    "campaign_id": campaign_id,
+                    "phone_number": contact["phone_number"],
+                    "defaulter_name": contact.get("defaulter_name"),
+                    "status": "pending",
+                    "attempts": 0,
+                }
+                for contact in contacts
+            ],
+        )
+        await self.db.commit()
+
+    async def get_progress(self, campaign_id: int) -> Dict[str, int]:
+        """Contact counts by status, plus the total number of dial attempts."""
+        result = await self.db.execute(
+            select(CampaignContact.status, func.count(), func.coalesce(func.sum(CampaignContact.attempts), 0))
+            .where(CampaignContact.campaign_id == campaign_id)
+            .group_by(CampaignContact.status)
+        )
+        progress = {"total": 0, "pending": 0, "dialing": 0, "completed": 0, "failed": 0, "attempts": 0}
+        for status, count, attempts in result.all():
+            progress[status] = count
+            progress["total"] += count
+            progress["attempts"] += attempts
+        return progress
+
+    async def count_dialing(self, campaign_ids: List[int]) -> int:
+        if not campaign_ids:
+            return 0
+        return await self.db.scalar(
+            select(func.count())
+            .select_from(CampaignContact)
+            .where(CampaignContact.campaign_id.in_(campaign_ids), CampaignContact.status == "dialing")
+        )
+
+    async def has_open_contacts(self, campaign_id: int) -> bool:
+        contact_id = await self.db.scalar(
+            select(CampaignContact.id)
+            .where(CampaignContact.campaign_id == campaign_id, CampaignContact.status.in_(("pending", "dialing")))
+            .limit(1)
+        )
+        return contact_id is not None
+
+    async def claim_due(self, campaign_id: int, limit: int, now: datetime) -> List[CampaignContact]:
+        """Move up to `limit` due contacts from 'pending' to 'dialing' and return them."""
+        if limit <= 0:
+            return []
+        result = await self.db.execute(
+            select(CampaignContact.id)
+            .where(
+                CampaignContact.campaign_id == campaign_id,
+                CampaignContact.status == "pending",
+                CampaignContact.next_attempt_at <= now,
+            )
+            .order_by(CampaignContact.next_attempt_at, CampaignContact.id)
+            .limit(limit)
+        )
+        claimed = []
+        for contact_id in result.scalars().all():
+            outcome = await self.db.execute(
+                update(CampaignContact)
+                .where(CampaignContact.id == contact_id, CampaignContact.status == "pending")
+                .values(status="dialing", dialed_at=now, attempts=CampaignContact.attempts + 1)
+            )
+            if outcome.rowcount == 1:
+                claimed.append(contact_id)
+        await self.db.commit()
+        if not claimed:
+            return []
+        result = await self.db.execute(select(CampaignContact).where(CampaignContact.id.in_(claimed)))
+        return list(result.scalars().all())
+
+    async def mark_dispatched(self, contact_id: int, room_name: str) -> None:
+        await self.db.execute(
+            update(CampaignContact).where(CampaignContact.id == contact_id).values(room_name=room_name)
+        )
+        await self.db.commit()
+
+    async def attach_call(self, contact_id: int, call_id: int) -> None:
+        await self.db.execute(
+            update(CampaignContact).where(CampaignContact.id == contact_id).values(call_id=call_id)
+        )
+        await self.db.commit()
+
+    async def record_outcome(self, contact_id: int, outcome: str, now: datetime, error: Optional[str] = None) -> None:
+        """Close a dial attempt: complete the contact, schedule a retry, or give up."""
+        contact = await self.db.get(CampaignContact, contact_id)
+        if contact is None or contact.status != "dialing":
+            return
+        campaign = await self.db.get(Campaign, contact.campaign_id)
+        retryable = {o.strip() for o in campaign.retry_outcomes.split(",") if o.strip()}
+
+        contact.last_outcome = outcome
+        contact.last_error = error
+        if outcome in retryable or error is not None:
+            if contact.attempts < campaign.max_attempts:
+                contact.status = "pending"
+                contact.next_attempt_at = now + timedelta(seconds=campaign.retry_delay_seconds)
+            else:
+                contact.status = "failed"
+        else:
+            contact.status = "completed"
+        await self.db.commit()
+
+    async def get_stale_dialing(self, dialed_before: datetime, limit: int = 100) -> List[int]:
+        """Contacts stuck in 'dialing' (the worker never reported back)."""
+        result = await self.db.execute(
+            select(CampaignContact.id)
+            .where(CampaignContact.status == "dialing", CampaignContact.dialed_at < dialed_before)
+            .limit(limit)
+        )
+        return list(result.scalars().all())
+
+    async def get_unreported(self, ended_before: datetime, limit: int = 100) -> List[tuple]:
+        """Contacts still 'dialing' whose call ended before `ended_before`.
+
+        Returns (contact id, call outcome) rows for outcomes the worker never reported.
+        """
+        result = await self.db.execute(
+            select(CampaignContact.id, Call.outcome)
+            .join(Call, Call.id == CampaignContact.call_id)
+            .where(CampaignContact.status == "dialing", Call.ended_at < ended_before)
+            .limit(limit)
+        )
+        return [tuple(row) for row in result.all()]
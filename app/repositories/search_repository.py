@@ -0,0 +1,172 @@
+from sqlalchemy import bindparam, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from collections import defaultdict
+from typing import Dict, List, Optional
+import html
+import re
+
+from app.core.config import settings
+
+# The call_search table (migration 0008) holds one document per indexed text: a
+# transcript turn (source 'agent' or 'defaulter'), a call summary ('summary') or
+# a defaulter name ('name'). On SQLite it is an FTS5 table ranked with bm25; on
+# Postgres it has a generated tsvector column with a GIN index.
+
+# Postgres text search configuration; must match the generated column in migration 0008
+TS_CONFIG = "english"
+
+# Highlight markers, swapped for <mark> tags once the snippet is HTML-escaped
+MARK_START = "\ue000"
+MARK_END = "\ue001"
+
+SNIPPET_WORDS = 16
+
+_PHRASE = re.compile(r'"([^"]*)"|(\S+)')
+_WORD = re.compile(r"\w+")
+
+
+def to_fts5_query(query: str) -> str:
+    """Turn a search box query into an FTS5 MATCH expression.
+
+    Quoted text is matched as a phrase and every other word must appear, the
+    same rules as Postgres' websearch_to_tsquery. Punctuation is dropped so user
+    input can never be parsed as FTS5 syntax.
+    """
+    terms = []
+    for phrase, word in _PHRASE.findall(query):
+        tokens = _WORD.findall(phrase or word)
+        if tokens:
+            terms.append('"' + " ".join(tokens) + '"')
+    return " ".join(terms)
+
+
+def render_snippet(snippet: str) -> str:
+    return html.escape(snippet).replace(MARK_START, "<mark>").replace(MARK_END, "</mark>")
+
+
+class SearchRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.postgres = db.get_bind().dialect.name == "postgresql"
+
+    async def index(self, documents: List[dict]) -> None:
+        """Add documents ({"call_id", "source", "body"}) to the index. Does not commit,
+        so they are written in the same transaction as the rows they index."""
+        documents = [doc for doc in documents if doc.get("body")]
+        if not documents:
+            return
+        await self.db.execute(
+            text("INSERT INTO call_search (call_id, source, body) VALUES (:call_id, :source, :body)"),
+            documents,
+        )
+
+    async def remove(self, call_id: int, source: str) -> None:
+        """Delete a call's documents from `source`. Does not commit."""
+        await self.db.execute(
+            text("DELETE FROM call_search WHERE call_id = :call_id AND source = :source"),
+            {"call_id": call_id, "source": source},
+        )
+
+    async def search(
+        self,
+        query: str,
+        limit: int,
+        offset: int = 0,
+        agent_id: Optional[int] = None,
+        highlights: int = 3,
+        max_candidates: int = settings.SEARCH_MAX_CANDIDATES,
+    ) -> List[dict]:
+        """Calls with a matching document, best first.
+
+        Returns [{"call_id", "score", "matches", "highlights"}]. A call's score is
+        that of its best matching document (higher is better), and `highlights`
+        holds up to that many of its best documents as {"source", "snippet"},
+        HTML-escaped with the matched words wrapped in <mark> tags.
+
+        Only the `max_candidates` most recent matching documents are ranked, so
+        a query for a word found in most calls costs the same as a rare one.
+        """
+        # The join to calls is only needed to filter by agent
+        agent_join = "JOIN calls ON calls.id = call_search.call_id" if agent_id is not None else ""
+        agent_filter = "AND calls.agent_id = :agent_id" if agent_id is not None else ""
+        if self.postgres:
+            tsquery = f"websearch_to_tsquery('{TS_CONFIG}', :query)"
+            candidates = f"""
+                SELECT call_search.id AS doc_id, call_search.call_id, ts_rank_cd(call_search.tsv, {tsquery}) AS score
+                FROM call_search {agent_join}
+                WHERE call_search.tsv @@ {tsquery} {agent_filter}
+                ORDER BY call_search.id DESC
+                LIMIT :max_candidates
+            """
+            doc_ids = "string_agg(CAST(hits.doc_id AS TEXT), ',')"
+        else:
+            query = to_fts5_query(query)
+            if not query:
+                return []
+            # bm25 ranks are negative, lower is better
+            candidates = f"""
+                SELECT call_search.rowid AS doc_id, call_search.call_id, -call_search.rank AS score
+                FROM call_search {agent_join}
+                WHERE call_search MATCH :query {agent_filter}
+                ORDER BY call_search.rowid DESC
+                LIMIT :max_candidates
+            """
+            doc_ids = "group_concat(hits.doc_id)"
+
+        params = {"query": query, "limit": limit, "offset": offset, "max_candidates": max_candidates}
+        if agent_id is not None:
+            params["agent_id"] = agent_id
+        result = await self.db.execute(
+            text(f"""
+                WITH hits AS ({candidates})
+                SELECT hits.call_id, max(hits.score) AS score, count(*) AS matches, {doc_ids} AS doc_ids
+                FROM hits
+                GROUP BY hits.call_id
+                ORDER BY score DESC, hits.call_id DESC
+                LIMIT :limit OFFSET :offset
+            """),
+            params,
+        )
+        ranked = [dict(row) for row in result.mappings().all()]
+        snippets = await self._highlights(
+            query, [int(doc_id) for row in ranked for doc_id in row.pop("doc_ids").split(",")], highlights
+        )
+        for row in ranked:
+            row["highlights"] = snippets.get(row["call_id"], [])
+        return ranked
+
+    async def _highlights(self, query: str, doc_ids: List[int], per_call: int) -> Dict[int, List[dict]]:
+        if not doc_ids or per_call <= 0:
+            return {}
+        if self.postgres:
+            statement = text(f"""
+                SELECT id, call_id, source, ts_headline('{TS_CONFIG}', body, q, :options) AS snippet
+                FROM call_search, websearch_to_tsquery('{TS_CONFIG}', :query) q
+                WHERE id IN :doc_ids
+                ORDER BY ts_rank_cd(tsv, q) DESC
+            """).bindparams(bindparam("doc_ids", expanding=True))
+            params = {
+                "query": query,
+                "doc_ids": doc_ids,
+                "options": f"StartSel={MARK_START}, StopSel={MARK_END}, "
+                           f"MaxWords={SNIPPET_WORDS}, MinWords={SNIPPET_WORDS // 2}",
+            }
+        else:
+            # FTS5 cannot look up a list of rowids within a MATCH, but it can a
+            # rowid range; the range lies inside the ranked candidates
+            statement = text("""
+                SELECT rowid, call_id, source, snippet(call_search, 0, :start, :end, '…', :words) AS snippet
+                FROM call_search
+                WHERE call_search MATCH :query AND rowid >= :first AND rowid <= :last
+                ORDER BY rank
+            """)
+            params = {"query": query, "start": MARK_START, "end": MARK_END, "words": SNIPPET_WORDS,
+                      "first": min(doc_ids), "last": max(doc_ids)}
+        result = await self.db.execute(statement, params)
+
+        wanted = set(doc_ids)
+        highlights: Dict[int, List[dict]] = defaultdict(list)
+        for doc_id, call_id, source, snippet in result.all():
+            if doc_id in wanted and len(highlights[call_id]) < per_call:
+                highlights[call_id].append({"source": source, "snippet": render_snippet(snippet)})
+        return highlights
@@ -0,0 +1,59 @@
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import date
+from typing import List
+
+from app.db.dialect import dialect_insert
+from app.models.call import AgentDailyStats
+
+# Counter column incremented for each outcome
+OUTCOME_COLUMNS = {
+    "completed": "completed",
+    "no-answer": "no_answer",
+    "busy": "busy",
+    "dropped": "dropped",
+    "failed": "failed",
+}
+
+COUNTER_COLUMNS = ("calls", "answered", *OUTCOME_COLUMNS.values(), "talk_seconds", "ring_seconds")
+
+class StatsRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def add_call(self, agent_id: int, day: date, outcome: str, answered: bool,
+                       talk_seconds: float, ring_seconds: float) -> None:
+        """Add one finished call to its agent's row for `day`. Does not commit.
+
+        A single upsert, so concurrent workers ending calls for the same agent
+        never lose an increment.
+        """
+        counters = dict.fromkeys(COUNTER_COLUMNS, 0)
+        counters.update(calls=1, answered=int(answered), talk_seconds=talk_seconds, ring_seconds=ring_seconds)
+        counters[OUTCOME_COLUMNS[outcome]] = 1
+
+        insert = dialect_insert(self.db)
+        statement = insert(AgentDailyStats).values(agent_id=agent_id, day=day, **counters)
+        await self.db.execute(
+            statement.on_conflict_do_update(
+                index_elements=[AgentDailyStats.agent_id, AgentDailyStats.day],
+                set_={
+                    **{name: getattr(AgentDailyStats, name) + getattr(statement.excluded, name)
+                       for name in COUNTER_COLUMNS},
+                    "updated_at": func.now(),
+                },
+            )
+        )
+
+    async def get_daily(self, agent_id: int, day_from: date, day_to: date) -> List[AgentDailyStats]:
+        """Rows for `agent_id` from `day_from` to `day_to` inclusive, oldest first."""
+        result = await self.db.execute(
+            select(AgentDailyStats)
+            .where(
+                AgentDailyStats.agent_id == agent_id,
+                AgentDailyStats.day >= day_from,
+                AgentDailyStats.day <= day_to,
+            )
+            .order_by(AgentDailyStats.day)
+        )
+        return list(result.scalars().all())
@@ -0,0 +1,29 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, Iterable
+
+from app.db.dialect import dialect_insert
+from app.models.call import SummaryChunk
+
+class SummaryChunkRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_many(self, content_hashes: Iterable[str]) -> Dict[str, str]:
+        hashes = list(content_hashes)
+        if not hashes:
+            return {}
+        result = await self.db.execute(
+            select(SummaryChunk.content_hash, SummaryChunk.summary)
+            .where(SummaryChunk.content_hash.in_(hashes))
+        )
+        return dict(result.all())
+
+    async def put(self, content_hash: str, summary: str) -> None:
+        insert = dialect_insert(self.db)
+        await self.db.execute(
+            insert(SummaryChunk)
+            .values(content_hash=content_hash, summary=summary)
+            .on_conflict_do_nothing(index_elements=[SummaryChunk.content_hash])
+        )
+        await self.db.commit()
@@ -0,0 +1,125 @@
+from sqlalchemy import or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
+from typing import List, Optional
+
+from app.core.response_cache import get_call_response_cache
+from app.db.dialect import dialect_insert
+from app.models.call import Call, SummaryJob
+from app.repositories.search_repository import SearchRepository
+
+class SummaryJobRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def enqueue(self, call_id: int, now: datetime) -> None:
+        """Create the summary job for a call and mark the call pending.
+
+        Idempotent: enqueueing a call that already has a job is a no-op.
+        """
+        insert = dialect_insert(self.db)
+        await self.db.execute(
+            insert(SummaryJob)
+            .values(call_id=call_id, status="pending", attempts=0, next_attempt_at=now)
+            .on_conflict_do_nothing(index_elements=[SummaryJob.call_id])
+        )
+        await self.db.execute(
+            update(Call)
+            .where(Call.id == call_id, Call.summary_status.is_(None))
+            .values(summary_status="pending")
+        )
+        await self.db.commit()
+
+    async def claim(
+        self, limit: int, now: datetime, stale_before: datetime, max_attempts: int
+    ) -> List[SummaryJob]:
+        """Claim up to `limit` due jobs for this worker.
+
+        Jobs left 'running' since before `stale_before` belong to a worker that
+        died or hung and are claimed again, which counts as another attempt;
+        those that already had `max_attempts` attempts are failed instead. Each
+        claim is a conditional UPDATE, so two workers racing for the same job
+        cannot both win it.
+        """
+        await self._fail_stale(stale_before, max_attempts)
+        result = await self.db.execute(
+            select(SummaryJob.id, SummaryJob.status, SummaryJob.locked_at)
+            .where(or_(
+                (SummaryJob.status == "pending") & (SummaryJob.next_attempt_at <= now),
+                (SummaryJob.status == "running") & (SummaryJob.locked_at < stale_before)
+                & (SummaryJob.attempts < max_attempts),
+            ))
+            .order_by(SummaryJob.next_attempt_at, SummaryJob.id)
+            .limit(limit)
+        )
+        claimed = []
+        for job_id, status, locked_at in result.all():
+            query = update(SummaryJob).where(SummaryJob.id == job_id, SummaryJob.status == status)
+            if status == "running":
+                query = query.where(SummaryJob.locked_at == locked_at)
+            outcome = await self.db.execute(
+                query.values(status="running", locked_at=now, attempts=SummaryJob.attempts + 1)
+            )
+            if outcome.rowcount == 1:
+                claimed.append(job_id)
+        await self.db.commit()
+        if not claimed:
+            return []
+        result = await self.db.execute(select(SummaryJob).where(SummaryJob.id.in_(claimed)))
+        return list(result.scalars().all())
+
+    async def _fail_stale(self, stale_before: datetime, max_attempts: int) -> None:
+        result = await self.db.execute(
+            select(SummaryJob.id, SummaryJob.call_id)
+            .where(
+                SummaryJob.status == "running",
+                SummaryJob.locked_at < stale_before,
+                SummaryJob.attempts >= max_attempts,
+            )
+        )
+        failed = []
+        for job_id, call_id in result.all():
+            outcome = await self.db.execute(
+                update(SummaryJob)
+                .where(SummaryJob.id == job_id, SummaryJob.status == "running",
+                       SummaryJob.locked_at < stale_before)
+                .values(status="failed", locked_at=None,
+                        last_error="Worker stopped responding on the last attempt")
+            )
+            if outcome.rowcount == 1:
+                await self.db.execute(update(Call).where(Call.id == call_id).values(summary_status="failed"))
+                failed.append(call_id)
+        await self.db.commit()
+        for call_id in failed:
+            get_call_response_cache().invalidate(call_id)
+
+    async def complete(self, job: SummaryJob, summary: str) -> None:
+        job.status = "done"
+        job.last_error = None
+        previous = await self.db.scalar(select(Call.summary).where(Call.id == job.call_id))
+        await self.db.execute(
+            update(Call).where(Call.id == job.call_id).values(summary=summary, summary_status="done")
+        )
+        search = SearchRepository(self.db)
+        if previous is not None:
+            # A rerun replaces the call's summary document rather than adding another
+            await search.remove(job.call_id, source="summary")
+        await search.index([{"call_id": job.call_id, "source": "summary", "body": summary}])
+        await self.db.commit()
+        get_call_response_cache().invalidate(job.call_id)
+
+    async def fail(self, job: SummaryJob, error: str, retry_at: Optional[datetime]) -> None:
+        """Record a failed attempt and schedule a retry, or give up when `retry_at` is None."""
+        job.last_error = error
+        job.locked_at = None
+        if retry_at is not None:
+            job.status = "pending"
+            job.next_attempt_at = retry_at
+        else:
+            job.status = "failed"
+            await self.db.execute(
+                update(Call).where(Call.id == job.call_id).values(summary_status="failed")
+            )
+        await self.db.commit()
+        if retry_at is None:
+            get_call_response_cache().invalidate(job.call_id)
@@ -0,0 +1,206 @@
+import gzip
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.call import TURN_LATENCY_FIELDS, Call, CallHistory, CallTranscript
+
+logger = logging.getLogger(__name__)
+
+# Layout of the JSON inside a compacted transcript, before compression:
+#   {"v": 1, "roles": ["agent", "defaulter"], "turns": [[id, role, created, updated, message, *latencies], ...]}
+# where `id` is the change from the previous turn's id, `role` an index into
+# "roles", and `created`/`updated` microseconds after the transcript's started_at.
+FORMAT_VERSION = 1
+CODECS = ("zstd", "gzip")
+ZSTD_LEVEL = 9
+
+
+def _utc(value: Optional[datetime]) -> Optional[datetime]:
+    # SQLite hands timestamps back without their zone; they are stored in UTC
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def resolve_codec(codec: str) -> str:
+    """`codec`, or gzip if it is zstd and the zstandard package is not installed."""
+    if codec not in CODECS:
+        raise ValueError(f"Unknown transcript codec {codec!r}")
+    if codec == "zstd":
+        try:
+            import zstandard  # noqa: F401
+        except ImportError:
+            logger.warning("zstandard is not installed; compacting transcripts with gzip")
+            return "gzip"
+    return codec
+
+
+def compress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        # Optional dependency, only needed for zstd transcripts
+        import zstandard
+
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return gzip.compress(data, mtime=0)
+
+
+def decompress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        import zstandard
+
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+def pack_turns(turns: Sequence[dict]) -> Tuple[bytes, datetime]:
+    """Encode call_history rows (as dicts, in id order). Returns the JSON and the started_at it is relative to."""
+    started_at = _utc(turns[0]["created_at"] or turns[0]["updated_at"])
+    roles: List[str] = []
+    packed = []
+    previous_id = 0
+    for turn in turns:
+        if turn["role"] not in roles:
+            roles.append(turn["role"])
+        packed.append([
+            turn["id"] - previous_id,
+            roles.index(turn["role"]),
+            *(None if turn[name] is None else (_utc(turn[name]) - started_at) // timedelta(microseconds=1)
+              for name in ("created_at", "updated_at")),
+            turn["message"],
+            *(turn[name] for name in TURN_LATENCY_FIELDS),
+        ])
+        previous_id = turn["id"]
+    payload = {"v": FORMAT_VERSION, "roles": roles, "turns": packed}
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode(), started_at
+
+
+def unpack_turns(transcript: CallTranscript) -> List[dict]:
+    """The turns of a compacted transcript, as call_history rows (dicts), in id order."""
+    payload = json.loads(decompress(transcript.data, transcript.codec))
+    if payload["v"] != FORMAT_VERSION:
+        raise ValueError(f"Unsupported transcript format {payload['v']} for call {transcript.call_id}")
+    started_at = _utc(transcript.started_at)
+    roles = payload["roles"]
+    turns = []
+    turn_id = 0
+    for id_delta, role, created, updated, message, *latencies in payload["turns"]:
+        turn_id += id_delta
+        turns.append({
+            "id": turn_id,
+            "call_id": transcript.call_id,
+            "role": roles[role],
+            "message": message,
+            **dict(zip(TURN_LATENCY_FIELDS, latencies)),
+            "created_at": None if created is None else started_at + timedelta(microseconds=created),
+            "updated_at": None if updated is None else started_at + timedelta(microseconds=updated),
+        })
+    return turns
+
+
+def _row(history: CallHistory) -> dict:
+    return {column.key: getattr(history, column.key) for column in CallHistory.__table__.columns}
+
+
+class TranscriptRepository:
+    """Compacted transcripts (call_transcripts), the cold tier of call_history."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_history(self, call_id: int) -> List[CallHistory]:
+        """The compacted turns of a call as (unsaved) CallHistory objects, or [] if it has none."""
+        transcript = await self.db.get(CallTranscript, call_id)
+        if transcript is None:
+            return []
+        return [CallHistory(**turn) for turn in unpack_turns(transcript)]
+
+    async def get_histories(self, call_ids: List[int]) -> Dict[int, List[CallHistory]]:
+        """Like get_history for many calls; calls without a compacted transcript are left out."""
+        result = await self.db.execute(select(CallTranscript).where(CallTranscript.call_id.in_(call_ids)))
+        return {
+            transcript.call_id: [CallHistory(**turn) for turn in unpack_turns(transcript)]
+            for transcript in result.scalars()
+        }
+
+    async def stream_turns(
+        self,
+        updated_before: datetime,
+        updated_after: Optional[datetime] = None,
+        call_id: Optional[int] = None,
+        chunk_size: int = 1000,
+    ) -> AsyncIterator[List[dict]]:
+        """Compacted turns with `updated_after` < updated_at <= `updated_before`, call by call,
+        in chunks of about `chunk_size` turns."""
+        statement = select(CallTranscript)
+        if updated_after is not None:
+            statement = statement.where(CallTranscript.turns_updated_at > updated_after)
+        if call_id is not None:
+            statement = statement.where(CallTranscript.call_id == call_id)
+        statement = statement.order_by(CallTranscript.call_id).execution_options(yield_per=100)
+
+        chunk: List[dict] = []
+        async for transcript in await self.db.stream_scalars(statement):
+            for turn in unpack_turns(transcript):
+                updated_at = turn["updated_at"]
+                if updated_at is None or updated_at > updated_before:
+                    continue
+                if updated_after is not None and updated_at <= updated_after:
+                    continue
+                chunk.append(turn)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    async def get_compactable_calls(self, ended_before: datetime, limit: int) -> List[int]:
+        """Calls that ended before `ended_before` and still have turns in call_history."""
+        result = await self.db.execute(
+            select(CallHistory.call_id)
+            .join(Call, Call.id == CallHistory.call_id)
+            .where(Call.ended_at < ended_before)
+            .group_by(CallHistory.call_id)
+            .order_by(CallHistory.call_id)
+            .limit(limit)
+        )
+        return list(result.scalars().all())
+
+    async def compact(self, call_id: int, codec: str) -> Optional[CallTranscript]:
+        """Move a call's call_history rows into its compacted transcript, in one transaction.
+
+        Turns written after the call was compacted are merged into the existing
+        transcript. Returns the transcript, or None if the call had no rows to move.
+        """
+        result = await self.db.execute(
+            select(CallHistory).where(CallHistory.call_id == call_id).order_by(CallHistory.id)
+        )
+        rows = [_row(history) for history in result.scalars()]
+        if not rows:
+            return None
+
+        transcript = await self.db.get(CallTranscript, call_id)
+        turns = rows
+        if transcript is not None:
+            turns = sorted(unpack_turns(transcript) + rows, key=lambda turn: turn["id"])
+        payload, started_at = pack_turns(turns)
+        if transcript is None:
+            transcript = CallTranscript(call_id=call_id)
+            self.db.add(transcript)
+        transcript.codec = codec
+        transcript.turns = len(turns)
+        transcript.raw_size = len(payload)
+        transcript.data = compress(payload, codec)
+        transcript.started_at = started_at
+        transcript.turns_updated_at = max(_utc(turn["updated_at"] or turn["created_at"]) for turn in turns)
+
+        # Only the rows read above: a turn written since stays for the next compaction
+        await self.db.execute(
+            delete(CallHistory).where(CallHistory.call_id == call_id, CallHistory.id <= rows[-1]["id"])
+        )
+        await self.db.commit()
+        return transcript
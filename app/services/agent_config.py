@@ -0,0 +1,73 @@
+from dataclasses import dataclass
+from typing import Optional
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.metrics import AGENT_CONFIG_CACHE_LOOKUPS
+from app.db.session import AsyncSessionLocal
+from app.models.call import Agent
+from app.repositories.agent_repository import AgentRepository
+
+
+@dataclass(frozen=True)
+class AgentConfig:
+    id: int
+    name: str
+    prompt: str
+    agent_type: str
+    version: str  # changes on every update; sent with dispatches as "agentVersion"
+
+    @classmethod
+    def from_agent(cls, agent: Agent) -> "AgentConfig":
+        return cls(
+            id=agent.id,
+            name=agent.name,
+            prompt=agent.prompt,
+            agent_type=agent.agent_type,
+            version=(agent.updated_at or agent.created_at).isoformat(),
+        )
+
+
+class AgentConfigCache:
+    """Agent settings by id, cached in-process.
+
+    Dispatches carry the agent's version, so a worker that has an older copy
+    cached reloads it instead of using a stale prompt. The process that handles
+    `PUT /agents/{id}` invalidates its own entry; other processes pick the
+    change up from the next dispatch's version or when the entry's TTL expires.
+    """
+
+    def __init__(self, ttl: float = settings.AGENT_CACHE_TTL, max_size: int = settings.AGENT_CACHE_SIZE,
+                 session_factory=AsyncSessionLocal):
+        self.session_factory = session_factory
+        self._cache = TTLCache(max_size=max_size, ttl=ttl)
+
+    async def get(self, agent_id: int, version: Optional[str] = None) -> Optional[AgentConfig]:
+        """The agent's config, or None if it does not exist. Pass `version` to reject an older cached copy."""
+        config = self._cache.get(agent_id)
+        if config is not None and (version is None or config.version == version):
+            AGENT_CONFIG_CACHE_LOOKUPS.labels(result="hit").inc()
+            return config
+
+        AGENT_CONFIG_CACHE_LOOKUPS.labels(result="miss").inc()
+        async with self.session_factory() as db:
+            agent = await AgentRepository(db).get_agent(agent_id)
+        if agent is None:
+            self._cache.invalidate(agent_id)
+            return None
+        config = AgentConfig.from_agent(agent)
+        self._cache.set(agent_id, config)
+        return config
+
+    def invalidate(self, agent_id: int) -> None:
+        self._cache.invalidate(agent_id)
+
+
+_cache: Optional[AgentConfigCache] = None
+
+
+def get_agent_config_cache() -> AgentConfigCache:
+    global _cache
+    if _cache is None:
+        _cache = AgentConfigCache()
+    return _cache
@@ -0,0 +1,139 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Optional
+
+from app.core.config import settings
+from app.core.metrics import CALL_FINALIZE_STEP_FAILURES, CALLS_RECONCILED
+from app.db.session import AsyncSessionLocal
+from app.repositories.call_repository import CallRepository
+from app.repositories.campaign_repository import CampaignRepository
+from app.repositories.summary_job_repository import SummaryJobRepository
+
+logger = logging.getLogger(__name__)
+
+# Call.disconnect_reason of calls closed by the reconciler rather than their worker
+RECONCILED_REASON = "RECONCILED"
+
+
+async def run_step(step: str, awaitable: Awaitable, timeout: float) -> bool:
+    """Await one step of a call's shutdown for at most `timeout` seconds.
+
+    A step that fails or runs out of time is logged, counted and cancelled
+    rather than raised, so the steps after it still run and the job slot is
+    freed on time. Whatever it left undone is picked up by the CallReconciler.
+    Returns whether the step finished.
+    """
+    # Out of time already: the step is cancelled unless it finishes straight away
+    timeout = max(timeout, 0.0)
+    try:
+        await asyncio.wait_for(awaitable, timeout)
+    except asyncio.TimeoutError:
+        CALL_FINALIZE_STEP_FAILURES.labels(step=step, reason="timeout").inc()
+        logger.warning("Shutdown step %s timed out after %.1fs", step, timeout)
+        return False
+    except Exception:
+        CALL_FINALIZE_STEP_FAILURES.labels(step=step, reason="error").inc()
+        logger.exception("Shutdown step %s failed", step)
+        return False
+    return True
+
+
+def _utc(value: Optional[datetime]) -> Optional[datetime]:
+    # SQLite hands timestamps back without their zone; they are stored in UTC
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+class CallReconciler:
+    """Finishes the work of shutdown hooks that never completed.
+
+    Each sweep:
+      - closes calls with no end time that have been quiet for `idle_after`
+        seconds (the job process died, or the final write failed); calls with a
+        transcript become 'dropped', from first to last turn, the rest 'failed'
+      - queues summaries for answered calls that ended without one
+      - reports the outcome of ended calls to their campaign contact
+
+    Every step is idempotent, so several reconcilers (one per summary worker)
+    and late shutdown hooks can overlap safely.
+    """
+
+    def __init__(
+        self,
+        interval: float = settings.CALL_RECONCILE_INTERVAL,
+        idle_after: float = settings.CALL_RECONCILE_AFTER,
+        grace: float = settings.CALL_SHUTDOWN_TIMEOUT,
+        batch_size: int = settings.CALL_RECONCILE_BATCH_SIZE,
+        session_factory=AsyncSessionLocal,
+    ):
+        self.interval = interval
+        self.idle_after = idle_after
+        # Time a shutdown hook is given to finish its own work before the reconciler steps in
+        self.grace = grace
+        self.batch_size = batch_size
+        self.session_factory = session_factory
+        self._stopping = asyncio.Event()
+
+    async def run(self) -> None:
+        """Sweep every `interval` seconds until `stop()` is called."""
+        while not self._stopping.is_set():
+            try:
+                await self.run_once()
+            except Exception:
+                logger.exception("Call reconciler sweep failed")
+            try:
+                await asyncio.wait_for(self._stopping.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def stop(self) -> None:
+        self._stopping.set()
+
+    async def run_once(self, now: Optional[datetime] = None) -> dict:
+        """Run one sweep. Returns the number of calls handled by each action."""
+        now = now or datetime.now(timezone.utc)
+        done = {
+            "finalized": await self._finalize_abandoned(now - timedelta(seconds=self.idle_after)),
+            "summary_enqueued": await self._enqueue_summaries(now - timedelta(seconds=self.grace)),
+            "campaign_reported": await self._report_campaign_outcomes(now - timedelta(seconds=self.grace)),
+        }
+        for action, count in done.items():
+            if count:
+                CALLS_RECONCILED.labels(action=action).inc(count)
+                logger.info("Reconciler %s %d calls", action.replace("_", " "), count)
+        return done
+
+    async def _finalize_abandoned(self, idle_before: datetime) -> int:
+        async with self.session_factory() as db:
+            repo = CallRepository(db)
+            calls = await repo.get_unfinished_calls(idle_before, limit=self.batch_size)
+            for call_id, created_at, first_turn, last_turn in calls:
+                # The first turn is the agent's greeting, shortly after the answer
+                answered_at = _utc(first_turn)
+                await repo.finish_call(
+                    call_id,
+                    outcome="dropped" if answered_at else "failed",
+                    answered_at=answered_at,
+                    ended_at=_utc(last_turn or created_at),
+                    disconnect_reason=RECONCILED_REASON,
+                )
+                logger.warning("Closed call %s, which was never finalized", call_id)
+        return len(calls)
+
+    async def _enqueue_summaries(self, ended_before: datetime) -> int:
+        async with self.session_factory() as db:
+            call_ids = await CallRepository(db).get_unsummarized_calls(ended_before, limit=self.batch_size)
+            repo = SummaryJobRepository(db)
+            for call_id in call_ids:
+                await repo.enqueue(call_id, now=datetime.now(timezone.utc))
+        return len(call_ids)
+
+    async def _report_campaign_outcomes(self, ended_before: datetime) -> int:
+        async with self.session_factory() as db:
+            repo = CampaignRepository(db)
+            contacts = await repo.get_unreported(ended_before, limit=self.batch_size)
+            for contact_id, outcome in contacts:
+                await repo.record_outcome(contact_id, outcome=outcome, now=datetime.now(timezone.utc))
+        return len(contacts)
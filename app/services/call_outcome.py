@@ -0,0 +1,58 @@
+from typing import Optional, Tuple
+
+from livekit import rtc
+from livekit.api import TwirpError
+
+# SIP responses to the INVITE that mean nobody picked up
+NO_ANSWER_SIP_CODES = {408, 480, 487}  # request timeout, temporarily unavailable, request terminated
+# ... and that mean the callee (or their network) turned the call down
+BUSY_SIP_CODES = {486, 600, 603}  # busy here, busy everywhere, decline
+
+# Callee disconnect reasons that end an answered call abnormally
+DROPPED_REASONS = {
+    rtc.DisconnectReason.SIP_TRUNK_FAILURE,
+    rtc.DisconnectReason.CONNECTION_TIMEOUT,
+    rtc.DisconnectReason.MEDIA_FAILURE,
+    rtc.DisconnectReason.SIGNAL_CLOSE,
+    rtc.DisconnectReason.STATE_MISMATCH,
+    rtc.DisconnectReason.JOIN_FAILURE,
+    rtc.DisconnectReason.AGENT_ERROR,
+}
+
+
+def sip_status_code(error: Exception) -> Optional[int]:
+    """SIP response code carried by a failed CreateSIPParticipant request, if any."""
+    if not isinstance(error, TwirpError):
+        return None
+    try:
+        return int(error.metadata.get("sip_status_code", ""))
+    except ValueError:
+        return None
+
+
+def classify_dial_failure(error: Exception) -> Tuple[str, Optional[int]]:
+    """Outcome ('no-answer', 'busy' or 'failed') and SIP code of a call that was never answered."""
+    status = sip_status_code(error)
+    if status in NO_ANSWER_SIP_CODES:
+        return "no-answer", status
+    if status in BUSY_SIP_CODES:
+        return "busy", status
+    return "failed", status
+
+
+def disconnect_reason_name(reason: Optional[int]) -> Optional[str]:
+    if reason is None:
+        return None
+    try:
+        return rtc.DisconnectReason.Name(reason)
+    except ValueError:
+        return str(reason)
+
+
+def classify_disconnect(reason: Optional[int]) -> str:
+    """Outcome of an answered call from the callee's disconnect reason.
+
+    `None` means the callee was still in the room when the job ended, i.e. the
+    agent hung up.
+    """
+    return "dropped" if reason in DROPPED_REASONS else "completed"
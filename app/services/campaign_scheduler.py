@@ -0,0 +1,169 @@
+import asyncio
+import logging
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, time as dtime, timedelta, timezone
+from typing import Dict, List
+from zoneinfo import ZoneInfo
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models.campaign import Campaign, CampaignContact
+from app.repositories.campaign_repository import CampaignRepository
+from app.services.agent_config import AgentConfig, get_agent_config_cache
+from app.services.dispatch_client import DispatchClient
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Token bucket refilled at `rate` tokens per second, holding at most `capacity`."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def give_back(self, tokens: int) -> None:
+        self.tokens = min(self.capacity, self.tokens + tokens)
+
+    def take(self, wanted: int) -> int:
+        """Take up to `wanted` whole tokens without waiting; returns how many were taken."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        taken = min(wanted, int(self.tokens))
+        self.tokens -= taken
+        return taken
+
+
+def in_call_window(campaign: Campaign, now: datetime) -> bool:
+    """Whether `now` falls inside the campaign's local calling window.
+
+    The window may span midnight; equal start and end times mean all day.
+    """
+    local = now.astimezone(ZoneInfo(campaign.timezone)).time()
+    start = dtime.fromisoformat(campaign.window_start)
+    end = dtime.fromisoformat(campaign.window_end)
+    if start == end:
+        return True
+    if start < end:
+        return start <= local < end
+    return local >= start or local < end
+
+
+class CampaignScheduler:
+    """Dispatches campaign contacts to the LiveKit worker.
+
+    Every tick, for each active campaign inside its calling window, it claims as
+    many due contacts as the campaign's token bucket, the campaign's
+    `max_concurrent` and the per-trunk concurrency cap allow, and dispatches them.
+    Contacts are claimed with a conditional UPDATE, so running more than one
+    scheduler cannot dial a contact twice (but each applies its own rate limit).
+    """
+
+    def __init__(
+        self,
+        dispatch_client: DispatchClient,
+        tick_interval: float = settings.CAMPAIGN_TICK_INTERVAL,
+        trunk_max_concurrent: int = settings.CAMPAIGN_TRUNK_MAX_CONCURRENT,
+        dialing_timeout: float = settings.CAMPAIGN_DIALING_TIMEOUT,
+        session_factory=AsyncSessionLocal,
+    ):
+        self.dispatch_client = dispatch_client
+        self.tick_interval = tick_interval
+        self.trunk_max_concurrent = trunk_max_concurrent
+        self.dialing_timeout = dialing_timeout
+        self.session_factory = session_factory
+        self._buckets: Dict[int, TokenBucket] = {}
+        self._stopping = asyncio.Event()
+
+    def stop(self) -> None:
+        self._stopping.set()
+
+    async def run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                await self.tick()
+            except Exception:
+                logger.exception("Campaign scheduler tick failed")
+            try:
+                await asyncio.wait_for(self._stopping.wait(), self.tick_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def _bucket(self, campaign: Campaign) -> TokenBucket:
+        bucket = self._buckets.get(campaign.id)
+        if bucket is None or bucket.rate != campaign.rate_per_second:
+            # Allow at most one second's worth of burst
+            bucket = TokenBucket(campaign.rate_per_second, max(1.0, campaign.rate_per_second))
+            self._buckets[campaign.id] = bucket
+        return bucket
+
+    async def tick(self) -> None:
+        now = datetime.now(timezone.utc)
+        async with self.session_factory() as db:
+            repo = CampaignRepository(db)
+            await self._expire_stale_dialing(repo, now)
+            campaigns = await repo.get_active_campaigns()
+
+            by_trunk: Dict[str, List[Campaign]] = defaultdict(list)
+            for campaign in campaigns:
+                by_trunk[campaign.trunk_id or settings.LIVEKIT_TRUNK_ID].append(campaign)
+
+            dispatches = []
+            for trunk_id, trunk_campaigns in by_trunk.items():
+                trunk_free = self.trunk_max_concurrent - await repo.count_dialing([c.id for c in trunk_campaigns])
+                for campaign in trunk_campaigns:
+                    if trunk_free <= 0:
+                        break
+                    if not in_call_window(campaign, now):
+                        continue
+                    campaign_free = campaign.max_concurrent - await repo.count_dialing([campaign.id])
+                    wanted = min(trunk_free, campaign_free)
+                    if wanted <= 0:
+                        continue
+                    bucket = self._bucket(campaign)
+                    tokens = bucket.take(wanted)
+                    contacts = await repo.claim_due(campaign.id, tokens, now)
+                    bucket.give_back(tokens - len(contacts))
+                    if not contacts:
+                        if not await repo.has_open_contacts(campaign.id):
+                            await repo.set_status(campaign.id, "completed")
+                        continue
+                    trunk_free -= len(contacts)
+                    agent = await get_agent_config_cache().get(campaign.agent_id)
+                    dispatches.extend(self._dispatch(campaign, agent, contact, trunk_id) for contact in contacts)
+
+        await asyncio.gather(*dispatches)
+
+    async def _dispatch(self, campaign: Campaign, agent: AgentConfig, contact: CampaignContact, trunk_id: str) -> None:
+        room_name = f"call-{uuid.uuid4()}"
+        try:
+            await self.dispatch_client.create_dispatch(
+                room_name=room_name,
+                metadata={
+                    "phone_number": contact.phone_number,
+                    "defaulter_name": contact.defaulter_name or "Unknown",
+                    "agentId": campaign.agent_id,
+                    "agentVersion": agent.version,
+                    "trunkId": trunk_id,
+                    "campaignContactId": contact.id,
+                },
+            )
+        except Exception as e:
+            logger.warning("Dispatch for campaign contact %s failed: %s", contact.id, e)
+            async with self.session_factory() as db:
+                await CampaignRepository(db).record_outcome(
+                    contact.id, outcome="dispatch-failed", now=datetime.now(timezone.utc), error=str(e)[:2000]
+                )
+            return
+        async with self.session_factory() as db:
+            await CampaignRepository(db).mark_dispatched(contact.id, room_name)
+
+    async def _expire_stale_dialing(self, repo: CampaignRepository, now: datetime) -> None:
+        stale = await repo.get_stale_dialing(now - timedelta(seconds=self.dialing_timeout))
+        for contact_id in stale:
+            await repo.record_outcome(contact_id, outcome="timeout", now=now, error="No result from worker")
@@ -0,0 +1,187 @@
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.repositories.summary_chunk_repository import SummaryChunkRepository
+from app.services.summary_service import build_summary_prompt, format_transcript, get_summary_backend
+
+logger = logging.getLogger(__name__)
+
+# Bump when the map prompt changes so stale cached chunk summaries are not reused
+CHUNK_PROMPT_VERSION = "1"
+
+
+def build_chunk_prompt(conversation: str) -> str:
+    return f"""You are summarizing one segment of a longer phone conversation between a collections agent (AGENT) and a defaulter (DEFAULTER).
+Write concise factual notes on this segment only: what each side said or asked, any amounts, dates or payment promises, objections, and the emotional tone. Do not speculate about other segments.
+
+### Segment transcript:
+{conversation}"""
+
+
+def build_reduce_prompt(chunk_summaries: List[str]) -> str:
+    notes = "\n\n".join(
+        f"[Segment {i + 1}]\n{summary}" for i, summary in enumerate(chunk_summaries)
+    )
+    return build_summary_prompt(
+        "The conversation was too long to include verbatim. Below are notes on each "
+        "consecutive segment, in order; treat them together as the full transcript.\n\n" + notes
+    )
+
+
+class ChunkSummaryCache:
+    """Chunk summaries keyed by content hash: an in-process LRU in front of the summary_chunks table."""
+
+    def __init__(self, max_size: int = settings.SUMMARY_CHUNK_CACHE_SIZE, session_factory=AsyncSessionLocal):
+        self.max_size = max_size
+        self.session_factory = session_factory
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+
+    def _remember(self, content_hash: str, summary: str) -> None:
+        self._entries[content_hash] = summary
+        self._entries.move_to_end(content_hash)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    async def get_many(self, content_hashes: List[str]) -> Dict[str, str]:
+        found = {h: self._entries[h] for h in content_hashes if h in self._entries}
+        missing = [h for h in content_hashes if h not in found]
+        if missing:
+            async with self.session_factory() as db:
+                stored = await SummaryChunkRepository(db).get_many(missing)
+            for content_hash, summary in stored.items():
+                self._remember(content_hash, summary)
+            found.update(stored)
+        return found
+
+    async def put(self, content_hash: str, summary: str) -> None:
+        self._remember(content_hash, summary)
+        async with self.session_factory() as db:
+            await SummaryChunkRepository(db).put(content_hash, summary)
+
+
+_cache: Optional[ChunkSummaryCache] = None
+
+
+def get_chunk_cache() -> ChunkSummaryCache:
+    global _cache
+    if _cache is None:
+        _cache = ChunkSummaryCache()
+    return _cache
+
+
+class ChunkedSummarizer:
+    """Map-reduce summarizer for call transcripts.
+
+    The transcript is split into fixed windows of `chunk_turns` turns. Each
+    window is summarized once and cached by content hash, then the partial
+    summaries are reduced into the final markdown summary. Transcripts that fit
+    in one window are summarized in a single pass.
+    """
+
+    def __init__(self, backend=None, chunk_turns: int = settings.SUMMARY_CHUNK_TURNS,
+                 map_concurrency: int = settings.SUMMARY_MAP_CONCURRENCY, cache: Optional[ChunkSummaryCache] = None):
+        self.backend = backend or get_summary_backend()
+        self.chunk_turns = chunk_turns
+        self.map_concurrency = map_concurrency
+        self.cache = cache or get_chunk_cache()
+
+    def chunk_hash(self, chunk: List[dict]) -> str:
+        payload = f"{self.backend.name}\n{CHUNK_PROMPT_VERSION}\n{format_transcript(chunk)}"
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def split(self, messages: List[dict]) -> List[List[dict]]:
+        return [messages[i:i + self.chunk_turns] for i in range(0, len(messages), self.chunk_turns)]
+
+    async def summarize_chunk(self, chunk: List[dict]) -> str:
+        content_hash = self.chunk_hash(chunk)
+        cached = await self.cache.get_many([content_hash])
+        if content_hash in cached:
+            return cached[content_hash]
+        summary = await self.backend.generate(build_chunk_prompt(format_transcript(chunk)))
+        await self.cache.put(content_hash, summary)
+        return summary
+
+    async def summarize(self, messages: List[dict]) -> str:
+        if len(messages) <= self.chunk_turns:
+            return await self.backend.generate(build_summary_prompt(format_transcript(messages)))
+
+        chunks = self.split(messages)
+        hashes = [self.chunk_hash(chunk) for chunk in chunks]
+        summaries = await self.cache.get_many(hashes)
+
+        semaphore = asyncio.Semaphore(self.map_concurrency)
+
+        async def summarize_missing(chunk: List[dict]) -> str:
+            async with semaphore:
+                return await self.summarize_chunk(chunk)
+
+        missing = [i for i, h in enumerate(hashes) if h not in summaries]
+        results = await asyncio.gather(*(summarize_missing(chunks[i]) for i in missing))
+        for i, summary in zip(missing, results):
+            summaries[hashes[i]] = summary
+
+        return await self.backend.generate(build_reduce_prompt([summaries[h] for h in hashes]))
+
+
+class LiveChunkSummarizer:
+    """Summarizes complete transcript windows while the call is still running.
+
+    Turns must be added in the order they are written to call_history so the
+    windows match the ones the summary worker builds from the stored history;
+    the worker then finds them in the chunk cache and only has to summarize the
+    trailing partial window and reduce.
+    """
+
+    def __init__(self, summarizer: Optional[ChunkedSummarizer] = None):
+        self.summarizer = summarizer or ChunkedSummarizer()
+        self._buffer: List[dict] = []
+        self._tasks: set = set()
+
+    def add(self, role: str, text: str) -> None:
+        self._buffer.append({"role": role, "text": text})
+        if len(self._buffer) >= self.summarizer.chunk_turns:
+            chunk, self._buffer = self._buffer, []
+            task = asyncio.create_task(self._summarize(chunk))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _summarize(self, chunk: List[dict]) -> None:
+        try:
+            await self.summarizer.summarize_chunk(chunk)
+        except Exception:
+            # Not fatal: the summary worker summarizes the chunk itself on a cache miss
+            logger.warning("Live chunk summary failed", exc_info=True)
+
+    async def aclose(self, timeout: float = settings.SUMMARY_LIVE_DRAIN_TIMEOUT) -> None:
+        """Give in-flight chunk summaries `timeout` seconds to finish, then cancel them."""
+        if not self._tasks:
+            return
+        _, pending = await asyncio.wait(set(self._tasks), timeout=timeout)
+        for task in pending:
+            task.cancel()
+
+
+_live_summarizer: Optional[ChunkedSummarizer] = None
+_live_summarizer_failed = False
+
+
+def get_live_summarizer() -> Optional[ChunkedSummarizer]:
+    """The process's summarizer for live chunks, or None if its backend cannot be built.
+
+    Built on first use and shared by every call in the process. A backend that
+    cannot be built (e.g. GEMINI_API_KEY is not set) is logged once; calls then
+    run without live chunking and the summary worker summarizes every chunk.
+    """
+    global _live_summarizer, _live_summarizer_failed
+    if _live_summarizer is None and not _live_summarizer_failed:
+        try:
+            _live_summarizer = ChunkedSummarizer()
+        except Exception:
+            _live_summarizer_failed = True
+            logger.warning("Live chunk summaries disabled: the summary backend could not be built", exc_info=True)
+    return _live_summarizer
@@ -0,0 +1,93 @@
+import asyncio
+import json
+import logging
+from typing import TYPE_CHECKING, List, Optional
+
+from app.core.config import settings
+
+if TYPE_CHECKING:
+    from livekit import api
+
+logger = logging.getLogger(__name__)
+
+
+class DispatchClient:
+    """Long-lived LiveKit dispatch client shared by every request in the API process.
+
+    Holds one keep-alive HTTP connection pool to the LiveKit server instead of
+    building a new session (and TCP/TLS handshake) per call, and bounds the number
+    of dispatches in flight so a burst of campaign calls queues here rather than
+    piling up on the server.
+    """
+
+    def __init__(
+        self,
+        url: str = settings.LIVEKIT_URL,
+        api_key: str = settings.LIVEKIT_API_KEY,
+        api_secret: str = settings.LIVEKIT_API_SECRET,
+        max_connections: int = settings.LIVEKIT_DISPATCH_MAX_CONNECTIONS,
+        max_in_flight: int = settings.LIVEKIT_DISPATCH_MAX_IN_FLIGHT,
+        keepalive_timeout: float = settings.LIVEKIT_DISPATCH_KEEPALIVE,
+        request_timeout: float = settings.LIVEKIT_DISPATCH_TIMEOUT,
+    ):
+        self.url = url
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.max_connections = max_connections
+        self.keepalive_timeout = keepalive_timeout
+        self.request_timeout = request_timeout
+        self._semaphore = asyncio.Semaphore(max_in_flight)
+        self._session = None
+        self._api: Optional["api.LiveKitAPI"] = None
+
+    def missing_credentials(self) -> List[str]:
+        return [name for name, value in (("LIVEKIT_URL", self.url), ("LIVEKIT_API_KEY", self.api_key),
+                                         ("LIVEKIT_API_SECRET", self.api_secret)) if not value]
+
+    async def start(self) -> None:
+        missing = self.missing_credentials()
+        if missing:
+            # The rest of the API works without LiveKit; dispatches fail until these are set
+            logger.warning("LiveKit dispatch disabled: %s not set", ", ".join(missing))
+            return
+        # Imported here so importing the API app does not load the LiveKit SDK
+        import aiohttp
+        from livekit import api
+
+        connector = aiohttp.TCPConnector(
+            limit=self.max_connections,
+            keepalive_timeout=self.keepalive_timeout,
+        )
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.request_timeout),
+        )
+        self._api = api.LiveKitAPI(
+            url=self.url,
+            api_key=self.api_key,
+            api_secret=self.api_secret,
+            session=self._session,
+        )
+
+    async def aclose(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+        self._session = None
+        self._api = None
+
+    async def create_dispatch(self, room_name: str, metadata: dict) -> "api.AgentDispatch":
+        if self._api is None:
+            missing = self.missing_credentials()
+            if missing:
+                raise RuntimeError(f"Cannot dispatch a LiveKit agent: {', '.join(missing)} not set")
+            raise RuntimeError("DispatchClient.start() has not been called")
+        from livekit import api
+
+        async with self._semaphore:
+            return await self._api.agent_dispatch.create_dispatch(
+                api.CreateAgentDispatchRequest(
+                    agent_name=settings.LIVEKIT_AGENT_NAME,
+                    room=room_name,
+                    metadata=json.dumps(metadata),
+                )
+            )
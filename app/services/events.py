@@ -0,0 +1,278 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set
+
+from app.core.config import settings
+from app.core.metrics import (
+    EVENTS_DROPPED,
+    EVENTS_PUBLISHED,
+    EVENTS_SLOW_CONSUMERS_DROPPED,
+    EVENTS_SUBSCRIBERS,
+)
+
+logger = logging.getLogger(__name__)
+
+# Live call events, published by the LiveKit worker and streamed to dashboards.
+#
+#   {"type": "conversation_item_added", "call_id": 1, "agent_id": 2, "role": "agent", "text": "...", "ts": ...}
+#   {"type": "call_state", "call_id": 1, "agent_id": 2, "state": "started" | "ended", "ts": ...}
+#
+# Worker processes cannot reach the API's hub directly, so with the "socket"
+# broker each one writes newline-delimited JSON to a Unix socket served by the
+# API (EventRelayServer), which feeds the hub. When a host runs several API
+# processes each one listens on its own socket and workers send every event to
+# all of them, as a subscriber may be connected to any. With the "memory"
+# broker the publisher and the hub share a process.
+
+
+def relay_socket_path(api_index: int) -> str:
+    """The EventRelayServer socket of the API process with this API_INDEX."""
+    if api_index == 0:
+        return settings.EVENTS_SOCKET_PATH
+    return f"{settings.EVENTS_SOCKET_PATH}.{api_index}"
+
+
+def event_topics(event: dict) -> Iterable[str]:
+    if event.get("call_id") is not None:
+        yield f"call:{event['call_id']}"
+    if event.get("agent_id") is not None:
+        yield f"agent:{event['agent_id']}"
+
+
+class Subscription:
+    """One subscriber's bounded event buffer.
+
+    If the subscriber falls `max_queue_size` events behind it is dropped
+    rather than slowing down the hub or growing without bound.
+    """
+
+    def __init__(self, hub: "EventHub", topic: str, max_queue_size: int):
+        self.hub = hub
+        self.topic = topic
+        self.dropped = False
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+
+    def offer(self, event: dict) -> None:
+        if self.dropped:
+            return
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.dropped = True
+            EVENTS_SLOW_CONSUMERS_DROPPED.inc()
+            self.hub.unsubscribe(self)
+            # Make room for the wakeup so a waiting get() returns
+            self._queue.get_nowait()
+            self._queue.put_nowait(None)
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[dict]:
+        """Next event; None after `timeout` seconds of silence or once the subscriber was dropped."""
+        if self.dropped and self._queue.empty():
+            return None
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self) -> None:
+        self.hub.unsubscribe(self)
+
+
+class EventHub:
+    """Fans published events out to the subscribers of each call and agent topic."""
+
+    def __init__(self, subscriber_queue_size: int = settings.EVENTS_SUBSCRIBER_QUEUE_SIZE):
+        self.subscriber_queue_size = subscriber_queue_size
+        self._subscribers: Dict[str, Set[Subscription]] = defaultdict(set)
+
+    def subscribe(self, topic: str) -> Subscription:
+        subscription = Subscription(self, topic, self.subscriber_queue_size)
+        self._subscribers[topic].add(subscription)
+        EVENTS_SUBSCRIBERS.inc()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscribers = self._subscribers.get(subscription.topic)
+        if subscribers and subscription in subscribers:
+            subscribers.discard(subscription)
+            EVENTS_SUBSCRIBERS.dec()
+            if not subscribers:
+                del self._subscribers[subscription.topic]
+
+    def publish(self, event: dict) -> None:
+        """Deliver an event to every current subscriber without waiting on any of them."""
+        EVENTS_PUBLISHED.inc()
+        for topic in event_topics(event):
+            for subscription in list(self._subscribers.get(topic, ())):
+                subscription.offer(event)
+
+
+_hub: Optional[EventHub] = None
+
+
+def get_event_hub() -> EventHub:
+    global _hub
+    if _hub is None:
+        _hub = EventHub()
+    return _hub
+
+
+class EventRelayServer:
+    """Accepts events from worker processes on a Unix socket and publishes them to the hub."""
+
+    def __init__(self, hub: EventHub, path: str = relay_socket_path(settings.API_INDEX)):
+        self.hub = hub
+        self.path = path
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> None:
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self._server = await asyncio.start_unix_server(self._handle, path=self.path, limit=2 ** 20)
+
+    async def aclose(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while line := await reader.readline():
+                try:
+                    self.hub.publish(json.loads(line))
+                except ValueError:
+                    logger.warning("Ignoring malformed event from relay client")
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+class InProcessPublisher:
+    """Publishes straight to this process's hub."""
+
+    def __init__(self, hub: Optional[EventHub] = None):
+        self.hub = hub or get_event_hub()
+
+    def publish(self, event: dict) -> None:
+        self.hub.publish(event)
+
+    async def aclose(self, timeout: float = 1.0) -> None:
+        pass
+
+
+class SocketPublisher:
+    """Sends events to the API's EventRelayServer.
+
+    `publish` never blocks the call: events are buffered and written by a
+    background task, and dropped (and counted) when the buffer is full or the
+    API is not listening.
+    """
+
+    def __init__(self, path: str = settings.EVENTS_SOCKET_PATH,
+                 max_queue_size: int = settings.EVENTS_PUBLISH_QUEUE_SIZE, reconnect_delay: float = 1.0):
+        self.path = path
+        self.reconnect_delay = reconnect_delay
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        self._task: Optional[asyncio.Task] = None
+        self._retry_at = 0.0
+
+    def publish(self, event: dict) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="event-publisher")
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            EVENTS_DROPPED.inc()
+
+    async def aclose(self, timeout: float = 1.0) -> None:
+        """Give buffered events `timeout` seconds to be sent, then stop the sender."""
+        if self._task is not None:
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        writer: Optional[asyncio.StreamWriter] = None
+        try:
+            while True:
+                event = await self._queue.get()
+                try:
+                    writer = await self._send(writer, event)
+                finally:
+                    self._queue.task_done()
+        finally:
+            if writer is not None:
+                writer.close()
+
+    async def _send(self, writer: Optional[asyncio.StreamWriter], event: dict) -> Optional[asyncio.StreamWriter]:
+        if writer is None and time.monotonic() >= self._retry_at:
+            try:
+                _, writer = await asyncio.open_unix_connection(self.path)
+            except OSError:
+                self._retry_at = time.monotonic() + self.reconnect_delay
+        if writer is None:
+            EVENTS_DROPPED.inc()
+            return None
+        try:
+            writer.write(json.dumps(event, default=str).encode() + b"\n")
+            await writer.drain()
+            return writer
+        except (ConnectionError, OSError):
+            EVENTS_DROPPED.inc()
+            writer.close()
+            return None
+
+
+class FanoutPublisher:
+    """Sends every event to each of several publishers, e.g. one SocketPublisher per API process."""
+
+    def __init__(self, publishers: List[SocketPublisher]):
+        self.publishers = publishers
+
+    def publish(self, event: dict) -> None:
+        for publisher in self.publishers:
+            publisher.publish(event)
+
+    async def aclose(self, timeout: float = 1.0) -> None:
+        await asyncio.gather(*(publisher.aclose(timeout) for publisher in self.publishers))
+
+
+_publisher = None
+
+
+def get_event_publisher():
+    """The process-wide publisher for the configured EVENTS_BROKER."""
+    global _publisher
+    if _publisher is None:
+        if settings.EVENTS_BROKER == "memory":
+            _publisher = InProcessPublisher()
+        elif settings.EVENTS_BROKER == "socket" and settings.API_PROCESSES > 1:
+            _publisher = FanoutPublisher(
+                [SocketPublisher(relay_socket_path(index)) for index in range(settings.API_PROCESSES)]
+            )
+        elif settings.EVENTS_BROKER == "socket":
+            _publisher = SocketPublisher()
+        else:
+            raise ValueError(f"Unknown EVENTS_BROKER {settings.EVENTS_BROKER!r}")
+    return _publisher
+
+
+def publish_event(event_type: str, call_id: int, agent_id: int, **fields) -> None:
+    get_event_publisher().publish(
+        {"type": event_type, "call_id": call_id, "agent_id": agent_id, "ts": time.time(), **fields}
+    )
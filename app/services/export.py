@@ -0,0 +1,180 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from typing import AsyncIterator, Callable, List, Optional, Sequence
+
+from sqlalchemy import Date, DateTime, Float, Integer, Select
+
+from app.core.config import settings
+from app.core.metrics import EXPORT_ROWS
+
+# Output formats: media type and file extension
+FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv", "csv"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+
+def _json_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that hands back what was written since the last drain."""
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._buffer += data
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+
+class NdjsonEncoder:
+    def __init__(self, columns: Sequence[str], types: Sequence):
+        self.columns = columns
+
+    def header(self) -> bytes:
+        return b""
+
+    def encode(self, rows: List[tuple]) -> bytes:
+        columns = self.columns
+        return "".join(
+            json.dumps(dict(zip(columns, row)), ensure_ascii=False, default=_json_default) + "\n"
+            for row in rows
+        ).encode()
+
+    def close(self) -> bytes:
+        return b""
+
+
+class CsvEncoder:
+    def __init__(self, columns: Sequence[str], types: Sequence):
+        self.columns = columns
+
+    def _write(self, rows) -> bytes:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        return buffer.getvalue().encode()
+
+    def header(self) -> bytes:
+        return self._write([self.columns])
+
+    def encode(self, rows: List[tuple]) -> bytes:
+        return self._write([[_json_value(v) for v in row] for row in rows])
+
+    def close(self) -> bytes:
+        return b""
+
+
+class ParquetEncoder:
+    """One Parquet row group per chunk; the file footer is written by close()."""
+
+    def __init__(self, columns: Sequence[str], types: Sequence):
+        # Optional dependency, only needed for Parquet exports
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self.columns = columns
+        self._pa = pa
+        # Typed from the query rather than inferred, so a chunk where a column is all null still matches
+        self._schema = pa.schema([(column, self._arrow_type(t)) for column, t in zip(columns, types)])
+        self._sink = _ChunkSink()
+        self._writer = pq.ParquetWriter(self._sink, self._schema, compression="zstd")
+
+    def _arrow_type(self, sql_type):
+        pa = self._pa
+        if isinstance(sql_type, Integer):
+            return pa.int64()
+        if isinstance(sql_type, Float):
+            return pa.float64()
+        if isinstance(sql_type, DateTime):
+            # Stored in UTC; SQLite hands them back without a zone
+            return pa.timestamp("us", tz="UTC")
+        if isinstance(sql_type, Date):
+            return pa.date32()
+        return pa.string()
+
+    def header(self) -> bytes:
+        return b""
+
+    def encode(self, rows: List[tuple]) -> bytes:
+        table = self._pa.Table.from_pydict(
+            {column: [row[i] for row in rows] for i, column in enumerate(self.columns)}, schema=self._schema
+        )
+        self._writer.write_table(table)
+        return self._sink.drain()
+
+    def close(self) -> bytes:
+        self._writer.close()
+        return self._sink.drain()
+
+
+ENCODERS: dict = {"ndjson": NdjsonEncoder, "csv": CsvEncoder, "parquet": ParquetEncoder}
+
+
+def parquet_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+async def stream_export(
+    session_factory: Callable,
+    statement: Select,
+    format: str,
+    dataset: str,
+    chunk_size: int = settings.EXPORT_CHUNK_SIZE,
+    more_rows: Optional[Callable] = None,
+) -> AsyncIterator[bytes]:
+    """Run `statement` on a server-side cursor and yield the rows encoded as `format`,
+    one chunk of `chunk_size` rows at a time, so memory use does not grow with the export.
+
+    Columns are named and typed after the statement's selected columns. Pass
+    `more_rows(db, chunk_size)`, an async iterator of lists of rows in the same
+    columns, to export rows from another source after the statement's, in the
+    same session.
+    """
+    selected = list(statement.selected_columns)
+    encoder = ENCODERS[format]([c.key for c in selected], [c.type for c in selected])
+    rows_exported = EXPORT_ROWS.labels(dataset=dataset, format=format)
+    yield encoder.header()
+    async with session_factory() as db:
+        result = await db.stream(statement.execution_options(yield_per=chunk_size))
+        async for partition in result.partitions():
+            data = encoder.encode([tuple(row) for row in partition])
+            rows_exported.inc(len(partition))
+            if data:
+                yield data
+        if more_rows is not None:
+            async for rows in more_rows(db, chunk_size):
+                data = encoder.encode(rows)
+                rows_exported.inc(len(rows))
+                if data:
+                    yield data
+    yield encoder.close()
@@ -1,150 +1,450 @@
 import os
 import json
-from datetime import datetime
-from dotenv import load_dotenv
+import logging
+from datetime import datetime, timezone
 import time
 
-from livekit.agents import Agent, AgentSession, JobContext, AutoSubscribe
+from livekit.agents import Agent, AgentSession, JobContext, JobProcess, AutoSubscribe
 from livekit.agents.llm.chat_context import ChatContext, ChatMessage
+from livekit.agents.voice import AgentStateChangedEvent, ModelSettings, UserInputTranscribedEvent
 from livekit.plugins import groq, silero, cartesia, sarvam
 from livekit import api
 import asyncio
+from typing import AsyncIterable, Optional
 
-from app.models.base import SessionLocal
+from app.db.session import AsyncSessionLocal
+from app.models.call import Call
 from app.repositories.call_repository import CallRepository
-from app.services.summary_service import generate_call_summary
+from app.repositories.campaign_repository import CampaignRepository
+from app.services.agent_config import get_agent_config_cache
+from app.services.call_finalization import run_step
+from app.services.call_outcome import classify_dial_failure, classify_disconnect, disconnect_reason_name
+from app.services.chunked_summarizer import LiveChunkSummarizer, get_live_summarizer
+from app.services.events import get_event_publisher, publish_event
+from app.services.summary_queue import enqueue_summary
+from app.services.turn_latency import TurnLatencyTracker
+from app.services.turn_pipeline import DeferredEffects, SpeculativeReply, TurnSpeculator
+from app.services.transcript_writer import get_transcript_writer
+from app.services.worker_load import LoopLagMonitor
 from app.core.config import settings
+from app.core.logging import TRANSCRIPT_LOGGER, bind_log_context, setup_logging
+from app.core.metrics import AGENT_PREWARM_SECONDS, CALL_ANSWER_TO_FIRST_AUDIO_SECONDS, CALL_SHUTDOWN_SECONDS
 
-load_dotenv()
+logger = logging.getLogger(__name__)
+transcript_logger = logging.getLogger(TRANSCRIPT_LOGGER)
+
+
+STT_MODEL = "whisper-large-v3-turbo"
+LLM_MODEL = "llama3-8b-8192"
+TTS_MODEL = "sonic-2"
+
+# Participant identity of the person being called
+CALLEE_IDENTITY = "callee"
+
+
+def build_provider_clients():
+    """STT, LLM and TTS clients for one call."""
+    missing = [name for name in ("GROQ_API_KEY", "CARTESIA_API_KEY") if not getattr(settings, name)]
+    if missing:
+        raise RuntimeError(f"Cannot build the voice pipeline: {', '.join(missing)} not set")
+    return (
+        groq.STT(model=STT_MODEL, api_key=settings.GROQ_API_KEY),
+        groq.LLM(model=LLM_MODEL, api_key=settings.GROQ_API_KEY),
+        cartesia.TTS(model=TTS_MODEL, voice="f786b574-daa5-4673-aa0c-cbe3e8534c02",
+                     api_key=settings.CARTESIA_API_KEY),
+    )
+
+
+def load_vad(low_latency: bool = settings.VOICE_LOW_LATENCY) -> silero.VAD:
+    if low_latency:
+        # Utterances end (and are transcribed) after a short pause; the turn only
+        # ends after VOICE_TURN_SILENCE, see create_session
+        return silero.VAD.load(min_silence_duration=settings.VOICE_SPECULATION_SILENCE)
+    return silero.VAD.load()
+
+
+def prewarm(proc: JobProcess):
+    """Runs once in each worker process before it is given a job.
+
+    The VAD model is loaded here and shared by every job the process runs. The
+    provider clients are built ahead of time for the process's next job; they
+    are handed to a single job because their HTTP sessions belong to that job.
+    """
+    # Job processes are spawned, so the record factory (context, redaction) is installed here too
+    setup_logging("worker", install_handlers=False)
+    started = time.perf_counter()
+    proc.userdata["vad"] = load_vad()
+    proc.userdata["clients"] = build_provider_clients()
+    AGENT_PREWARM_SECONDS.observe(time.perf_counter() - started)
 
 
 class VoiceAgent(Agent):
-    def __init__(self, prompt: str, room_name: str, defaulter_name: str, phone_number: str, agentId: int):
+    def __init__(self, prompt: str, room_name: str, call: Call):
         super().__init__(instructions=prompt)
         self.dialogue = []
         self.room_name = room_name
         self.start_time = time.time()
-        
-        # Initialize database
-        db = SessionLocal()
-        self.call_repo = CallRepository(db)
-        
-        # Create call record
-        self.call = self.call_repo.create_call(
-            defaulter_name=defaulter_name,
-            phone_number=phone_number,
-            agentId=agentId,
-        )
+        self.call = call
+        # Transcript rows, logs and live events of the call; see LowLatencyVoiceAgent
+        self.effects = DeferredEffects()
 
     async def on_user_turn_completed(self, turn_ctx: ChatContext, new_message: ChatMessage) -> None:
         ts = datetime.now().isoformat()
         user_text = new_message.content
-        print(f"[USER {ts}] {user_text}")
+        transcript_logger.debug("user turn completed: %s", user_text, extra={"role": "defaulter"})
         self.dialogue.append({"role": "user", "text": user_text, "timestamp": ts})
 
     async def on_llm_response(self, response_message: ChatMessage) -> None:
         ts = datetime.now().isoformat()
         agent_text = response_message.content
-        print(f"[AGENT {ts}] {agent_text}")
+        transcript_logger.debug("llm response: %s", agent_text, extra={"role": "agent"})
         self.dialogue.append({"role": "assistant", "text": agent_text, "timestamp": ts})
 
-    
+
+class LowLatencyVoiceAgent(VoiceAgent):
+    """VoiceAgent for VOICE_LOW_LATENCY.
+
+    Each final transcript of the user's turn starts a speculative reply
+    (app/services/turn_pipeline.py), which llm_node and tts_node play from its
+    buffers if the turn is committed with that transcript. A reply that
+    fails before it produced any text or audio is generated again the usual
+    way. The call's bookkeeping in `effects` is held from the end of the turn
+    until the reply starts playing. Agents with tools reply without
+    speculation.
+    """
+
+    def __init__(self, prompt: str, room_name: str, call: Call):
+        super().__init__(prompt, room_name, call)
+        self.speculator = TurnSpeculator(self._speculate)
+        self._reply: Optional[SpeculativeReply] = None
+
+    async def on_enter(self) -> None:
+        self.session.on("user_input_transcribed", self._on_user_input_transcribed)
+        self.session.on("agent_state_changed", self._on_agent_state_changed)
+
+    async def on_exit(self) -> None:
+        self.session.off("user_input_transcribed", self._on_user_input_transcribed)
+        self.session.off("agent_state_changed", self._on_agent_state_changed)
+        self.speculator.cancel()
+        self.effects.release()
+
+    def _on_user_input_transcribed(self, event: UserInputTranscribedEvent) -> None:
+        if event.is_final and not self.tools:
+            self.speculator.on_final_transcript(event.transcript)
+
+    def _on_agent_state_changed(self, event: AgentStateChangedEvent) -> None:
+        if event.new_state in ("speaking", "listening"):
+            self.effects.release()
+        if event.new_state == "listening":
+            # Back to listening without llm_node taking the turn's reply: it was interrupted
+            self.speculator.drop()
+
+    def _speculate(self, transcript: str) -> SpeculativeReply:
+        return SpeculativeReply(
+            transcript,
+            self.chat_ctx,
+            self.session.llm,
+            self.session.tts,
+            llm_conn_options=self.session.conn_options.llm_conn_options,
+            tts_conn_options=self.session.conn_options.tts_conn_options,
+        )
+
+    async def on_user_turn_completed(self, turn_ctx: ChatContext, new_message: ChatMessage) -> None:
+        self.effects.hold()
+        self.speculator.end_turn()
+        await super().on_user_turn_completed(turn_ctx, new_message)
+
+    async def llm_node(self, chat_ctx: ChatContext, tools: list, model_settings: ModelSettings):
+        if tools:
+            self.speculator.drop()
+            self._reply = None
+        else:
+            self._reply = self.speculator.take(chat_ctx)
+        reply = self._reply
+        if reply is not None:
+            started = False
+            try:
+                async for chunk in reply.text():
+                    started = True
+                    yield chunk
+                return
+            except (asyncio.CancelledError, GeneratorExit):
+                # Interrupted; a finished reply keeps synthesizing for tts_node
+                reply.cancel()
+                raise
+            except Exception:
+                if started:
+                    raise
+                logger.warning("Speculative reply failed, generating it again", exc_info=True)
+                reply.cancel()
+                self._reply = None
+        async for chunk in Agent.default.llm_node(self, chat_ctx, tools, model_settings):
+            yield chunk
+
+    async def tts_node(self, text: AsyncIterable[str], model_settings: ModelSettings):
+        # llm_node has chosen its source by the time the first text reaches here
+        text = aiter(text)
+        first = await anext(text, None)
+        reply, self._reply = self._reply, None
+
+        async def replay():
+            if first is not None:
+                yield first
+            async for chunk in text:
+                yield chunk
+
+        if reply is not None:
+            started = False
+            try:
+                async for frame in reply.audio():
+                    started = True
+                    yield frame
+                return
+            except (asyncio.CancelledError, GeneratorExit):
+                reply.cancel()
+                raise
+            except Exception:
+                if started:
+                    raise
+                # The text came from the reply and is still all in `text`
+                logger.warning("Speculative reply audio failed, synthesizing it again", exc_info=True)
+        async for frame in Agent.default.tts_node(self, replay(), model_settings):
+            yield frame
+
+
+def create_session(stt, llm, tts, vad, low_latency: bool = settings.VOICE_LOW_LATENCY) -> AgentSession:
+    options = {}
+    if low_latency:
+        # The turn needs as much silence as without the mode; the VAD's shorter
+        # silence only starts the speculative reply
+        options["min_endpointing_delay"] = settings.VOICE_TURN_SILENCE
+    return AgentSession(
+        stt=stt,
+        llm=llm,
+        tts=tts,
+        vad=vad,
+        turn_detection="vad",
+        allow_interruptions=True,
+        **options,
+    )
+
+
+def create_agent(prompt: str, room_name: str, call: Call, low_latency: bool = settings.VOICE_LOW_LATENCY) -> VoiceAgent:
+    agent_class = LowLatencyVoiceAgent if low_latency else VoiceAgent
+    return agent_class(prompt=prompt, room_name=room_name, call=call)
+
 
 async def entrypoint(ctx: JobContext):
     await ctx.connect()
     metadata = json.loads(ctx.job.metadata)
     phone = metadata.get("phone_number")
-    prompt = metadata.get("system_prompt", "You are a helpful assistant.")
     defaulter_name = metadata.get("defaulter_name", "Unknown")
     agentId = metadata.get("agentId", 1)
-    print('Metadata: ', metadata)
+    trunk_id = metadata.get("trunkId") or settings.LIVEKIT_TRUNK_ID
+    campaign_contact_id = metadata.get("campaignContactId")
+    # Tasks created from here on (session event handlers, shutdown hook) inherit the context
+    bind_log_context(room=ctx.room.name, job_id=ctx.job.id, agent_id=agentId,
+                     campaign_contact_id=campaign_contact_id)
+    logger.info("Job received", extra={"defaulter_name": defaulter_name})
+
+    async def reject(reason: str) -> None:
+        """Give up on the job before dialing, reporting a campaign contact as failed."""
+        logger.error(reason)
+        if not campaign_contact_id:
+            return
+
+        # Otherwise the contact stays 'dialing' until the scheduler times it out
+        async def report():
+            async with AsyncSessionLocal() as db:
+                await CampaignRepository(db).record_outcome(
+                    campaign_contact_id, outcome="failed", now=datetime.now(timezone.utc), error=reason
+                )
+        await run_step("campaign_outcome", report(), settings.CALL_FINALIZE_TIMEOUT)
 
     if not phone:
-        print("❌ Missing phone number")
+        await reject("Missing phone number in job metadata")
+        return
+    if not trunk_id:
+        await reject("No SIP trunk in job metadata and LIVEKIT_TRUNK_ID is not set")
         return
 
-    print(f"📞 Calling {phone}...")
-    await ctx.api.sip.create_sip_participant(api.CreateSIPParticipantRequest(
-        room_name=ctx.room.name,
-        sip_trunk_id=os.getenv("LIVEKIT_TRUNK_ID"),
-        sip_call_to=phone,
-        participant_identity="callee",
-        wait_until_answered=True,
-    ))
-
-    session = AgentSession(
-        stt=groq.STT(model="whisper-large-v3-turbo"),
-        llm=groq.LLM(model="llama3-8b-8192"),
-        tts=cartesia.TTS(model="sonic-2", voice="f786b574-daa5-4673-aa0c-cbe3e8534c02"),
-        vad=silero.VAD.load(),
-        turn_detection="vad",
-        allow_interruptions=True,
+    agent_config = await get_agent_config_cache().get(agentId, version=metadata.get("agentVersion"))
+    if agent_config is None:
+        await reject(f"Unknown agent {agentId}")
+        return
+
+    prewarmed = "clients" in ctx.proc.userdata
+    vad = ctx.proc.userdata.get("vad") or load_vad()
+    stt, llm, tts = ctx.proc.userdata.pop("clients", None) or build_provider_clients()
+    # Open the TTS websocket and the LLM connection while the phone is ringing
+    tts.prewarm()
+    llm.prewarm()
+
+    # Create the call record before dialing so unanswered calls are counted too
+    async with AsyncSessionLocal() as db:
+        call = await CallRepository(db).create_call(
+            defaulter_name=defaulter_name,
+            phone_number=phone,
+            agentId=agentId,
+        )
+        if campaign_contact_id:
+            await CampaignRepository(db).attach_call(campaign_contact_id, call.id)
+    bind_log_context(call_id=call.id)
+
+    logger.info("Calling %s", phone)
+    try:
+        await ctx.api.sip.create_sip_participant(api.CreateSIPParticipantRequest(
+            room_name=ctx.room.name,
+            sip_trunk_id=trunk_id,
+            sip_call_to=phone,
+            participant_identity=CALLEE_IDENTITY,
+            wait_until_answered=True,
+        ))
+    except Exception as e:
+        outcome, sip_status = classify_dial_failure(e)
+        logger.warning("Call to %s was not answered (%s): %s", phone, outcome, e)
+
+        async def finish():
+            async with AsyncSessionLocal() as db:
+                await CallRepository(db).finish_call(
+                    call.id, outcome=outcome, ended_at=datetime.now(timezone.utc), sip_status=sip_status
+                )
+                if campaign_contact_id:
+                    # Hand the contact back to the campaign scheduler, which retries its retry_outcomes
+                    await CampaignRepository(db).record_outcome(
+                        campaign_contact_id, outcome=outcome, now=datetime.now(timezone.utc),
+                        error=str(e)[:2000] if outcome == "failed" else None,
+                    )
+        await run_step("finish_call", finish(), settings.CALL_FINALIZE_TIMEOUT)
+        ctx.shutdown()
+        return
+    answered_at = datetime.now(timezone.utc)
+    answer_clock = time.perf_counter()
+    # Set when the callee leaves the room; still None at shutdown if the agent hung up
+    ended_at = None
+    disconnect_reason = None
+
+    @ctx.room.on("participant_disconnected")
+    def on_participant_disconnected(participant):
+        nonlocal ended_at, disconnect_reason
+        if participant.identity != CALLEE_IDENTITY or ended_at is not None:
+            return
+        ended_at = datetime.now(timezone.utc)
+        disconnect_reason = participant.disconnect_reason
+        ctx.shutdown(reason="callee disconnected")
+
+    session = create_session(stt, llm, tts, vad)
+
+    latency = TurnLatencyTracker(
+        stt_model=f"groq:{STT_MODEL}", llm_model=f"groq:{LLM_MODEL}", tts_model=f"cartesia:{TTS_MODEL}"
     )
 
-    agent = VoiceAgent(
-        prompt=prompt,
+    @session.on("metrics_collected")
+    def on_metrics_collected(event):
+        latency.on_metrics(event.metrics)
+
+    @session.on("user_state_changed")
+    def on_user_state_changed(event):
+        latency.on_user_state(event.old_state, event.new_state)
+
+    @session.on("agent_state_changed")
+    def on_agent_state_changed(event):
+        nonlocal answer_clock
+        latency.on_agent_state(event.new_state)
+        if event.new_state == "speaking" and answer_clock is not None:
+            first_audio = time.perf_counter() - answer_clock
+            answer_clock = None
+            CALL_ANSWER_TO_FIRST_AUDIO_SECONDS.labels(prewarmed=str(prewarmed).lower()).observe(first_audio)
+            logger.info("First agent audio %.2fs after answer", first_audio, extra={"prewarmed": prewarmed})
+
+    agent = create_agent(
+        prompt=agent_config.prompt,
         room_name=ctx.room.name,
-        defaulter_name=defaulter_name,
-        phone_number=phone,
-        agentId=agentId
+        call=call
     )
 
+    publish_event("call_state", call.id, agentId, state="started", phone_number=phone,
+                  defaulter_name=defaulter_name, room_name=ctx.room.name)
+
+    transcripts = get_transcript_writer()
+    summarizer = get_live_summarizer() if settings.SUMMARY_LIVE_CHUNKING else None
+    live_summary = LiveChunkSummarizer(summarizer) if summarizer else None
+
+    def record_turn(role: str, text: str, turn_latency) -> None:
+        transcript_logger.info("%s: %s", role, text, extra={"role": role})
+        # Queue for a batched write to call history; agent turns carry the reply's latency spans
+        transcripts.submit(call_id=agent.call.id, role=role, message=text, latency=turn_latency)
+        if live_summary:
+            live_summary.add(role, text)
+        # Stream to live dashboards (WebSocket/SSE)
+        publish_event("conversation_item_added", agent.call.id, agentId, role=role, text=text)
+
     @session.on("conversation_item_added")
     def on_conversation_item_added(event):
         if event.item.role == "assistant":
-            print(f"[Agent] {event.item.text_content}")
-            # Add to call history
-            agent.call_repo.add_call_history(
-                call_id=agent.call.id,
-                role="agent",
-                message=event.item.text_content
-            )
+            role = "agent"
         else:
-            print(f"[User] {event.item.text_content}")
-            # Add to call history
-            agent.call_repo.add_call_history(
-                call_id=agent.call.id,
-                role="defaulter",
-                message=event.item.text_content
-            )
+            role = "defaulter"
+        # The spans are taken now, before the next reply's arrive
+        agent.effects.run(record_turn, role, event.item.text_content,
+                          latency.take_turn() if role == "agent" else None)
     # Define shutdown hook
     async def shutdown_hook():
-        # Get call history from repository
-        call_history = agent.call_repo.get_call_history(agent.call.id)
-        
-        # Format history for summary generation and calculate duration
-        messages = []
-        first_message_time = None
-        last_message_time = None
-        
-        for history in call_history:
-            messages.append({
-                'role': history.role,
-                'text': history.message
-            })
-            
-            if first_message_time is None:
-                first_message_time = history.created_at
-            last_message_time = history.created_at
-        
-        # Calculate duration in minutes
-        if first_message_time and last_message_time:
-            duration = (last_message_time - first_message_time).total_seconds() / 60
-        else:
-            duration = 0
-        
-        # Generate summary
-        summary = await generate_call_summary(messages)
-        
-        # Update call with summary and duration
-        agent.call_repo.update_call(
-            call_id=agent.call.id,
-            duration=duration,
-            outcome="Completed", 
-            summary=summary
-        )
-        
-        print("Call ended and summary generated")
+        # Shutdown callbacks run in a task created before the context was bound
+        bind_log_context(room=ctx.room.name, job_id=ctx.job.id, agent_id=agentId, call_id=agent.call.id)
+        started = time.perf_counter()
+        deadline = started + settings.CALL_SHUTDOWN_TIMEOUT
+
+        def remaining() -> float:
+            return deadline - time.perf_counter()
+
+        # Turns held back while a reply was being generated
+        agent.effects.release()
+        outcome = classify_disconnect(disconnect_reason)
+        call_ended_at = ended_at or datetime.now(timezone.utc)
+        publish_event("call_state", agent.call.id, agentId, state="ended", outcome=outcome)
+
+        # Outcome and duration first, in one short transaction, so a slow or
+        # failing step below cannot lose them. Duration runs from answer to the
+        # callee's disconnect (or now, if the agent hung up)
+        async def finish():
+            async with AsyncSessionLocal() as db:
+                await CallRepository(db).finish_call(
+                    agent.call.id,
+                    outcome=outcome,
+                    answered_at=answered_at,
+                    ended_at=call_ended_at,
+                    disconnect_reason=disconnect_reason_name(disconnect_reason),
+                )
+        await run_step("finish_call", finish(), min(settings.CALL_FINALIZE_TIMEOUT, remaining()))
+
+        # The summary job reads the transcript back, so every buffered turn must
+        # be written first; if that fails, or turns were dropped, the reconciler
+        # queues the summary later
+        if await run_step("flush_transcript", transcripts.flush(agent.call.id), remaining()):
+            # Summary is generated by the summary worker (summary_worker.py), which
+            # reuses the chunk summaries computed live during the call
+            if live_summary:
+                await run_step("live_summary", live_summary.aclose(), remaining())
+            await run_step("enqueue_summary", enqueue_summary(agent.call.id), remaining())
+
+        if campaign_contact_id:
+            async def report():
+                async with AsyncSessionLocal() as db:
+                    await CampaignRepository(db).record_outcome(
+                        campaign_contact_id, outcome=outcome, now=datetime.now(timezone.utc)
+                    )
+            await run_step("campaign_outcome", report(), remaining())
+
+        await run_step("close_events", get_event_publisher().aclose(), remaining())
+        elapsed = time.perf_counter() - started
+        CALL_SHUTDOWN_SECONDS.observe(elapsed)
+        logger.info("Call ended, shutdown took %.2fs", elapsed)
+        lag_monitor.stop()
+
+    # Lag of this job process's loop, which carries the call's audio
+    lag_monitor = LoopLagMonitor()
+    lag_monitor.start()
 
     # Add shutdown hook
     ctx.add_shutdown_callback(shutdown_hook)
@@ -0,0 +1,106 @@
+import asyncio
+import logging
+import random
+from datetime import datetime, timedelta, timezone
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models.call import SummaryJob
+from app.repositories.call_repository import CallRepository
+from app.repositories.summary_job_repository import SummaryJobRepository
+from app.services.summary_service import generate_call_summary, get_summary_backend
+
+logger = logging.getLogger(__name__)
+
+
+async def enqueue_summary(call_id: int) -> None:
+    """Queue summary generation for a finished call. Safe to call more than once."""
+    async with AsyncSessionLocal() as db:
+        await SummaryJobRepository(db).enqueue(call_id, now=datetime.now(timezone.utc))
+
+
+class SummaryWorkerPool:
+    """Runs summary jobs from the summary_jobs table with bounded concurrency.
+
+    Failed jobs, and attempts that take longer than `timeout` seconds, are
+    retried with exponential backoff and jitter until `max_attempts` is
+    reached, after which the call is marked 'failed'.
+    Several pools (in one or many processes) can share the same table.
+    """
+
+    def __init__(
+        self,
+        backend=None,
+        concurrency: int = settings.SUMMARY_CONCURRENCY,
+        max_attempts: int = settings.SUMMARY_MAX_ATTEMPTS,
+        retry_base_delay: float = settings.SUMMARY_RETRY_BASE_DELAY,
+        retry_max_delay: float = settings.SUMMARY_RETRY_MAX_DELAY,
+        poll_interval: float = settings.SUMMARY_POLL_INTERVAL,
+        stale_after: float = settings.SUMMARY_STALE_AFTER,
+        timeout: float = settings.SUMMARY_TIMEOUT,
+        session_factory=AsyncSessionLocal,
+    ):
+        self.backend = backend or get_summary_backend()
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self.poll_interval = poll_interval
+        self.stale_after = stale_after
+        self.timeout = timeout
+        self.session_factory = session_factory
+        self._stopping = asyncio.Event()
+
+    async def run(self) -> None:
+        """Process jobs until `stop()` is called."""
+        await asyncio.gather(*(self._worker(i) for i in range(self.concurrency)))
+
+    def stop(self) -> None:
+        self._stopping.set()
+
+    async def run_once(self) -> int:
+        """Claim and process one job. Returns the number of jobs processed (0 or 1)."""
+        async with self.session_factory() as db:
+            repo = SummaryJobRepository(db)
+            now = datetime.now(timezone.utc)
+            jobs = await repo.claim(1, now=now, stale_before=now - timedelta(seconds=self.stale_after),
+                                    max_attempts=self.max_attempts)
+        for job in jobs:
+            await self._process(job)
+        return len(jobs)
+
+    async def _worker(self, index: int) -> None:
+        while not self._stopping.is_set():
+            try:
+                processed = await self.run_once()
+            except Exception:
+                logger.exception("Summary worker %d failed to claim a job", index)
+                processed = 0
+            if not processed:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def _process(self, job: SummaryJob) -> None:
+        # No session is open while the summary is generated: it would hold a
+        # pooled connection (and, on SQLite, a read snapshot) for up to `timeout`
+        try:
+            async with self.session_factory() as db:
+                history = await CallRepository(db).get_call_history(job.call_id)
+            messages = [{"role": h.role, "text": h.message} for h in history]
+            # A hung provider must not hold the job's slot until it is considered stale
+            summary = await asyncio.wait_for(generate_call_summary(messages, backend=self.backend), self.timeout)
+        except Exception as e:
+            error = str(e) or type(e).__name__
+            retry_at = None
+            if job.attempts < self.max_attempts:
+                delay = min(self.retry_base_delay * 2 ** (job.attempts - 1), self.retry_max_delay)
+                retry_at = datetime.now(timezone.utc) + timedelta(seconds=delay * random.uniform(0.8, 1.2))
+            logger.warning("Summary attempt %d for call %s failed: %s", job.attempts, job.call_id, error)
+            async with self.session_factory() as db:
+                await SummaryJobRepository(db).fail(await db.get(SummaryJob, job.id), error=error[:2000],
+                                                    retry_at=retry_at)
+            return
+        async with self.session_factory() as db:
+            await SummaryJobRepository(db).complete(await db.get(SummaryJob, job.id), summary)
@@ -1,17 +1,60 @@
+import asyncio
+import hashlib
 from typing import List
 from app.core.config import settings
-from google import genai
 
-async def generate_call_summary(messages: List[dict]) -> str:
-    """Generate a summary of the call using Groq LLM."""
-    
-    # Format messages for the LLM
-    conversation = "\n".join([
+class GeminiSummaryBackend:
+    """Summaries from Gemini via the non-blocking `client.aio` API."""
+
+    def __init__(self, model: str = settings.SUMMARY_MODEL):
+        from google import genai
+
+        if not settings.GEMINI_API_KEY:
+            raise RuntimeError("GEMINI_API_KEY is not set; set it or use SUMMARY_BACKEND=fake")
+        self.model = model
+        self.name = f"gemini:{model}"
+        self.client = genai.Client(api_key=settings.GEMINI_API_KEY)
+
+    async def generate(self, prompt: str) -> str:
+        response = await self.client.aio.models.generate_content(
+            model=self.model,
+            contents=prompt,
+        )
+        return response.text
+
+class FakeSummaryBackend:
+    """Deterministic offline backend for tests and benchmarks."""
+
+    name = "fake"
+
+    def __init__(self, latency: float = settings.SUMMARY_FAKE_LATENCY):
+        self.latency = latency
+
+    async def generate(self, prompt: str) -> str:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        digest = hashlib.sha256(prompt.encode()).hexdigest()[:12]
+        return f"# 🧾 Summary\nFake summary {digest} of a {len(prompt)} character prompt."
+
+SUMMARY_BACKENDS = {
+    "gemini": GeminiSummaryBackend,
+    "fake": FakeSummaryBackend,
+}
+
+def get_summary_backend(name: str = settings.SUMMARY_BACKEND):
+    try:
+        return SUMMARY_BACKENDS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown summary backend: {name}")
+
+def format_transcript(messages: List[dict]) -> str:
+    return "\n".join([
         f"{msg['role'].upper()}: {msg['text']}"
         for msg in messages
     ])
-    # Create the prompt
-    prompt = f"""You are an expert in analyzing human conversations. Please analyze the following transcript between two individuals and generate a **high-quality, insightful summary** in markdown format. Focus on extracting the **most relevant information**, including tone, intent, emotions, topics discussed, outcomes, and actionable insights.
+
+def build_summary_prompt(conversation: str) -> str:
+    return f"""You are an expert in analyzing human conversations. Please analyze the following transcript between two individuals and generate a **high-quality, insightful summary** in markdown format. Focus on extracting the **most relevant information**, including tone, intent, emotions, topics discussed, outcomes, and actionable insights.
 
 Please structure your response using the following format:
 
@@ -44,15 +87,14 @@ A brief overview capturing the essence of the conversation — who is involved,
 
 Please return the analysis in the markdown format as structured above."""
 
-    # Use Groq to generate summary
-    # llm = groq.LLM(model="llama3-8b-8192")
-    # response = await llm.complete(prompt)
-    
+async def generate_call_summary(messages: List[dict], backend=None) -> str:
+    """Generate a markdown summary of the call with the configured LLM backend.
 
-    client = genai.Client(api_key=settings.GEMINI_API_KEY)
+    Long transcripts are summarized in chunks and then combined, see
+    app/services/chunked_summarizer.py.
+    """
+    from app.services.chunked_summarizer import ChunkedSummarizer
 
-    response = client.models.generate_content(
-        model="gemini-2.0-flash",
-        contents=prompt,
-    )
-    return response.text
\ No newline at end of file
+    if backend is None:
+        backend = get_summary_backend()
+    return await ChunkedSummarizer(backend).summarize(messages)
\ No newline at end of file
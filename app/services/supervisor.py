@@ -0,0 +1,146 @@
+import asyncio
+import logging
+import os
+import signal
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence
+
+from prometheus_client import multiprocess
+
+from app.core.config import settings
+from app.core.metrics import PROCESS_DRAIN_SECONDS, PROCESS_RESTARTS
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ProcessSpec:
+    """One process run by the Supervisor."""
+
+    name: str  # unique, e.g. "api-0"
+    service: str  # metric label shared by the copies of a process, e.g. "api"
+    argv: Sequence[str]
+    env: Dict[str, str] = field(default_factory=dict)  # on top of the supervisor's own environment
+    stop_phase: int = 0  # processes are stopped phase by phase, lowest first
+    stop_timeout: float = settings.SUPERVISOR_STOP_TIMEOUT  # seconds from SIGTERM until it is killed
+    pass_fds: Sequence[int] = ()
+
+
+class Supervisor:
+    """Runs a set of processes, restarts any that exit, and stops them in phases.
+
+    Each process gets its own session, so a Ctrl+C in the terminal reaches
+    only the supervisor and every process is sent exactly one SIGTERM: a
+    LiveKit worker treats a second one as "exit now" and cuts off its calls.
+    After `stop()` the processes of each stop_phase are sent SIGTERM together
+    and waited for before the next phase starts; one still running after its
+    stop_timeout is killed with its process group (e.g. a worker's job
+    processes).
+
+    A process that exits before `stop()` is restarted after a delay that
+    doubles with every consecutive crash, up to `max_restart_delay`, and
+    resets once a process has stayed up for `stable_after` seconds.
+    """
+
+    def __init__(
+        self,
+        specs: Sequence[ProcessSpec],
+        restart_delay: float = settings.SUPERVISOR_RESTART_DELAY,
+        max_restart_delay: float = settings.SUPERVISOR_MAX_RESTART_DELAY,
+        stable_after: float = 60.0,
+    ):
+        names = [spec.name for spec in specs]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Duplicate process names in {names}")
+        self.specs: List[ProcessSpec] = list(specs)
+        self.restart_delay = restart_delay
+        self.max_restart_delay = max_restart_delay
+        self.stable_after = stable_after
+        self._stopping = asyncio.Event()
+        self._phases: Dict[int, asyncio.Event] = {spec.stop_phase: asyncio.Event() for spec in self.specs}
+
+    async def run(self) -> None:
+        """Start every process and keep it running until `stop()` is called, then stop them all."""
+        tasks = {spec.name: asyncio.create_task(self._supervise(spec), name=f"supervise-{spec.name}")
+                 for spec in self.specs}
+        await self._stopping.wait()
+        logger.info("Stopping %d processes", len(self.specs))
+        for phase in sorted(self._phases):
+            self._phases[phase].set()
+            await asyncio.gather(*(tasks[spec.name] for spec in self.specs if spec.stop_phase == phase))
+        logger.info("All processes stopped")
+
+    def stop(self) -> None:
+        self._stopping.set()
+
+    async def _supervise(self, spec: ProcessSpec) -> None:
+        stopping = self._phases[spec.stop_phase]
+        crashes = 0
+        while not stopping.is_set():
+            started = time.monotonic()
+            process = await self._start(spec)
+            if process is not None:
+                exited = asyncio.create_task(process.wait())
+                stop_requested = asyncio.create_task(stopping.wait())
+                await asyncio.wait({exited, stop_requested}, return_when=asyncio.FIRST_COMPLETED)
+                stop_requested.cancel()
+                if not exited.done():
+                    await self._terminate(spec, process, exited)
+                    return
+                self._reap(process)
+                if stopping.is_set():
+                    return
+
+            uptime = time.monotonic() - started
+            crashes = 1 if uptime >= self.stable_after else crashes + 1
+            delay = min(self.restart_delay * 2 ** (crashes - 1), self.max_restart_delay)
+            logger.error(
+                "%s exited with %s after %.1fs; restarting it in %.1fs",
+                spec.name, process.returncode if process else None, uptime, delay,
+            )
+            try:
+                await asyncio.wait_for(stopping.wait(), delay)
+                return
+            except asyncio.TimeoutError:
+                PROCESS_RESTARTS.labels(service=spec.service).inc()
+
+    async def _start(self, spec: ProcessSpec) -> Optional[asyncio.subprocess.Process]:
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *spec.argv,
+                env={**os.environ, **spec.env},
+                pass_fds=spec.pass_fds,
+                start_new_session=True,
+            )
+        except OSError:
+            logger.exception("Failed to start %s", spec.name)
+            return None
+        logger.info("Started %s (pid %d)", spec.name, process.pid)
+        return process
+
+    async def _terminate(self, spec: ProcessSpec, process: asyncio.subprocess.Process,
+                         exited: "asyncio.Task[int]") -> None:
+        logger.info("Sending SIGTERM to %s (pid %d)", spec.name, process.pid)
+        started = time.monotonic()
+        process.terminate()
+        try:
+            await asyncio.wait_for(asyncio.shield(exited), spec.stop_timeout)
+            outcome = "exited"
+        except asyncio.TimeoutError:
+            logger.warning("%s did not exit within %.0fs of SIGTERM; killing it", spec.name, spec.stop_timeout)
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+            await exited
+            outcome = "killed"
+        elapsed = time.monotonic() - started
+        PROCESS_DRAIN_SECONDS.labels(service=spec.service, outcome=outcome).observe(elapsed)
+        logger.info("%s %s with %s after %.1fs", spec.name, outcome, process.returncode, elapsed)
+        self._reap(process)
+
+    def _reap(self, process: asyncio.subprocess.Process) -> None:
+        if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+            # Its live gauges (queue depths, pool checkouts) no longer count towards /metrics
+            multiprocess.mark_process_dead(process.pid)
@@ -0,0 +1,89 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy.exc import IntegrityError
+
+from app.core.config import settings
+from app.core.metrics import TRANSCRIPT_COMPACTION_BYTES, TRANSCRIPTS_COMPACTED
+from app.db.session import AsyncSessionLocal
+from app.repositories.transcript_repository import TranscriptRepository, resolve_codec
+
+logger = logging.getLogger(__name__)
+
+
+class TranscriptCompactor:
+    """Moves the turns of ended calls from call_history into call_transcripts.
+
+    Each sweep compacts up to `batch_size` calls that ended more than
+    `compact_after` seconds ago, one transaction per call, so call_history
+    only holds live and recently ended calls. Reads go through
+    CallRepository.get_call_history and see both tiers, so a call may be
+    compacted at any point after it ends; the delay only keeps the turns
+    written by a late shutdown hook in the same compaction.
+    """
+
+    def __init__(
+        self,
+        interval: float = settings.TRANSCRIPT_COMPACT_INTERVAL,
+        compact_after: float = settings.TRANSCRIPT_COMPACT_AFTER,
+        batch_size: int = settings.TRANSCRIPT_COMPACT_BATCH_SIZE,
+        codec: str = settings.TRANSCRIPT_CODEC,
+        session_factory=AsyncSessionLocal,
+    ):
+        self.interval = interval
+        self.compact_after = compact_after
+        self.batch_size = batch_size
+        self.codec = resolve_codec(codec)
+        self.session_factory = session_factory
+        self._stopping = asyncio.Event()
+
+    async def run(self) -> None:
+        """Sweep every `interval` seconds until `stop()` is called; back to back while there is a backlog."""
+        while not self._stopping.is_set():
+            compacted = 0
+            try:
+                compacted = await self.run_once()
+            except Exception:
+                logger.exception("Transcript compaction sweep failed")
+            if compacted >= self.batch_size:
+                continue
+            try:
+                await asyncio.wait_for(self._stopping.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def stop(self) -> None:
+        self._stopping.set()
+
+    async def run_once(self, now: Optional[datetime] = None) -> int:
+        """Run one sweep. Returns the number of calls compacted."""
+        now = now or datetime.now(timezone.utc)
+        async with self.session_factory() as db:
+            call_ids = await TranscriptRepository(db).get_compactable_calls(
+                now - timedelta(seconds=self.compact_after), limit=self.batch_size
+            )
+        compacted = 0
+        for call_id in call_ids:
+            async with self.session_factory() as db:
+                try:
+                    transcript = await TranscriptRepository(db).compact(call_id, codec=self.codec)
+                except IntegrityError:
+                    # Another summary worker compacted it first
+                    await db.rollback()
+                    continue
+                except Exception:
+                    # Left in call_history, where it is still read from; retried next sweep
+                    logger.exception("Failed to compact the transcript of call %s", call_id)
+                    await db.rollback()
+                    continue
+            if transcript is None:
+                continue
+            compacted += 1
+            TRANSCRIPTS_COMPACTED.inc()
+            TRANSCRIPT_COMPACTION_BYTES.labels(stage="raw").inc(transcript.raw_size)
+            TRANSCRIPT_COMPACTION_BYTES.labels(stage="compressed").inc(len(transcript.data))
+        if compacted:
+            logger.info("Compacted the transcripts of %d calls", compacted)
+        return compacted
@@ -0,0 +1,198 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from collections import Counter
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+from app.core.metrics import (
+    TRANSCRIPT_FLUSH_BATCH_SIZE,
+    TRANSCRIPT_FLUSH_SECONDS,
+    TRANSCRIPT_QUEUE_DEPTH,
+    TRANSCRIPT_TURNS_DROPPED,
+)
+from app.db.session import AsyncSessionLocal
+from app.models.call import TURN_LATENCY_FIELDS
+from app.repositories.call_repository import CallRepository
+
+logger = logging.getLogger(__name__)
+
+
+class TranscriptWriteError(Exception):
+    """Turns of a call were dropped instead of written."""
+
+
+class TranscriptWriter:
+    """Buffers transcript turns from every live call in this process and writes
+    them to call_history in batches.
+
+    Turns are written in the order they were submitted, so ordering within a
+    call is preserved. A batch is flushed once `batch_size` turns are waiting or
+    `flush_interval` seconds have passed since the first one arrived. A batch
+    whose write fails is retried once after `retry_delay` seconds, then
+    dropped; `flush` reports the dropped turns of a call.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = settings.TRANSCRIPT_BATCH_SIZE,
+        flush_interval: float = settings.TRANSCRIPT_FLUSH_INTERVAL,
+        max_queue_size: int = settings.TRANSCRIPT_QUEUE_SIZE,
+        retry_delay: float = 1.0,
+        session_factory=AsyncSessionLocal,
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retry_delay = retry_delay
+        self.session_factory = session_factory
+        # Turns dropped per call id, until its flush reports them
+        self._dropped: Counter = Counter()
+        # Turns queued or being written per call id, and the events their flushes wait on
+        self._pending: Counter = Counter()
+        self._drained: Dict[int, asyncio.Event] = {}
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        self._wakeup = asyncio.Event()
+        self._flush_now = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="transcript-writer")
+
+    def submit(self, call_id: int, role: str, message: str, latency: Optional[dict] = None) -> bool:
+        """Queue a turn for writing. Safe to call from synchronous event handlers.
+
+        `latency` holds the turn's latency spans (see TURN_LATENCY_FIELDS).
+        """
+        turn = {
+            "call_id": call_id,
+            "role": role,
+            "message": message,
+            "created_at": datetime.now(timezone.utc),
+            # Every row carries the same keys so a batch is one executemany
+            **dict.fromkeys(TURN_LATENCY_FIELDS),
+            **(latency or {}),
+        }
+        try:
+            self._queue.put_nowait(turn)
+        except asyncio.QueueFull:
+            TRANSCRIPT_TURNS_DROPPED.inc()
+            self._dropped[call_id] += 1
+            logger.error("Transcript queue full, dropping turn for call %s", call_id)
+            self._flush_now.set()
+            self._wakeup.set()
+            return False
+        TRANSCRIPT_QUEUE_DEPTH.inc()
+        self._pending[call_id] += 1
+        self._wakeup.set()
+        return True
+
+    async def flush(self, call_id: Optional[int] = None) -> None:
+        """Wait until the turns of `call_id` (of every call, if None) submitted so far have been written.
+
+        Turns of other calls are not waited for. Raises TranscriptWriteError if
+        turns of `call_id` (of any call, if None) were dropped since the last
+        flush that reported them.
+        """
+        if self._task is not None and not self._task.done():
+            self._flush_now.set()
+            self._wakeup.set()
+            if call_id is None:
+                await self._queue.join()
+            elif self._pending[call_id]:
+                await self._drained.setdefault(call_id, asyncio.Event()).wait()
+        if call_id is None:
+            dropped = sum(self._dropped.values())
+            self._dropped.clear()
+        else:
+            dropped = self._dropped.pop(call_id, 0)
+        if dropped:
+            whose = "" if call_id is None else f" of call {call_id}"
+            raise TranscriptWriteError(f"{dropped} transcript turns{whose} were not written")
+
+    async def aclose(self) -> None:
+        try:
+            await self.flush()
+        finally:
+            if self._task is not None:
+                self._task.cancel()
+                try:
+                    await self._task
+                except asyncio.CancelledError:
+                    pass
+                self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                    continue
+                except asyncio.QueueEmpty:
+                    pass
+                remaining = deadline - loop.time()
+                if self._flush_now.is_set() or remaining <= 0:
+                    break
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), remaining)
+                except asyncio.TimeoutError:
+                    break
+
+            if self._queue.empty():
+                self._flush_now.clear()
+
+            try:
+                await self._write(batch)
+            finally:
+                TRANSCRIPT_QUEUE_DEPTH.dec(len(batch))
+                for turn in batch:
+                    self._turn_done(turn["call_id"])
+                    self._queue.task_done()
+
+    def _turn_done(self, call_id: int) -> None:
+        self._pending[call_id] -= 1
+        if self._pending[call_id] <= 0:
+            del self._pending[call_id]
+            drained = self._drained.pop(call_id, None)
+            if drained is not None:
+                drained.set()
+
+    async def _write(self, batch: List[dict]) -> None:
+        started = time.perf_counter()
+        for attempt in range(2):
+            try:
+                async with self.session_factory() as db:
+                    await CallRepository(db).add_call_history_bulk(batch)
+                break
+            except Exception:
+                if attempt == 0:
+                    logger.warning("Failed to write %d transcript turns, retrying", len(batch), exc_info=True)
+                    await asyncio.sleep(self.retry_delay)
+                    continue
+                TRANSCRIPT_TURNS_DROPPED.inc(len(batch))
+                self._dropped.update(turn["call_id"] for turn in batch)
+                logger.exception("Failed to write %d transcript turns", len(batch))
+                return
+        TRANSCRIPT_FLUSH_SECONDS.observe(time.perf_counter() - started)
+        TRANSCRIPT_FLUSH_BATCH_SIZE.observe(len(batch))
+
+
+_writer: Optional[TranscriptWriter] = None
+
+
+def get_transcript_writer() -> TranscriptWriter:
+    """Return this process's transcript writer, starting it on first use."""
+    global _writer
+    if _writer is None:
+        _writer = TranscriptWriter()
+    _writer.start()
+    return _writer
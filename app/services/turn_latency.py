@@ -0,0 +1,91 @@
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from livekit.agents.metrics import EOUMetrics, LLMMetrics, TTSMetrics
+
+from app.core.metrics import (
+    VOICE_EOU_DELAY_SECONDS,
+    VOICE_LLM_TTFT_SECONDS,
+    VOICE_RESPONSE_LATENCY_SECONDS,
+    VOICE_STT_DELAY_SECONDS,
+    VOICE_TTS_TTFB_SECONDS,
+)
+from app.models.call import TURN_LATENCY_FIELDS
+
+
+class TurnLatencyTracker:
+    """Collects the latency spans of each agent reply from AgentSession events.
+
+    The pipeline reports end-of-turn, LLM and TTS metrics tagged with the id of
+    the reply ("speech") they belong to; the end-to-end response latency is
+    measured from the user and agent state changes. Every span is exported to
+    Prometheus as it arrives, and `take_turn()` hands the spans of the latest
+    reply to the transcript row for that reply.
+    """
+
+    def __init__(self, stt_model: str, llm_model: str, tts_model: str, max_pending: int = 16):
+        self.stt_model = stt_model
+        self.llm_model = llm_model
+        self.tts_model = tts_model
+        self.max_pending = max_pending
+        self._speeches: "OrderedDict[str, Dict[str, float]]" = OrderedDict()
+        self._user_stopped_at: Optional[float] = None
+        self._response_latency: Optional[float] = None
+
+    def _spans(self, speech_id: Optional[str]) -> Dict[str, float]:
+        key = speech_id or ""
+        if key not in self._speeches:
+            self._speeches[key] = {}
+            while len(self._speeches) > self.max_pending:
+                self._speeches.popitem(last=False)
+        return self._speeches[key]
+
+    def _latest_speech(self) -> Optional[str]:
+        return next(reversed(self._speeches), None)
+
+    def on_metrics(self, metrics) -> None:
+        if isinstance(metrics, EOUMetrics):
+            spans = self._spans(metrics.speech_id)
+            spans["eou_delay"] = metrics.end_of_utterance_delay
+            spans["stt_delay"] = metrics.transcription_delay
+            VOICE_EOU_DELAY_SECONDS.observe(metrics.end_of_utterance_delay)
+            VOICE_STT_DELAY_SECONDS.labels(model=self.stt_model).observe(metrics.transcription_delay)
+        elif isinstance(metrics, LLMMetrics):
+            if metrics.cancelled:
+                return
+            # A speculative request (VOICE_LOW_LATENCY) is made before its reply exists
+            # and has no speech id; it belongs to the reply that was just committed
+            spans = self._spans(metrics.speech_id or self._latest_speech())
+            # A reply with tool calls makes several LLM requests; the first one gates the audio
+            spans.setdefault("llm_ttft", metrics.ttft)
+            VOICE_LLM_TTFT_SECONDS.labels(model=self.llm_model).observe(metrics.ttft)
+        elif isinstance(metrics, TTSMetrics):
+            if metrics.cancelled or metrics.ttfb < 0:
+                return
+            spans = self._spans(metrics.speech_id or self._latest_speech())
+            spans.setdefault("tts_ttfb", metrics.ttfb)
+            VOICE_TTS_TTFB_SECONDS.labels(model=self.tts_model).observe(metrics.ttfb)
+
+    def on_user_state(self, old_state: str, new_state: str) -> None:
+        if old_state == "speaking" and new_state == "listening":
+            self._user_stopped_at = time.perf_counter()
+
+    def on_agent_state(self, new_state: str) -> None:
+        if new_state == "speaking" and self._user_stopped_at is not None:
+            self._response_latency = time.perf_counter() - self._user_stopped_at
+            self._user_stopped_at = None
+            VOICE_RESPONSE_LATENCY_SECONDS.labels(llm=self.llm_model, tts=self.tts_model).observe(
+                self._response_latency
+            )
+
+    def take_turn(self) -> Dict[str, Optional[float]]:
+        """Spans of the most recent reply, with every field present (None when not measured)."""
+        turn: Dict[str, Optional[float]] = dict.fromkeys(TURN_LATENCY_FIELDS)
+        if self._speeches:
+            _, spans = self._speeches.popitem(last=True)
+            turn.update(spans)
+            self._speeches.clear()
+        turn["response_latency"] = self._response_latency
+        self._response_latency = None
+        return turn
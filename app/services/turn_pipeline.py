@@ -0,0 +1,230 @@
+import asyncio
+import functools
+import logging
+from typing import AsyncIterator, Callable, Generic, List, Optional, TypeVar
+
+from livekit import rtc
+from livekit.agents import APIConnectOptions, llm, tokenize, tts
+from livekit.agents.utils import aio
+
+from app.core.metrics import VOICE_SPECULATIVE_REPLIES
+
+logger = logging.getLogger(__name__)
+
+# Parts of the low-latency turn pipeline (VOICE_LOW_LATENCY), used by
+# LowLatencyVoiceAgent. The VAD ends an utterance after a short pause and its
+# transcript starts a SpeculativeReply (LLM text and TTS audio) while the
+# session waits out the rest of the turn's silence. If the user's turn is then
+# committed with that transcript the reply is played from its buffers;
+# otherwise it is cancelled and the reply is generated as usual.
+
+T = TypeVar("T")
+
+
+class _Replay(Generic[T]):
+    """Items produced by a background task, buffered and replayed from the start to one late reader."""
+
+    def __init__(self):
+        self._items: List[T] = []
+        self._closed = False
+        self._error: Optional[BaseException] = None
+        self._changed = asyncio.Event()
+
+    def append(self, item: T) -> None:
+        self._items.append(item)
+        self._changed.set()
+
+    def close(self, error: Optional[BaseException] = None) -> None:
+        if not self._closed:
+            self._closed = True
+            self._error = error
+            self._changed.set()
+
+    async def __aiter__(self) -> AsyncIterator[T]:
+        index = 0
+        while True:
+            while index < len(self._items):
+                yield self._items[index]
+                index += 1
+            if self._closed:
+                if self._error is not None:
+                    raise self._error
+                return
+            self._changed.clear()
+            await self._changed.wait()
+
+
+class SpeculativeReply:
+    """The reply to `transcript` as the user's next turn, generated before the turn is committed.
+
+    The LLM text is streamed into a TTS stream as it arrives, and both are
+    buffered until the pipeline asks for them with `text()` and `audio()`.
+    `context_ids` are the chat items the reply was generated after.
+    """
+
+    def __init__(
+        self,
+        transcript: str,
+        chat_ctx: llm.ChatContext,
+        llm_client: llm.LLM,
+        tts_client: tts.TTS,
+        llm_conn_options: APIConnectOptions,
+        tts_conn_options: APIConnectOptions,
+    ):
+        self.transcript = transcript
+        self.context_ids = [item.id for item in chat_ctx.items]
+        reply_ctx = chat_ctx.copy()
+        reply_ctx.add_message(role="user", content=transcript)
+        if not tts_client.capabilities.streaming:
+            # As the default tts_node does: synthesize sentence by sentence
+            tts_client = tts.StreamAdapter(tts=tts_client, sentence_tokenizer=tokenize.basic.SentenceTokenizer())
+        self._text: _Replay[llm.ChatChunk] = _Replay()
+        self._audio: _Replay[rtc.AudioFrame] = _Replay()
+        self._task = asyncio.create_task(
+            self._run(reply_ctx, llm_client, tts_client, llm_conn_options, tts_conn_options),
+            name="speculative-reply",
+        )
+
+    def text(self) -> AsyncIterator[llm.ChatChunk]:
+        return self._text.__aiter__()
+
+    def audio(self) -> AsyncIterator[rtc.AudioFrame]:
+        return self._audio.__aiter__()
+
+    def matches(self, chat_ctx: llm.ChatContext) -> bool:
+        """Whether `chat_ctx`, as passed to llm_node, is the context this reply was generated for."""
+        items = chat_ctx.items
+        if not items:
+            return False
+        message = items[-1]
+        return (
+            message.type == "message"
+            and message.role == "user"
+            and message.text_content == self.transcript
+            and [item.id for item in items[:-1]] == self.context_ids
+        )
+
+    def cancel(self) -> None:
+        self._task.cancel()
+
+    async def _run(self, chat_ctx, llm_client, tts_client, llm_conn_options, tts_conn_options) -> None:
+        error: Optional[BaseException] = None
+        try:
+            async with tts_client.stream(conn_options=tts_conn_options) as tts_stream:
+                synthesize = asyncio.create_task(self._synthesize(tts_stream))
+                try:
+                    async with llm_client.chat(chat_ctx=chat_ctx, conn_options=llm_conn_options) as stream:
+                        async for chunk in stream:
+                            self._text.append(chunk)
+                            if chunk.delta and chunk.delta.content:
+                                tts_stream.push_text(chunk.delta.content)
+                    self._text.close()
+                    tts_stream.end_input()
+                    await synthesize
+                finally:
+                    await aio.cancel_and_wait(synthesize)
+        except asyncio.CancelledError as e:
+            error = e
+            raise
+        except Exception as e:
+            # Raised to the pipeline by text() or audio(), like a failed request of its own
+            error = e
+        finally:
+            self._text.close(error)
+            self._audio.close(error)
+
+    async def _synthesize(self, tts_stream: tts.SynthesizeStream) -> None:
+        async for event in tts_stream:
+            self._audio.append(event.frame)
+        self._audio.close()
+
+
+class TurnSpeculator:
+    """Keeps one SpeculativeReply for the user's turn in progress.
+
+    The turn's transcript is built from its final transcripts the way
+    LiveKit's audio recognition builds the committed one, and each time it
+    grows the reply is replaced. Once the turn has ended, `take` hands the
+    reply to the pipeline if the committed turn matches it and cancels it
+    otherwise; `drop` cancels it if the pipeline is not going to take it.
+    """
+
+    def __init__(self, start: Callable[[str], SpeculativeReply]):
+        self.start = start
+        self._transcript = ""
+        self._reply: Optional[SpeculativeReply] = None
+        self._turn_ended = False
+
+    def on_final_transcript(self, text: str) -> None:
+        if not text:
+            return
+        self._transcript = f"{self._transcript} {text}".lstrip()
+        self._discard()
+        self._reply = self.start(self._transcript)
+        self._turn_ended = False
+
+    def end_turn(self) -> None:
+        """The user's turn was committed; its reply stays for `take` or `drop`."""
+        self._transcript = ""
+        self._turn_ended = True
+
+    def take(self, chat_ctx: llm.ChatContext) -> Optional[SpeculativeReply]:
+        if not self._turn_ended:
+            # A reply not to a user turn (e.g. a greeting); the turn in progress keeps its own
+            return None
+        reply, self._reply = self._reply, None
+        if reply is None:
+            return None
+        if not reply.matches(chat_ctx):
+            VOICE_SPECULATIVE_REPLIES.labels(result="discarded").inc()
+            reply.cancel()
+            return None
+        VOICE_SPECULATIVE_REPLIES.labels(result="used").inc()
+        return reply
+
+    def drop(self) -> None:
+        """Cancel the ended turn's reply if it was not taken, e.g. the turn was interrupted."""
+        if self._turn_ended:
+            self._discard()
+
+    def cancel(self) -> None:
+        self._transcript = ""
+        self._discard()
+
+    def _discard(self) -> None:
+        if self._reply is not None:
+            VOICE_SPECULATIVE_REPLIES.labels(result="discarded").inc()
+            self._reply.cancel()
+            self._reply = None
+
+
+class DeferredEffects:
+    """A call's bookkeeping (transcript rows, transcript logs, live events), held
+    while the agent's reply is being generated.
+
+    Work passed to `run` is done at once, unless `hold()` was called: then it
+    waits for `release()` and is done in order. None of it is needed for the
+    reply, so the low-latency agent holds it from the moment a user turn is
+    committed until the reply starts playing.
+    """
+
+    def __init__(self):
+        self._held: Optional[List[Callable[[], None]]] = None
+
+    def run(self, fn: Callable, *args, **kwargs) -> None:
+        if self._held is None:
+            fn(*args, **kwargs)
+        else:
+            self._held.append(functools.partial(fn, *args, **kwargs))
+
+    def hold(self) -> None:
+        if self._held is None:
+            self._held = []
+
+    def release(self) -> None:
+        held, self._held = self._held, None
+        for effect in held or ():
+            try:
+                effect()
+            except Exception:
+                logger.exception("Deferred call bookkeeping failed")
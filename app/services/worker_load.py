@@ -0,0 +1,96 @@
+import asyncio
+import logging
+import threading
+from typing import Optional
+
+from livekit.agents import JobRequest, Worker
+from livekit.agents.utils.hw import get_cpu_monitor
+
+from app.core.config import settings
+from app.core.metrics import WORKER_LOAD, WORKER_LOOP_LAG_SECONDS, WORKER_JOBS_REJECTED
+
+logger = logging.getLogger(__name__)
+
+
+class LoopLagMonitor:
+    """Measures how late the event loop runs a timer that should fire every `interval` seconds.
+
+    Runs in each call's job process, whose loop handles the call's audio, and
+    keeps an exponentially weighted average so one slow callback does not
+    dominate it.
+    """
+
+    def __init__(self, interval: float = 0.1, smoothing: float = 0.3):
+        self.interval = interval
+        self.smoothing = smoothing
+        self.lag = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="loop-lag-monitor")
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - expected)
+            self.lag += self.smoothing * (lag - self.lag)
+            WORKER_LOOP_LAG_SECONDS.observe(lag)
+
+
+class WorkerLoad:
+    """Load function and job request filter for the LiveKit worker.
+
+    The load reported to LiveKit is the higher of two ratios, each 1.0 at its limit:
+      - active jobs / `max_jobs`
+      - host CPU usage / `cpu_limit`
+    With `load_threshold=1.0` the worker stops being offered jobs as soon as
+    either is at its limit. Load updates only every half second, so
+    `request_fnc` also rejects jobs beyond `max_jobs` outright.
+
+    Event-loop lag is left out: calls run in their own job processes, which
+    have no channel back to this function, and the worker's own loop barely
+    lags as calls pile up. Job processes export their lag as a metric instead.
+    """
+
+    def __init__(
+        self,
+        max_jobs: int = settings.WORKER_MAX_CONCURRENT_CALLS,
+        cpu_limit: float = settings.WORKER_CPU_LIMIT,
+    ):
+        self.max_jobs = max_jobs
+        self.cpu_limit = cpu_limit
+        self._cpu_monitor = get_cpu_monitor()
+        self._worker: Optional[Worker] = None
+        self._lock = threading.Lock()
+
+    def active_jobs(self) -> int:
+        return len(self._worker.active_jobs) if self._worker is not None else 0
+
+    def compute(self, active_jobs: int, cpu: float) -> float:
+        return min(1.0, max(active_jobs / self.max_jobs, cpu / self.cpu_limit))
+
+    def __call__(self, worker: Worker) -> float:
+        """Called by the worker from a thread every UPDATE_LOAD_INTERVAL."""
+        with self._lock:
+            self._worker = worker
+            cpu = self._cpu_monitor.cpu_percent(interval=0.5)
+            load = self.compute(self.active_jobs(), cpu)
+        WORKER_LOAD.set(load)
+        return load
+
+    async def request_fnc(self, request: JobRequest) -> None:
+        active = self.active_jobs()
+        if active >= self.max_jobs:
+            WORKER_JOBS_REJECTED.inc()
+            logger.warning("Rejecting job %s: %d/%d calls active", request.job.id, active, self.max_jobs)
+            await request.reject()
+            return
+        await request.accept()
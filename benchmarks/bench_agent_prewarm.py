@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Answer-to-first-agent-audio benchmark for the LiveKit worker, with stub providers.
+
+Each simulated call dials, rings for `--ring` seconds, is answered, and then
+runs one STT -> LLM -> TTS turn. The stubs charge `--vad-load` for loading the
+VAD model, `--connect` for each provider's first connection and a fixed latency
+per request. Three setups are compared:
+  - "cold":            VAD and clients built after the answer, connections
+                       opened on first use (how the entrypoint used to work)
+  - "dial-prewarm":    clients built and connections opened while ringing, but
+                       no process prewarm
+  - "process-prewarm": `prewarm()` ran when the idle process started, as with
+                       `prewarm_fnc` in worker.py
+Job-to-dial is how long the job spends before the SIP dial goes out.
+
+Run with: python benchmarks/bench_agent_prewarm.py --calls 10 --ring 1.0
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class StubConnection:
+    """A provider connection that takes `connect` seconds to open the first time."""
+
+    def __init__(self, connect: float):
+        self.connect = connect
+        self._opening = None
+
+    def prewarm(self) -> None:
+        if self._opening is None:
+            self._opening = asyncio.ensure_future(asyncio.sleep(self.connect))
+
+    async def ready(self) -> None:
+        self.prewarm()
+        await self._opening
+
+
+class StubClient:
+    def __init__(self, connect: float, latency: float, init: float):
+        time.sleep(init)
+        self.connection = StubConnection(connect)
+        self.latency = latency
+
+    def prewarm(self) -> None:
+        self.connection.prewarm()
+
+    async def request(self) -> None:
+        await self.connection.ready()
+        await asyncio.sleep(self.latency)
+
+
+async def simulate_call(livekit_process, proc, args, mode: str) -> tuple:
+    """Returns (job-to-dial, answer-to-first-audio) in seconds."""
+    job_started = time.perf_counter()
+    if mode == "cold":
+        dialed_after = time.perf_counter() - job_started
+        await asyncio.sleep(args.ring)
+        answered_at = time.perf_counter()
+        livekit_process.silero.VAD.load()
+        stt, llm, tts = livekit_process.build_provider_clients()
+    else:
+        # Same order as the entrypoint
+        proc.userdata.get("vad") or livekit_process.silero.VAD.load()
+        stt, llm, tts = proc.userdata.pop("clients", None) or livekit_process.build_provider_clients()
+        tts.prewarm()
+        llm.prewarm()
+        dialed_after = time.perf_counter() - job_started
+        await asyncio.sleep(args.ring)
+        answered_at = time.perf_counter()
+
+    # The callee's first utterance, then the agent's reply up to its first audio frame
+    await stt.request()
+    await llm.request()
+    await tts.request()
+    return dialed_after, time.perf_counter() - answered_at
+
+
+async def run(args) -> None:
+    from app.services import livekit_process
+
+    class StubVAD:
+        @staticmethod
+        def load():
+            time.sleep(args.vad_load)
+            return object()
+
+    livekit_process.silero = SimpleNamespace(VAD=StubVAD)
+    livekit_process.build_provider_clients = lambda: (
+        StubClient(args.connect, args.stt, args.client_init),
+        StubClient(args.connect, args.llm_ttft, args.client_init),
+        StubClient(args.connect, args.tts_ttfb, args.client_init),
+    )
+
+    floor = args.stt + args.llm_ttft + args.tts_ttfb
+    print(f"provider latency floor: {floor * 1000:.0f}ms")
+    for mode in ("cold", "dial-prewarm", "process-prewarm"):
+        dial_delays = []
+        latencies = []
+        prewarm_times = []
+        for _ in range(args.calls):
+            # Every job gets a fresh process, as with the default process executor
+            proc = SimpleNamespace(userdata={})
+            if mode == "process-prewarm":
+                started = time.perf_counter()
+                livekit_process.prewarm(proc)
+                prewarm_times.append(time.perf_counter() - started)
+            dial_delay, latency = await simulate_call(livekit_process, proc, args, mode)
+            dial_delays.append(dial_delay)
+            latencies.append(latency)
+        line = (f"{mode:>16}: answer-to-first-audio p50={statistics.median(latencies) * 1000:.0f}ms "
+                f"max={max(latencies) * 1000:.0f}ms  job-to-dial p50={statistics.median(dial_delays) * 1000:.0f}ms")
+        if prewarm_times:
+            line += f"  (prewarm {statistics.median(prewarm_times) * 1000:.0f}ms, off the call path)"
+        print(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=10)
+    parser.add_argument("--ring", type=float, default=1.0, help="seconds between dial and answer")
+    parser.add_argument("--vad-load", type=float, default=0.3, help="VAD model load time in seconds")
+    parser.add_argument("--client-init", type=float, default=0.02, help="provider client construction time")
+    parser.add_argument("--connect", type=float, default=0.15, help="first connection (TLS/websocket) time")
+    parser.add_argument("--stt", type=float, default=0.3, help="STT request latency")
+    parser.add_argument("--llm-ttft", type=float, default=0.25, help="LLM time to first token")
+    parser.add_argument("--tts-ttfb", type=float, default=0.15, help="TTS time to first audio byte")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DATABASE_BACKEND"] = "sqlite"
+        os.environ["SQLITE_PATH"] = os.path.join(tmp, "bench.db")
+        os.environ.pop("SQLALCHEMY_DATABASE_URI", None)
+        asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Load benchmark: blocking Session handlers vs AsyncSession handlers.
+
+Seeds a throwaway SQLite database, then drives the same reads through
+  - "sync":  the old `def` handlers using a blocking Session (FastAPI threadpool)
+  - "async": the real agents/calls routers backed by AsyncSession
+with N concurrent clients and reports p50/p95/p99 latency for each.
+
+Run with: python benchmarks/bench_async_db.py --clients 200 --requests 25
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from fastapi import Depends, FastAPI, HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.api.api_v1.endpoints import agents, calls
+from app.db.session import create_db_engine, get_read_db
+from app.models.base import Base
+from app.models.call import Agent, Call, CallHistory
+
+
+def seed(path: str, n_agents: int, n_calls: int, turns_per_call: int) -> None:
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        db.add_all(Agent(name=f"agent-{i}", prompt="You are a collections agent.", agent_type="collections")
+                   for i in range(n_agents))
+        db.flush()
+        for i in range(n_calls):
+            call = Call(defaulter_name=f"defaulter-{i}", phone_number=f"+1555{i:07d}",
+                        agent_id=1 + i % n_agents, outcome="Completed", summary="summary " * 50)
+            db.add(call)
+            db.flush()
+            db.add_all(CallHistory(call_id=call.id, role="agent" if t % 2 else "defaulter",
+                                   message=f"turn {t}") for t in range(turns_per_call))
+        db.commit()
+    engine.dispose()
+
+
+def build_sync_app(path: str, clients: int) -> FastAPI:
+    """The pre-AsyncSession handlers, kept here only as the benchmark baseline.
+
+    The pool gets one connection per client: with fewer, threadpool workers blocked
+    on checkout starve the `get_db` teardown that would return connections, and the
+    baseline deadlocks instead of producing numbers.
+    """
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False},
+                           pool_size=clients, max_overflow=0)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+
+    @app.get("/api/v1/agents/{agent_id}", response_model=agents.AgentResponse)
+    def get_agent(agent_id: int, db: Session = Depends(get_db)):
+        db_agent = db.query(Agent).filter(Agent.id == agent_id).first()
+        if not db_agent:
+            raise HTTPException(status_code=404, detail="Agent not found")
+        return db_agent
+
+    @app.get("/api/v1/calls/calls/{call_id}", response_model=calls.CallResponse)
+    def get_call(call_id: int, db: Session = Depends(get_db)):
+        call = db.query(Call).filter(Call.id == call_id).first()
+        if not call:
+            raise HTTPException(status_code=404, detail="Call not found")
+        call.history = db.query(CallHistory).filter(CallHistory.call_id == call_id).all()
+        return call
+
+    return app
+
+
+def build_async_app(path: str, clients: int) -> FastAPI:
+    # Sized like the baseline's pool, so both are compared with one connection per client
+    engine = create_db_engine(f"sqlite+aiosqlite:///{path}", name="bench", read_only=True,
+                              pool_size=clients, max_overflow=0)
+    SessionLocal = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+
+    async def override_get_read_db():
+        async with SessionLocal() as db:
+            yield db
+
+    app = FastAPI()
+    app.include_router(agents.router, prefix="/api/v1/agents")
+    app.include_router(calls.router, prefix="/api/v1/calls")
+    app.dependency_overrides[get_read_db] = override_get_read_db
+    return app
+
+
+async def drive(app: FastAPI, clients: int, requests: int, n_agents: int, n_calls: int) -> list:
+    latencies = []
+    transport = httpx.ASGITransport(app=app)
+
+    async def client(idx: int) -> None:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+            for i in range(requests):
+                if i % 2:
+                    url = f"/api/v1/agents/{1 + (idx + i) % n_agents}"
+                else:
+                    url = f"/api/v1/calls/calls/{1 + (idx * requests + i) % n_calls}"
+                started = time.perf_counter()
+                response = await http.get(url)
+                latencies.append(time.perf_counter() - started)
+                response.raise_for_status()
+
+    await asyncio.gather(*(client(i) for i in range(clients)))
+    return latencies
+
+
+def report(name: str, latencies: list, elapsed: float) -> None:
+    ordered = sorted(latencies)
+    q = statistics.quantiles(ordered, n=100)
+    print(f"{name:>6}: {len(ordered)} req in {elapsed:.2f}s ({len(ordered) / elapsed:.0f} req/s)  "
+          f"p50={q[49] * 1000:.1f}ms p95={q[94] * 1000:.1f}ms p99={q[98] * 1000:.1f}ms")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=25, help="requests per client")
+    parser.add_argument("--agents", type=int, default=20)
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--turns", type=int, default=20, help="history rows per call")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        seed(path, args.agents, args.calls, args.turns)
+        for name, build in (("sync", build_sync_app), ("async", build_async_app)):
+            app = build(path, args.clients)
+            started = time.perf_counter()
+            latencies = await drive(app, args.clients, args.requests, args.agents, args.calls)
+            report(name, latencies, time.perf_counter() - started)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Full-text call search benchmark (GET /calls/search, migration 0008).
+
+Builds a throwaway SQLite database at head and seeds it with `--rows` synthetic
+transcript turns, made up from collections call phrases, plus a defaulter name
+per call. Everything is indexed in call_search, as the transcript writer does.
+It then compares:
+  - search: SearchRepository ranking a page of calls and highlighting them,
+    the same code the endpoint runs
+  - scan: what clients do today, a LIKE filter over call_history.message
+and reports the cost the index adds to the transcript writer's batched inserts.
+
+Run with: python benchmarks/bench_call_search.py --rows 1000000
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+FIRST_NAMES = ["John", "Mary", "Aisha", "Ravi", "Chen", "Fatima", "Carlos", "Olga", "Kwame", "Priya"]
+LAST_NAMES = ["Smith", "Okafor", "Sharma", "Garcia", "Nguyen", "Kowalski", "Haddad", "Tanaka", "Mensah", "Silva"]
+DEFAULTER_LINES = [
+    "I can pay half of it next week",
+    "I already made the payment on Monday",
+    "I lost my job and cannot pay right now",
+    "please call me back tomorrow",
+    "I promise to clear the dues by the end of the month",
+    "why are you calling me again",
+    "can we talk about a settlement",
+    "I need more time to arrange the money",
+    "the amount on the statement is wrong",
+    "I will transfer the money tonight",
+]
+AGENT_LINES = [
+    "this is a reminder about your outstanding balance",
+    "can you confirm the date of the payment",
+    "I have noted your payment promise for the fifteenth",
+    "we can offer a payment plan in three installments",
+    "a late fee will be added if the amount is not paid",
+    "thank you for your time today",
+    "may I confirm I am speaking with the account holder",
+    "would a partial payment this week be possible",
+]
+QUERIES = ['"payment promise"', "settlement", "payment", "okafor", '"lost my job"', "installments tonight"]
+
+
+def seed(path: str, rows: int, turns_per_call: int) -> int:
+    calls = max(1, rows // turns_per_call)
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.execute("INSERT INTO agents (id, name, prompt, agent_type) VALUES (1, 'agent', 'prompt', 'collections')")
+    chunk = 10_000
+    for first in range(1, calls + 1, chunk):
+        call_rows, history_rows, documents = [], [], []
+        for call_id in range(first, min(first + chunk, calls + 1)):
+            name = f"{random.choice(FIRST_NAMES)} {random.choice(LAST_NAMES)}"
+            call_rows.append((call_id, name, "+15550000000", 1))
+            documents.append((call_id, "name", name))
+            for turn in range(turns_per_call):
+                role = "agent" if turn % 2 else "defaulter"
+                message = random.choice(AGENT_LINES if turn % 2 else DEFAULTER_LINES)
+                history_rows.append((call_id, role, message))
+                documents.append((call_id, role, message))
+        conn.executemany("INSERT INTO calls (id, defaulter_name, phone_number, agent_id) VALUES (?, ?, ?, ?)",
+                         call_rows)
+        conn.executemany("INSERT INTO call_history (call_id, role, message) VALUES (?, ?, ?)", history_rows)
+        conn.executemany("INSERT INTO call_search (call_id, source, body) VALUES (?, ?, ?)", documents)
+        conn.commit()
+        print(f"  seeded {min(first + chunk - 1, calls) * turns_per_call:,}/{calls * turns_per_call:,} turns",
+              end="\r", flush=True)
+    print()
+    conn.execute("INSERT INTO call_search (call_search) VALUES ('optimize')")
+    conn.commit()
+    conn.close()
+    return calls
+
+
+def scan(path: str, query: str) -> list:
+    """What client-side filtering amounts to: every turn is read and matched."""
+    words = [w for w in query.replace('"', " ").split() if w]
+    conn = sqlite3.connect(path)
+    where = " AND ".join("message LIKE ?" for _ in words)
+    rows = conn.execute(
+        f"SELECT DISTINCT call_id FROM call_history WHERE {where}", [f"%{w}%" for w in words]
+    ).fetchall()
+    conn.close()
+    return rows
+
+
+async def search(query: str, limit: int) -> int:
+    from app.db.session import AsyncSessionLocal
+    from app.repositories.search_repository import SearchRepository
+
+    async with AsyncSessionLocal() as db:
+        return len(await SearchRepository(db).search(query, limit=limit))
+
+
+async def write_overhead(calls: int, batches: int, batch_size: int) -> float:
+    from app.db.session import AsyncSessionLocal
+    from app.repositories.call_repository import CallRepository
+
+    timings = []
+    for _ in range(batches):
+        call_id = random.randint(1, calls)
+        turns = [{"call_id": call_id, "role": "agent", "message": random.choice(AGENT_LINES)}
+                 for _ in range(batch_size)]
+        started = time.perf_counter()
+        async with AsyncSessionLocal() as db:
+            await CallRepository(db).add_call_history_bulk(turns)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def p(timings: list, q: int) -> float:
+    return statistics.quantiles(timings, n=100)[q - 1] * 1000 if len(timings) > 1 else timings[0] * 1000
+
+
+async def run(args, path: str, calls: int) -> None:
+    print(f"\n{'query':<24}{'hits':>6}{'search p50':>12}{'p95':>9}{'scan p50':>12}{'speedup':>9}")
+    for query in QUERIES:
+        search_times, scan_times = [], []
+        hits = 0
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            hits = await search(query, args.limit)
+            search_times.append(time.perf_counter() - started)
+        for _ in range(max(1, args.repeat // 5)):
+            started = time.perf_counter()
+            scan(path, query)
+            scan_times.append(time.perf_counter() - started)
+        search_p50, scan_p50 = statistics.median(search_times) * 1000, statistics.median(scan_times) * 1000
+        print(f"{query:<24}{hits:>6}{search_p50:>10.1f}ms{p(search_times, 95):>7.1f}ms"
+              f"{scan_p50:>10.1f}ms{scan_p50 / max(search_p50, 1e-6):>8.0f}x")
+
+    batch = await write_overhead(calls, batches=200, batch_size=args.batch_size)
+    print(f"\ntranscript batch of {args.batch_size} turns, indexed: {batch * 1000:.2f}ms median")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000, help="transcript turns to seed")
+    parser.add_argument("--turns", type=int, default=20, help="turns per call")
+    parser.add_argument("--limit", type=int, default=20, help="page size")
+    parser.add_argument("--repeat", type=int, default=20, help="runs per query")
+    parser.add_argument("--batch-size", type=int, default=50, help="turns per transcript writer batch")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        os.environ["DATABASE_BACKEND"] = "sqlite"
+        os.environ["SQLITE_PATH"] = path
+        os.environ.pop("SQLALCHEMY_DATABASE_URI", None)
+        from alembic import command
+        from app.db.init_db import get_alembic_config
+
+        command.upgrade(get_alembic_config(), "head")
+        print(f"Seeding {args.rows:,} transcript turns...")
+        started = time.perf_counter()
+        calls = seed(path, args.rows, args.turns)
+        print(f"Seeded and indexed in {time.perf_counter() - started:.1f}s, "
+              f"database {os.path.getsize(path) / 2 ** 20:.0f} MiB")
+        asyncio.run(run(args, path, calls))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Final-summary latency vs transcript length: single pass vs live map-reduce.
+
+Uses a fake backend whose latency grows with prompt size (`--ms-per-kchar` on
+top of `--base-latency`). For each transcript length it reports the latency of
+one single-pass summary, and the hang-up latency of the chunked summarizer
+after the windows were already summarized live during the call.
+
+Run with: python benchmarks/bench_chunked_summary.py --turns 20 100 400 1600
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+async def run(args) -> None:
+    from app.db.init_db import init_database
+    from app.services.chunked_summarizer import ChunkedSummarizer, LiveChunkSummarizer
+    from app.services.summary_service import FakeSummaryBackend, build_summary_prompt, format_transcript
+
+    class SizedLatencyBackend(FakeSummaryBackend):
+        async def generate(self, prompt: str) -> str:
+            await asyncio.sleep(args.base_latency + args.ms_per_kchar / 1000 * len(prompt) / 1000)
+            return await super().generate(prompt)
+
+    init_database()
+    backend = SizedLatencyBackend(latency=0)
+    print(f"{'turns':>6} {'single pass':>12} {'chunked at hang-up':>19}")
+    for turns in args.turns:
+        messages = [{"role": "agent" if i % 2 else "defaulter",
+                     "text": f"turn {i} of a {turns} turn call: " + "lorem ipsum " * 10}
+                    for i in range(turns)]
+
+        started = time.perf_counter()
+        await backend.generate(build_summary_prompt(format_transcript(messages)))
+        single = time.perf_counter() - started
+
+        summarizer = ChunkedSummarizer(backend, chunk_turns=args.chunk_turns)
+        live = LiveChunkSummarizer(summarizer)
+        for message in messages:
+            live.add(message["role"], message["text"])
+        await live.aclose(timeout=None)
+
+        started = time.perf_counter()
+        await summarizer.summarize(messages)
+        chunked = time.perf_counter() - started
+        print(f"{turns:>6} {single * 1000:>10.0f}ms {chunked * 1000:>17.0f}ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, nargs="+", default=[20, 100, 400, 1600])
+    parser.add_argument("--chunk-turns", type=int, default=24)
+    parser.add_argument("--base-latency", type=float, default=0.3, help="seconds per LLM request")
+    parser.add_argument("--ms-per-kchar", type=float, default=20.0, help="extra latency per 1000 prompt chars")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DATABASE_BACKEND"] = "sqlite"
+        os.environ["SQLITE_PATH"] = os.path.join(tmp, "bench.db")
+        os.environ.pop("SQLALCHEMY_DATABASE_URI", None)
+        asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
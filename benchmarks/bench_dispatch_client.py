@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Dispatch client micro-benchmark against a local stand-in LiveKit server.
+
+Starts an aiohttp server that answers the Twirp CreateDispatch route, then
+sends `--requests` dispatches with `--concurrency` in flight using
+  - "per-request": a new LiveKitAPI (new HTTP session) per dispatch, as
+    start-call used to do
+  - "pooled":      the shared, keep-alive DispatchClient
+and reports throughput and per-request latency percentiles.
+
+Run with: python benchmarks/bench_dispatch_client.py --requests 2000 --concurrency 100
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aiohttp import web
+from livekit import api
+
+from app.services.dispatch_client import DispatchClient
+
+API_KEY = "bench-key"
+API_SECRET = "bench-secret-bench-secret-bench-secret"
+
+
+async def start_stand_in(port: int, latency: float) -> web.AppRunner:
+    async def create_dispatch(request: web.Request) -> web.Response:
+        await request.read()
+        if latency:
+            await asyncio.sleep(latency)
+        body = api.AgentDispatch(id="AD_bench", agent_name="groq-call-agent", room="bench").SerializeToString()
+        return web.Response(body=body, content_type="application/protobuf")
+
+    app = web.Application()
+    app.router.add_post("/twirp/livekit.AgentDispatchService/CreateDispatch", create_dispatch)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+    return runner
+
+
+async def drive(send, requests: int, concurrency: int) -> list:
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            await send(f"call-{i}")
+            latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    return latencies
+
+
+def report(name: str, latencies: list, elapsed: float) -> None:
+    q = statistics.quantiles(sorted(latencies), n=100)
+    print(f"{name:>12}: {len(latencies) / elapsed:8.0f} req/s  "
+          f"p50={q[49] * 1000:.2f}ms p95={q[94] * 1000:.2f}ms p99={q[98] * 1000:.2f}ms")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--port", type=int, default=17880)
+    parser.add_argument("--latency", type=float, default=0.0, help="stand-in server latency in seconds")
+    args = parser.parse_args()
+
+    url = f"http://127.0.0.1:{args.port}"
+    runner = await start_stand_in(args.port, args.latency)
+    metadata = json.dumps({"phone_number": "+15550000000", "agentId": 1})
+
+    async def per_request(room: str) -> None:
+        lkapi = api.LiveKitAPI(url=url, api_key=API_KEY, api_secret=API_SECRET)
+        await lkapi.agent_dispatch.create_dispatch(
+            api.CreateAgentDispatchRequest(agent_name="groq-call-agent", room=room, metadata=metadata)
+        )
+        await lkapi.aclose()
+
+    client = DispatchClient(url=url, api_key=API_KEY, api_secret=API_SECRET,
+                            max_connections=args.concurrency, max_in_flight=args.concurrency)
+    await client.start()
+
+    async def pooled(room: str) -> None:
+        await client.create_dispatch(room_name=room, metadata={"phone_number": "+15550000000", "agentId": 1})
+
+    try:
+        for name, send in (("per-request", per_request), ("pooled", pooled)):
+            started = time.perf_counter()
+            latencies = await drive(send, args.requests, args.concurrency)
+            report(name, latencies, time.perf_counter() - started)
+    finally:
+        await client.aclose()
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
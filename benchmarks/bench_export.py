@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Export benchmark: streaming exports vs paging through the calls API.
+
+Seeds a throwaway SQLite database with `--calls` calls of `--turns` transcript
+turns each, then dumps every call and turn:
+  - paged: GET /calls/calls/?include_history=true&include_summary=true, 200
+    calls a page, the way the warehouse loader did it
+  - export: GET /exports/calls plus GET /exports/call-history, in each format
+For each it reports rows per second, bytes written and the peak Python heap
+(tracemalloc) while running. Export memory should stay flat as --calls grows.
+
+Run with: python benchmarks/bench_export.py --calls 50000 --turns 20
+"""
+
+import argparse
+import asyncio
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def seed(path: str, calls: int, turns: int) -> None:
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.execute("INSERT INTO agents (id, name, prompt, agent_type) VALUES (1, 'agent', 'prompt', 'collections')")
+    chunk = 5_000
+    for first in range(1, calls + 1, chunk):
+        ids = range(first, min(first + chunk, calls + 1))
+        conn.executemany(
+            "INSERT INTO calls (id, defaulter_name, phone_number, agent_id, duration, outcome, summary, "
+            "created_at, updated_at) VALUES (?, ?, '+15550000000', 1, 95.5, 'completed', ?, "
+            "'2026-01-01 00:00:00', '2026-01-01 00:00:00')",
+            ((i, f"defaulter {i}", "summary of the call " * 20) for i in ids),
+        )
+        conn.executemany(
+            "INSERT INTO call_history (call_id, role, message, created_at, updated_at) "
+            "VALUES (?, ?, ?, '2026-01-01 00:00:00', '2026-01-01 00:00:00')",
+            ((i, "agent" if t % 2 else "defaulter", f"turn {t} of call {i}, something was said here")
+             for i in ids for t in range(turns)),
+        )
+        conn.commit()
+    conn.close()
+
+
+async def paged() -> tuple:
+    from app.api.api_v1.endpoints.calls import get_all_calls
+    from app.db.session import ReadSessionLocal
+
+    rows = size = 0
+    cursor = None
+    while True:
+        async with ReadSessionLocal() as db:
+            page = await get_all_calls(limit=200, cursor=cursor, agent_id=None, created_from=None,
+                                       created_to=None, outcome=None, include_history=True,
+                                       include_summary=True, db=db)
+        body = page.model_dump_json()
+        size += len(body)
+        rows += len(page.items) + sum(len(item.history) for item in page.items)
+        if page.next_cursor is None:
+            return rows, size
+        cursor = page.next_cursor
+
+
+async def exported(format: str) -> tuple:
+    from app.api.api_v1.endpoints.exports import export_call_history, export_calls
+
+    rows = size = 0
+    for endpoint in (export_calls, export_call_history):
+        response = await endpoint(format=format, since=None, **({"agent_id": None} if endpoint is export_calls
+                                                                 else {"call_id": None}))
+        async for chunk in response.body_iterator:
+            size += len(chunk)
+    from app.core.metrics import EXPORT_ROWS
+    for dataset in ("calls", "call-history"):
+        rows += EXPORT_ROWS.labels(dataset=dataset, format=format)._value.get()
+    return int(rows), size
+
+
+async def measure(name: str, run) -> None:
+    tracemalloc.start()
+    started = time.perf_counter()
+    rows, size = await run()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:<10}{rows:>12,} rows{rows / elapsed:>12,.0f} rows/s{size / 2 ** 20:>9.1f} MiB out"
+          f"{peak / 2 ** 20:>9.1f} MiB peak heap")
+
+
+async def run(args) -> None:
+    from app.services.export import parquet_available
+
+    await measure("paged", paged)
+    for format in ("ndjson", "csv", "parquet"):
+        if format == "parquet" and not parquet_available():
+            print("parquet   skipped (pyarrow not installed)")
+            continue
+        await measure(format, lambda: exported(format))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=50_000)
+    parser.add_argument("--turns", type=int, default=20, help="transcript turns per call")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        os.environ["DATABASE_BACKEND"] = "sqlite"
+        os.environ["SQLITE_PATH"] = path
+        os.environ.pop("SQLALCHEMY_DATABASE_URI", None)
+        os.environ["LOG_LEVEL"] = "WARNING"
+        from alembic import command
+        from app.db.init_db import get_alembic_config
+
+        command.upgrade(get_alembic_config(), "head")
+        print(f"Seeding {args.calls:,} calls with {args.turns} turns each...")
+        seed(path, args.calls, args.turns)
+        asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+End-to-end load test of the API, the worker entrypoint and the summary worker,
+with local stand-ins for LiveKit and the voice providers (benchmarks/fakes.py).
+
+Each of `--calls` simulated calls, at most `--concurrency` at a time, goes
+through the real code paths:
+  POST /api/v1/users/start-call (main.app) -> DispatchClient -> fake LiveKit server
+  -> entrypoint() in a fake job -> SIP dial through livekit-api to the fake
+  server -> scripted conversation (fake AgentSession with canned STT/LLM/TTS)
+  -> transcript writer, turn latency, live events, shutdown hook
+  -> summary worker (fake summary backend)
+Call scripts (answered or not, number of turns, who hangs up) are drawn from a
+seeded RNG, so two runs with the same arguments make the same calls. Every
+call runs on one event loop, so loop lag here is a worst case for one worker
+process.
+
+Reports throughput, database transactions and transcript rows per second,
+event-loop lag, and p50/p95/p99 of start-call latency, dispatch-to-dial, agent
+response latency (as stored in call_history) and shutdown hook time. It then
+checks that every call was finalized with its scripted outcome, every turn was
+written and every answered call got a summary, and exits non-zero if not. No
+network access is needed.
+
+Run with: python benchmarks/bench_load.py --calls 200 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import socket
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fakes import (  # noqa: E402
+    API_KEY,
+    API_SECRET,
+    CallScript,
+    FakeAgentSession,
+    FakeJobContext,
+    FakeLiveKitServer,
+    FakeProvider,
+    FakeRoom,
+    run_job,
+)
+
+# SIP codes used for scripted failures, and the outcomes they map to
+NO_ANSWER_STATUS = 480
+BUSY_STATUS = 486
+
+
+def make_script(args, index: int) -> tuple:
+    """The scripted call number `index` and the outcome it should end with."""
+    rng = random.Random(f"{args.seed}:{index}")
+    draw = rng.random()
+    if draw < args.no_answer:
+        return CallScript(ring=args.ring * 3, sip_status=NO_ANSWER_STATUS), "no-answer"
+    if draw < args.no_answer + args.busy:
+        return CallScript(ring=args.ring / 4, sip_status=BUSY_STATUS), "busy"
+    hangup = "dropped" if rng.random() < args.dropped else rng.choice(("callee", "agent"))
+    script = CallScript(
+        ring=args.ring,
+        turns=rng.randint(max(1, args.turns - 1), args.turns + 1),
+        user_speech=args.user_speech,
+        agent_speech=args.agent_speech,
+        hangup=hangup,
+    )
+    return script, "dropped" if hangup == "dropped" else "completed"
+
+
+def percentiles(values: list) -> str:
+    if len(values) < 2:
+        return "n/a"
+    q = statistics.quantiles(sorted(values), n=100)
+    return f"p50={q[49] * 1000:.0f}ms p95={q[94] * 1000:.0f}ms p99={q[98] * 1000:.0f}ms"
+
+
+async def sample_loop_lag(lags: list, stop: asyncio.Event, interval: float = 0.01) -> None:
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, loop.time() - expected))
+
+
+async def run(args) -> int:
+    import httpx
+    from livekit import api
+    from prometheus_client import REGISTRY
+    from sqlalchemy import event, func, select
+
+    import main
+    from app.db.session import AsyncSessionLocal, engine
+    from app.models.call import Agent, Call, CallHistory, SummaryJob
+    from app.services import livekit_process
+    from app.services.summary_queue import SummaryWorkerPool
+    from app.services.summary_service import FakeSummaryBackend
+
+    async with AsyncSessionLocal() as db:
+        db.add(Agent(name="load", prompt="You are a collections agent.", agent_type="collections"))
+        await db.commit()
+
+    # The entrypoint's provider clients and AgentSession are the only parts replaced
+    livekit_process.AgentSession = FakeAgentSession
+
+    commits = 0
+
+    def count_commit(conn) -> None:
+        nonlocal commits
+        commits += 1
+
+    event.listen(engine.sync_engine, "commit", count_commit)
+
+    scripts, expected, jobs, dispatched = {}, {}, {}, {}
+
+    def on_dispatch(room: str, metadata: dict) -> None:
+        index = int(metadata["defaulter_name"].rsplit("-", 1)[1])
+        scripts[room], expected[room] = make_script(args, index)
+        rng = random.Random(f"{args.seed}:{index}:providers")
+        clients = (
+            FakeProvider(args.stt, args.jitter, rng),
+            FakeProvider(args.llm_ttft, args.jitter, rng),
+            FakeProvider(args.tts_ttfb, args.jitter, rng),
+        )
+        ctx = FakeJobContext(
+            FakeRoom(room, scripts[room], callee_identity=livekit_process.CALLEE_IDENTITY),
+            metadata,
+            lkapi,
+            userdata={"vad": object(), "clients": clients},
+        )
+        dispatched[room] = time.perf_counter()
+        jobs[room] = asyncio.create_task(run_job(livekit_process.entrypoint, ctx))
+
+    server = FakeLiveKitServer(on_dispatch, lambda room: scripts[room])
+    await server.start(args.port)
+    lkapi = api.LiveKitAPI(url=server.url, api_key=API_KEY, api_secret=API_SECRET)
+
+    summaries = SummaryWorkerPool(backend=FakeSummaryBackend(latency=args.summary_latency),
+                                  concurrency=args.summary_concurrency, poll_interval=0.05)
+    summary_task = asyncio.create_task(summaries.run())
+    lags = []
+    stop_sampling = asyncio.Event()
+    sampler = asyncio.create_task(sample_loop_lag(lags, stop_sampling))
+
+    api_latencies, shutdown_times, call_times = [], [], []
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def one_call(http: httpx.AsyncClient, index: int) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            response = await http.post("/api/v1/users/start-call", json={
+                "phone_number": f"+1555{index:07d}", "defaulter_name": f"load-{index}", "agentId": 1,
+            })
+            api_latencies.append(time.perf_counter() - started)
+            response.raise_for_status()
+            shutdown_times.append(await jobs[response.json()["room_name"]])
+            call_times.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    async with main.app.router.lifespan_context(main.app):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://load", timeout=60) as http:
+            await asyncio.gather(*(one_call(http, i) for i in range(args.calls)))
+    calls_done = time.perf_counter()
+
+    # Let the summary worker catch up with the last calls
+    while time.perf_counter() - calls_done < args.drain_timeout:
+        async with AsyncSessionLocal() as db:
+            open_jobs = await db.scalar(
+                select(func.count()).select_from(SummaryJob).where(SummaryJob.status.in_(("pending", "running")))
+            )
+        if not open_jobs:
+            break
+        await asyncio.sleep(0.05)
+    drained = time.perf_counter()
+    summaries.stop()
+    stop_sampling.set()
+    await asyncio.gather(summary_task, sampler)
+    await lkapi.aclose()
+    await server.aclose()
+
+    async with AsyncSessionLocal() as db:
+        outcomes = Counter(dict((await db.execute(
+            select(Call.outcome, func.count()).group_by(Call.outcome)
+        )).all()))
+        unfinished = await db.scalar(select(func.count()).select_from(Call).where(Call.ended_at.is_(None)))
+        turns = await db.scalar(select(func.count()).select_from(CallHistory))
+        response_latencies = list((await db.execute(
+            select(CallHistory.response_latency).where(CallHistory.response_latency.is_not(None))
+        )).scalars())
+        summaries_done = await db.scalar(
+            select(func.count()).select_from(Call).where(Call.summary_status == "done")
+        )
+
+    elapsed = calls_done - started
+    answered = [room for room, outcome in expected.items() if outcome in ("completed", "dropped")]
+    expected_turns = sum(2 * scripts[room].turns for room in answered)
+    dial_delays = [server.dial_times[room] - dispatched[room] for room in server.dial_times]
+    floor = args.stt + args.llm_ttft + args.tts_ttfb + 1.5 * args.jitter
+
+    print(f"{args.calls} calls, {args.concurrency} concurrent, in {elapsed:.1f}s "
+          f"({args.calls / elapsed:.2f} calls/s, call p50 {statistics.median(call_times):.1f}s)")
+    print(f"database: {commits / elapsed:.0f} transactions/s, {turns / elapsed:.0f} transcript rows/s")
+    print(f"event-loop lag: {percentiles(lags)} max={max(lags) * 1000:.0f}ms")
+    print(f"start-call API:        {percentiles(api_latencies)}")
+    print(f"dispatch to SIP dial:  {percentiles(dial_delays)}")
+    print(f"agent response:        {percentiles(response_latencies)}  (provider floor {floor * 1000:.0f}ms)")
+    print(f"shutdown hook:         {percentiles(shutdown_times)}")
+    print(f"summaries: {summaries_done} done, drained {drained - calls_done:.1f}s after the last call")
+    print(f"outcomes: {dict(sorted(outcomes.items(), key=lambda kv: str(kv[0])))}")
+
+    problems = []
+    if outcomes != Counter(expected.values()):
+        problems.append(f"outcomes {dict(outcomes)} != scripted {dict(Counter(expected.values()))}")
+    if unfinished:
+        problems.append(f"{unfinished} calls never finalized")
+    if turns != expected_turns:
+        problems.append(f"{turns} transcript turns written, {expected_turns} scripted")
+    if summaries_done != len(answered):
+        problems.append(f"{summaries_done} summaries for {len(answered)} answered calls")
+    dropped_turns = REGISTRY.get_sample_value("transcript_turns_dropped_total")
+    if dropped_turns:
+        problems.append(f"{dropped_turns:.0f} transcript turns dropped")
+    step_failures = sum(
+        s.value for metric in REGISTRY.collect() if metric.name == "call_finalize_step_failures"
+        for s in metric.samples if s.name.endswith("_total")
+    )
+    if step_failures:
+        problems.append(f"{step_failures:.0f} shutdown steps failed")
+    for problem in problems:
+        print(f"FAIL: {problem}")
+    if not problems:
+        print("OK: every call finalized with its scripted outcome, transcript and summary")
+    return 1 if problems else 0
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50, help="calls in progress at once")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--turns", type=int, default=4, help="average callee turns per answered call")
+    parser.add_argument("--ring", type=float, default=0.5, help="seconds before an answered call is picked up")
+    parser.add_argument("--user-speech", type=float, default=1.0, help="seconds the callee speaks per turn")
+    parser.add_argument("--agent-speech", type=float, default=1.5, help="seconds the agent speaks per turn")
+    parser.add_argument("--stt", type=float, default=0.15, help="STT latency (end of speech to transcript)")
+    parser.add_argument("--llm-ttft", type=float, default=0.25, help="LLM time to first token")
+    parser.add_argument("--tts-ttfb", type=float, default=0.15, help="TTS time to first audio byte")
+    parser.add_argument("--jitter", type=float, default=0.05, help="extra provider latency, uniform 0..jitter")
+    parser.add_argument("--no-answer", type=float, default=0.15, help="fraction of calls nobody picks up")
+    parser.add_argument("--busy", type=float, default=0.05, help="fraction of calls that get a busy signal")
+    parser.add_argument("--dropped", type=float, default=0.05, help="fraction of answered calls that drop")
+    parser.add_argument("--summary-latency", type=float, default=0.2, help="fake summary backend latency")
+    parser.add_argument("--summary-concurrency", type=int, default=4)
+    parser.add_argument("--drain-timeout", type=float, default=60.0, help="seconds to wait for summaries")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        args.port = free_port()
+        path = os.path.join(tmp, "bench.db")
+        os.environ.update({
+            "DATABASE_BACKEND": "sqlite",
+            "SQLITE_PATH": path,
+            "LOG_LEVEL": "WARNING",
+            "EVENTS_BROKER": "memory",
+            "SUMMARY_BACKEND": "fake",
+            "SUMMARY_FAKE_LATENCY": str(args.summary_latency),
+            "LIVEKIT_URL": f"http://127.0.0.1:{args.port}",
+            "LIVEKIT_API_KEY": API_KEY,
+            "LIVEKIT_API_SECRET": API_SECRET,
+            "LIVEKIT_TRUNK_ID": "ST_load",
+        })
+        os.environ.pop("SQLALCHEMY_DATABASE_URI", None)
+        os.environ.pop("PROMETHEUS_MULTIPROC_DIR", None)
+        from alembic import command
+        from app.db.init_db import get_alembic_config
+
+        command.upgrade(get_alembic_config(), "head")
+        sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
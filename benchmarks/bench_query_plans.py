@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Query-plan benchmark for the hot-column indexes (migration 0002).
+
+Builds a throwaway SQLite database at migration 0001 (no indexes), seeds it with
+`--rows` call_history rows, then runs the app's hot queries before and after
+upgrading to 0002 and prints the query plan and median latency of each.
+
+Run with: python benchmarks/bench_query_plans.py --rows 10000000
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+QUERIES = {
+    "call history": (
+        "SELECT id, role, message, created_at FROM call_history WHERE call_id = ? ORDER BY id",
+        lambda p: (random.randint(1, p["calls"]),),
+    ),
+    "agent page": (
+        "SELECT id, defaulter_name, phone_number, outcome, created_at FROM calls "
+        "WHERE agent_id = ? ORDER BY id DESC LIMIT 50",
+        lambda p: (random.randint(1, p["agents"]),),
+    ),
+    "agent date range": (
+        "SELECT count(*) FROM calls WHERE agent_id = ? AND created_at >= ? AND created_at < ?",
+        lambda p: (random.randint(1, p["agents"]), *p["day_range"]()),
+    ),
+    "phone dedup": (
+        "SELECT id FROM calls WHERE phone_number = ? ORDER BY id DESC LIMIT 1",
+        lambda p: (f"+1555{random.randint(0, p['phones']):07d}",),
+    ),
+}
+
+START = datetime(2025, 1, 1)
+
+
+def seed(path: str, rows: int, turns_per_call: int, agents: int) -> dict:
+    calls = max(1, rows // turns_per_call)
+    phones = max(1, int(calls * 0.8))
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.executemany(
+        "INSERT INTO agents (id, name, prompt, agent_type) VALUES (?, ?, ?, ?)",
+        ((i, f"agent-{i}", "prompt", "collections") for i in range(1, agents + 1)),
+    )
+    seconds_per_call = 365 * 24 * 3600 / calls
+    chunk = 50_000
+    history_id = 0
+    for first in range(1, calls + 1, chunk):
+        call_rows, history_rows = [], []
+        for call_id in range(first, min(first + chunk, calls + 1)):
+            created = START + timedelta(seconds=call_id * seconds_per_call)
+            call_rows.append((call_id, f"defaulter-{call_id}", f"+1555{random.randint(0, phones):07d}",
+                              1 + call_id % agents, "Completed", created.strftime("%Y-%m-%d %H:%M:%S")))
+            for turn in range(turns_per_call):
+                history_id += 1
+                history_rows.append((history_id, call_id, "agent" if turn % 2 else "defaulter",
+                                     f"message {turn} of call {call_id}",
+                                     (created + timedelta(seconds=turn * 5)).strftime("%Y-%m-%d %H:%M:%S")))
+        conn.executemany(
+            "INSERT INTO calls (id, defaulter_name, phone_number, agent_id, outcome, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)", call_rows)
+        conn.executemany(
+            "INSERT INTO call_history (id, call_id, role, message, created_at) VALUES (?, ?, ?, ?, ?)",
+            history_rows)
+        conn.commit()
+        print(f"  seeded {history_id:,}/{calls * turns_per_call:,} history rows", end="\r", flush=True)
+    print()
+    conn.execute("ANALYZE")
+    conn.close()
+
+    def day_range():
+        day = START + timedelta(days=random.randint(0, 360))
+        return day.strftime("%Y-%m-%d %H:%M:%S"), (day + timedelta(days=1)).strftime("%Y-%m-%d %H:%M:%S")
+
+    return {"calls": calls, "agents": agents, "phones": phones, "day_range": day_range}
+
+
+def measure(path: str, params: dict, repeat: int) -> dict:
+    conn = sqlite3.connect(path)
+    results = {}
+    for name, (sql, make_args) in QUERIES.items():
+        plan = conn.execute(f"EXPLAIN QUERY PLAN {sql}", make_args(params)).fetchall()
+        timings = []
+        for _ in range(repeat):
+            args = make_args(params)
+            started = time.perf_counter()
+            conn.execute(sql, args).fetchall()
+            timings.append(time.perf_counter() - started)
+        results[name] = (" | ".join(row[-1] for row in plan), statistics.median(timings))
+    conn.close()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000_000, help="call_history rows to seed")
+    parser.add_argument("--turns", type=int, default=20, help="history rows per call")
+    parser.add_argument("--agents", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=20, help="runs per query")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        # Point the app's settings (and so Alembic) at the throwaway database
+        os.environ["DATABASE_BACKEND"] = "sqlite"
+        os.environ["SQLITE_PATH"] = path
+        os.environ.pop("SQLALCHEMY_DATABASE_URI", None)
+        from alembic import command
+        from app.db.init_db import get_alembic_config
+
+        config = get_alembic_config()
+        command.upgrade(config, "0001")
+        print(f"Seeding {args.rows:,} call_history rows...")
+        params = seed(path, args.rows, args.turns, args.agents)
+
+        before = measure(path, params, args.repeat)
+        started = time.perf_counter()
+        command.upgrade(config, "0002")
+        print(f"Index build took {time.perf_counter() - started:.1f}s")
+        after = measure(path, params, args.repeat)
+
+    for name in QUERIES:
+        plan_before, t_before = before[name]
+        plan_after, t_after = after[name]
+        print(f"\n{name}: {t_before * 1000:.2f}ms -> {t_after * 1000:.2f}ms "
+              f"({t_before / max(t_after, 1e-9):.0f}x)")
+        print(f"  before: {plan_before}")
+        print(f"  after:  {plan_after}")
+
+
+if __name__ == "__main__":
+    main()
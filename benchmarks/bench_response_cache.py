@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Read throughput of the agent and call detail endpoints with and without the
+response cache.
+
+Seeds a throwaway SQLite database with agents and finished, summarized calls,
+then drives GET /agents/, GET /agents/{id} and GET /calls/calls/{id} through
+the real routers with N concurrent clients in each mode:
+  - "uncached":    every request reads the database (the LRU is sized to zero)
+  - "cached":      in-process LRU
+  - "shared":      the shared SQLite cache file only, as seen by an API process
+                   whose own LRU is cold
+  - "conditional": in-process LRU, clients revalidate with If-None-Match and
+                   get 304s
+Reports req/s, p50/p95/p99 latency and the cache hit rate of each mode.
+
+Run with: python benchmarks/bench_response_cache.py --clients 100 --requests 50
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+
+MODES = ("uncached", "cached", "shared", "conditional")
+
+
+def seed(path: str, n_agents: int, n_calls: int, turns_per_call: int) -> None:
+    from datetime import datetime, timedelta, timezone
+
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+
+    from app.models.base import Base
+    from app.models.call import Agent, Call, CallHistory
+
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    now = datetime.now(timezone.utc)
+    with Session(engine) as db:
+        db.add_all(Agent(name=f"agent-{i}", prompt="You are a collections agent. " * 20, agent_type="collections")
+                   for i in range(n_agents))
+        db.flush()
+        for i in range(n_calls):
+            call = Call(defaulter_name=f"defaulter-{i}", phone_number=f"+1555{i:07d}", agent_id=1 + i % n_agents,
+                        outcome="completed", answered_at=now - timedelta(minutes=5), ended_at=now, duration=300.0,
+                        summary="summary " * 50, summary_status="done")
+            db.add(call)
+            db.flush()
+            db.add_all(CallHistory(call_id=call.id, role="agent" if t % 2 else "defaulter",
+                                   message=f"turn {t}") for t in range(turns_per_call))
+        db.commit()
+    engine.dispose()
+
+
+def build_app(path: str):
+    from fastapi import FastAPI
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+
+    from app.api.api_v1.endpoints import agents, calls
+    from app.db.session import create_db_engine, get_read_db
+
+    engine = create_db_engine(f"sqlite+aiosqlite:///{path}", name="bench", read_only=True)
+    SessionLocal = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+
+    async def override_get_read_db():
+        async with SessionLocal() as db:
+            yield db
+
+    app = FastAPI()
+    app.include_router(agents.router, prefix="/api/v1/agents")
+    app.include_router(calls.router, prefix="/api/v1/calls")
+    app.dependency_overrides[get_read_db] = override_get_read_db
+    return app
+
+
+def install_caches(mode: str, shared_path: str) -> None:
+    from app.core import response_cache
+    from app.core.config import settings
+
+    max_size = 0 if mode in ("uncached", "shared") else settings.RESPONSE_CACHE_SIZE
+    shared = response_cache.SharedResponseCache(shared_path) if mode == "shared" else None
+    response_cache._agent_cache = response_cache.ResponseCache(
+        "agents", ttl=settings.RESPONSE_CACHE_AGENT_TTL, max_size=max_size, shared=shared)
+    response_cache._call_cache = response_cache.ResponseCache(
+        "calls", ttl=settings.RESPONSE_CACHE_CALL_TTL, max_size=max_size, shared=shared)
+
+
+def lookups() -> dict:
+    from prometheus_client import REGISTRY
+
+    return {result: sum(REGISTRY.get_sample_value("response_cache_lookups_total",
+                                                  {"cache": cache, "result": result}) or 0.0
+                        for cache in ("agents", "calls"))
+            for result in ("hit", "shared_hit", "miss")}
+
+
+async def drive(app, clients: int, requests: int, n_agents: int, n_calls: int, conditional: bool) -> list:
+    latencies = []
+    transport = httpx.ASGITransport(app=app)
+
+    async def client(idx: int) -> None:
+        etags = {}
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+            for i in range(requests):
+                if i % 10 == 0:
+                    url = "/api/v1/agents/"
+                elif i % 3 == 0:
+                    url = f"/api/v1/agents/{1 + (idx + i) % n_agents}"
+                else:
+                    url = f"/api/v1/calls/calls/{1 + (idx * requests + i) % n_calls}"
+                headers = {"If-None-Match": etags[url]} if conditional and url in etags else {}
+                started = time.perf_counter()
+                response = await http.get(url, headers=headers)
+                latencies.append(time.perf_counter() - started)
+                if response.status_code != 304:
+                    response.raise_for_status()
+                    etags[url] = response.headers.get("etag")
+
+    await asyncio.gather(*(client(i) for i in range(clients)))
+    return latencies
+
+
+def report(name: str, latencies: list, elapsed: float, results: dict) -> None:
+    ordered = sorted(latencies)
+    q = statistics.quantiles(ordered, n=100)
+    total = sum(results.values())
+    hit_rate = (results["hit"] + results["shared_hit"]) / total if total else 0.0
+    print(f"{name:>11}: {len(ordered)} req in {elapsed:.2f}s ({len(ordered) / elapsed:.0f} req/s)  "
+          f"p50={q[49] * 1000:.1f}ms p95={q[94] * 1000:.1f}ms p99={q[98] * 1000:.1f}ms  "
+          f"hit rate={hit_rate:.0%}")
+
+
+async def run(args, tmp: str) -> None:
+    path = os.path.join(tmp, "bench.db")
+    seed(path, args.agents, args.calls, args.turns)
+    app = build_app(path)
+    for mode in MODES:
+        install_caches(mode, os.path.join(tmp, f"shared-{mode}.db"))
+        # One untimed pass fills the caches, as a long-running API process would have them
+        await drive(app, args.clients, args.requests, args.agents, args.calls, conditional=False)
+        before = lookups()
+        started = time.perf_counter()
+        latencies = await drive(app, args.clients, args.requests, args.agents, args.calls,
+                                conditional=mode == "conditional")
+        elapsed = time.perf_counter() - started
+        after = lookups()
+        report(mode, latencies, elapsed, {k: after[k] - before[k] for k in after})
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=50, help="requests per client")
+    parser.add_argument("--agents", type=int, default=20)
+    parser.add_argument("--calls", type=int, default=1000)
+    parser.add_argument("--turns", type=int, default=20, help="history rows per call")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ.update({
+            "DATABASE_BACKEND": "sqlite",
+            "SQLITE_PATH": os.path.join(tmp, "unused.db"),
+            "LOG_LEVEL": "WARNING",
+        })
+        os.environ.pop("SQLALCHEMY_DATABASE_URI", None)
+        os.environ.pop("PROMETHEUS_MULTIPROC_DIR", None)
+        os.environ.pop("RESPONSE_CACHE_SHARED_PATH", None)
+        asyncio.run(run(args, tmp))
+
+
+if __name__ == "__main__":
+    main()
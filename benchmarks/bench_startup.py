@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+API startup benchmark: import time of main.py and time to first request.
+
+For each tree measured, in fresh interpreters, `--runs` times:
+  - import: `import main`, which is what uvicorn (and every --reload) does
+    before it can serve anything
+  - first request: from spawning `uvicorn main:app` to the first successful
+    GET /api/v1/agents/, i.e. import plus lifespan startup plus one query
+The working tree is measured against a database already migrated with
+migrate.py, as in a deploy. Pass `--ref` (a commit, tag or branch) to measure
+that revision too, checked out in a temporary git worktree; older trees that
+migrate on import do so against their own throwaway database.
+
+Run with: python benchmarks/bench_startup.py --runs 5 --ref HEAD~1
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Credentials: the dispatch client starts (as in production) only with the LiveKit
+# ones, and revisions compared with --ref may require them all
+OFFLINE_SETTINGS = (
+    "LIVEKIT_API_KEY", "LIVEKIT_API_SECRET", "LIVEKIT_TRUNK_ID", "TWILIO_ACCOUNT_SID", "TWILIO_AUTH_TOKEN",
+    "TWILIO_PHONE_NUMBER", "TRUNK_USERNAME", "TRUNK_PASSWORD", "TRUNK_HOST", "GROQ_API_KEY",
+    "CARTESIA_API_KEY", "GEMINI_API_KEY", "SAVRAM_API_KEY",
+)
+
+IMPORT_SNIPPET = "import time; t = time.perf_counter(); import main; print(time.perf_counter() - t)"
+
+
+def environment(db_path: str) -> dict:
+    env = {**os.environ}
+    env.pop("SQLALCHEMY_DATABASE_URI", None)
+    env.pop("PROMETHEUS_MULTIPROC_DIR", None)
+    for name in OFFLINE_SETTINGS:
+        env.setdefault(name, "offline")
+    env.update({
+        "DATABASE_BACKEND": "sqlite",
+        "SQLITE_PATH": db_path,
+        "LOG_LEVEL": "WARNING",
+        "EVENTS_BROKER": "memory",
+        "LIVEKIT_URL": "http://127.0.0.1:7880",
+    })
+    return env
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def time_import(tree: str, env: dict) -> float:
+    output = subprocess.run([sys.executable, "-c", IMPORT_SNIPPET], cwd=tree, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def time_first_request(tree: str, env: dict, timeout: float = 60.0) -> float:
+    port = free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=tree, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        with httpx.Client(timeout=1.0) as http:
+            while time.perf_counter() - started < timeout:
+                try:
+                    if http.get(f"http://127.0.0.1:{port}/api/v1/agents/").status_code == 200:
+                        return time.perf_counter() - started
+                except httpx.TransportError:
+                    pass
+                if server.poll() is not None:
+                    raise RuntimeError(f"uvicorn exited with {server.returncode} in {tree}")
+                time.sleep(0.005)
+        raise RuntimeError(f"no response from {tree} within {timeout}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def measure(name: str, tree: str, runs: int, tmp: str, migrate: bool) -> None:
+    env = environment(os.path.join(tmp, f"{name}.db"))
+    if migrate:
+        subprocess.run([sys.executable, "migrate.py"], cwd=tree, env=env, check=True, stdout=subprocess.DEVNULL)
+    # One untimed run each so the first measurement does not pay for writing .pyc files
+    time_import(tree, env)
+    imports = [time_import(tree, env) for _ in range(runs)]
+    time_first_request(tree, env)
+    first_requests = [time_first_request(tree, env) for _ in range(runs)]
+    print(f"{name:<24}import p50={statistics.median(imports) * 1000:>6.0f}ms min={min(imports) * 1000:>6.0f}ms"
+          f"   first request p50={statistics.median(first_requests) * 1000:>6.0f}ms "
+          f"min={min(first_requests) * 1000:>6.0f}ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--ref", help="also measure this git revision")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.ref:
+            worktree = os.path.join(tmp, "ref")
+            subprocess.run(["git", "worktree", "add", "--detach", worktree, args.ref], cwd=ROOT_DIR,
+                           check=True, capture_output=True)
+            try:
+                # Trees from before migrate.py migrate on import
+                migrate = os.path.exists(os.path.join(worktree, "migrate.py"))
+                measure(args.ref, worktree, args.runs, tmp, migrate=migrate)
+            finally:
+                subprocess.run(["git", "worktree", "remove", "--force", worktree], cwd=ROOT_DIR, check=True)
+        measure("working tree", ROOT_DIR, args.runs, tmp, migrate=True)
+
+
+if __name__ == "__main__":
+    main()
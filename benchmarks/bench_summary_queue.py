@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Summary queue benchmark against the fake LLM backend.
+
+Seeds `--calls` finished calls in a throwaway SQLite database, enqueues a summary
+job for each, then drains the queue with a SummaryWorkerPool and reports job
+throughput, retries and enqueue latency (the cost the shutdown hook now pays).
+Use `--fail-rate` to exercise retries.
+
+Run with: python benchmarks/bench_summary_queue.py --calls 500 --concurrency 8 --latency 0.5
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class FlakyBackend:
+    def __init__(self, backend, fail_rate: float):
+        self.backend = backend
+        self.fail_rate = fail_rate
+        self.failures = 0
+
+    async def generate(self, prompt: str) -> str:
+        if random.random() < self.fail_rate:
+            self.failures += 1
+            raise RuntimeError("simulated provider error")
+        return await self.backend.generate(prompt)
+
+
+async def run(args) -> None:
+    from sqlalchemy import func, select
+
+    from app.db.init_db import init_database
+    from app.db.session import AsyncSessionLocal
+    from app.models.call import Agent, Call, SummaryJob
+    from app.repositories.call_repository import CallRepository
+    from app.services.summary_queue import SummaryWorkerPool, enqueue_summary
+    from app.services.summary_service import FakeSummaryBackend
+
+    init_database()
+    async with AsyncSessionLocal() as db:
+        db.add(Agent(name="bench", prompt="prompt", agent_type="collections"))
+        await db.commit()
+        repo = CallRepository(db)
+        call_ids = []
+        for i in range(args.calls):
+            call = await repo.create_call(f"defaulter-{i}", f"+1555{i:07d}", 1)
+            await repo.add_call_history_bulk([
+                {"call_id": call.id, "role": "agent" if t % 2 else "defaulter", "message": f"turn {t}"}
+                for t in range(args.turns)
+            ])
+            call_ids.append(call.id)
+
+    enqueue_latencies = []
+    for call_id in call_ids:
+        started = time.perf_counter()
+        await enqueue_summary(call_id)
+        enqueue_latencies.append(time.perf_counter() - started)
+
+    backend = FlakyBackend(FakeSummaryBackend(latency=args.latency), args.fail_rate)
+    pool = SummaryWorkerPool(backend=backend, concurrency=args.concurrency, poll_interval=0.05,
+                             retry_base_delay=0.05, retry_max_delay=0.5)
+    runner = asyncio.create_task(pool.run())
+    started = time.perf_counter()
+    while True:
+        async with AsyncSessionLocal() as db:
+            remaining = await db.scalar(
+                select(func.count()).select_from(SummaryJob).where(SummaryJob.status.in_(("pending", "running")))
+            )
+        if not remaining:
+            break
+        await asyncio.sleep(0.1)
+    elapsed = time.perf_counter() - started
+    pool.stop()
+    await runner
+
+    async with AsyncSessionLocal() as db:
+        statuses = dict((await db.execute(
+            select(Call.summary_status, func.count()).group_by(Call.summary_status)
+        )).all())
+
+    print(f"enqueue: p50={statistics.median(enqueue_latencies) * 1000:.2f}ms "
+          f"max={max(enqueue_latencies) * 1000:.2f}ms")
+    print(f"drained {args.calls} jobs in {elapsed:.2f}s ({args.calls / elapsed:.1f} jobs/s) "
+          f"with concurrency {args.concurrency}, {backend.failures} simulated failures")
+    print(f"call summary_status: {statuses}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument("--turns", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.5, help="fake LLM latency in seconds")
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DATABASE_BACKEND"] = "sqlite"
+        os.environ["SQLITE_PATH"] = os.path.join(tmp, "bench.db")
+        os.environ.pop("SQLALCHEMY_DATABASE_URI", None)
+        asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
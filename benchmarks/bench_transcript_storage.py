@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Transcript storage benchmark: call_history rows vs compacted transcripts.
+
+Seeds a throwaway SQLite database with ended calls and their transcript turns,
+then for each codec (zstd only if the zstandard package is installed), on a
+copy of it:
+  - reads `--reads` random calls' history through CallRepository.get_call_history
+    while the turns are in call_history (hot)
+  - compacts every call with the TranscriptCompactor
+  - reads the same calls again, now from call_transcripts (cold)
+Reports the size of the database and of the transcript tables with their
+indexes after VACUUM, compaction throughput and p50/p95/p99 read
+latency for each tier.
+
+Run with: python benchmarks/bench_transcript_storage.py --calls 2000 --turns 40
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import closing
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+WORDS = (
+    "payment amount due date week month loan balance installment account bank transfer "
+    "please confirm today tomorrow salary late fee settle plan interest reminder call back "
+    "I can will not pay half full already sent the my your we you on by before after"
+).split()
+
+
+def seed(path: str, n_calls: int, turns_per_call: int) -> None:
+    from sqlalchemy import create_engine, insert
+    from sqlalchemy.orm import Session
+
+    from app.models.base import Base
+    from app.models.call import Agent, Call, CallHistory
+
+    rng = random.Random(0)
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    ended_at = datetime.now(timezone.utc) - timedelta(days=1)
+    with Session(engine) as db:
+        db.add(Agent(name="agent", prompt="You are a collections agent.", agent_type="collections"))
+        db.flush()
+        for i in range(n_calls):
+            started_at = ended_at - timedelta(seconds=10 * turns_per_call)
+            call = Call(defaulter_name=f"defaulter-{i}", phone_number=f"+1555{i:07d}", agent_id=1,
+                        outcome="completed", answered_at=started_at, ended_at=ended_at,
+                        summary_status="done", summary="summary " * 50)
+            db.add(call)
+            db.flush()
+            turns = []
+            for t in range(turns_per_call):
+                agent = t % 2 == 0
+                at = started_at + timedelta(seconds=10 * t, microseconds=rng.randrange(1_000_000))
+                turns.append({
+                    "call_id": call.id,
+                    "role": "agent" if agent else "defaulter",
+                    "message": " ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 30))),
+                    "response_latency": rng.uniform(0.5, 1.5) if agent else None,
+                    "llm_ttft": rng.uniform(0.2, 0.6) if agent else None,
+                    "created_at": at,
+                    "updated_at": at,
+                })
+            db.execute(insert(CallHistory), turns)
+        db.commit()
+    engine.dispose()
+
+
+def vacuumed_size(path: str) -> tuple:
+    """Size of the database file and of the transcript tables and their indexes, after VACUUM."""
+    # closing(): the connection's own context manager only commits
+    with closing(sqlite3.connect(path)) as db:
+        db.execute("VACUUM")
+        # The database is in WAL mode: move the vacuumed pages into the file before measuring it
+        db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        try:
+            transcripts = db.execute(
+                "SELECT sum(pgsize) FROM dbstat WHERE name LIKE '%call_history%' OR name LIKE '%call_transcripts%'"
+            ).fetchone()[0]
+        except sqlite3.OperationalError:
+            # SQLite built without the dbstat table
+            transcripts = None
+    return os.path.getsize(path), transcripts
+
+
+async def time_reads(session_factory, call_ids: list) -> list:
+    from app.repositories.call_repository import CallRepository
+
+    latencies = []
+    for call_id in call_ids:
+        async with session_factory() as db:
+            started = time.perf_counter()
+            history = await CallRepository(db).get_call_history(call_id)
+            latencies.append(time.perf_counter() - started)
+        assert history, f"call {call_id} has no history"
+    return latencies
+
+
+def describe(latencies: list) -> str:
+    q = statistics.quantiles(latencies, n=100)
+    return f"p50={q[49] * 1000:.2f}ms p95={q[94] * 1000:.2f}ms p99={q[98] * 1000:.2f}ms"
+
+
+async def run_codec(codec: str, path: str, args) -> None:
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+
+    from app.db.session import create_db_engine
+    from app.services.transcript_compactor import TranscriptCompactor
+
+    engine = create_db_engine(f"sqlite+aiosqlite:///{path}", name="bench")
+    session_factory = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+    call_ids = random.Random(1).choices(range(1, args.calls + 1), k=args.reads)
+
+    hot_size = vacuumed_size(path)
+    hot = await time_reads(session_factory, call_ids)
+
+    compactor = TranscriptCompactor(compact_after=0, batch_size=500, codec=codec, session_factory=session_factory)
+    started = time.perf_counter()
+    compacted = 0
+    while True:
+        done = await compactor.run_once()
+        if not done:
+            break
+        compacted += done
+    elapsed = time.perf_counter() - started
+
+    cold_size = vacuumed_size(path)
+    cold = await time_reads(session_factory, call_ids)
+    await engine.dispose()
+
+    print(f"{codec}: compacted {compacted} calls in {elapsed:.1f}s ({compacted / elapsed:.0f} calls/s)")
+    for name, hot_bytes, cold_bytes in (("database size", hot_size[0], cold_size[0]),
+                                        ("transcript size", hot_size[1], cold_size[1])):
+        if hot_bytes:
+            print(f"  {name:<17} hot {hot_bytes / 2**20:6.1f} MiB  cold {cold_bytes / 2**20:6.1f} MiB "
+                  f"({cold_bytes / hot_bytes:.0%})")
+    print(f"  {'history read':<17} hot {describe(hot)}")
+    print(f"  {'':<16} cold {describe(cold)}")
+
+
+async def run(args, tmp: str) -> None:
+    seeded = os.path.join(tmp, "seeded.db")
+    seed(seeded, args.calls, args.turns)
+    codecs = ["gzip"]
+    try:
+        import zstandard  # noqa: F401
+        codecs.insert(0, "zstd")
+    except ImportError:
+        print("zstandard is not installed; measuring gzip only")
+    for codec in codecs:
+        path = os.path.join(tmp, f"{codec}.db")
+        shutil.copy(seeded, path)
+        await run_codec(codec, path, args)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--turns", type=int, default=40, help="transcript turns per call")
+    parser.add_argument("--reads", type=int, default=1000, help="history reads timed per tier")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ.update({
+            "DATABASE_BACKEND": "sqlite",
+            "SQLITE_PATH": os.path.join(tmp, "unused.db"),
+            "LOG_LEVEL": "WARNING",
+        })
+        os.environ.pop("SQLALCHEMY_DATABASE_URI", None)
+        os.environ.pop("PROMETHEUS_MULTIPROC_DIR", None)
+        asyncio.run(run(args, tmp))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+"""
+Turn latency benchmark for the LiveKit worker: default vs low-latency pipeline.
+
+Runs the real AgentSession and agent built by create_session/create_agent,
+without a room: a scripted microphone feeds the callee's speech in real time
+and a fake speaker plays the agent's audio in real time. VAD, STT, LLM and TTS
+are stubs with fixed latencies:
+  - VAD: energy based; ends an utterance after the silence load_vad configures
+    (the Silero default of 0.55s, or VOICE_SPECULATION_SILENCE)
+  - STT: non-streaming like Groq's, `--stt` seconds per utterance
+  - LLM: first token after `--llm-ttft`, then `--llm-rate` tokens/s
+  - TTS: streaming like Cartesia's, sentence by sentence, `--tts-ttfb` to the
+    first audio of a request
+A fraction (`--hesitations`) of the callee's turns start with "let me think"
+and a pause shorter than a turn's silence, so a speculative reply is started
+and discarded. `--bookkeeping-ms` is spent on the event loop for each
+transcript item, standing in for the transcript, log and live event work.
+
+Reports, per mode, the time from the end of the callee's speech to the
+agent's first audio (p50/p95), LLM requests per turn and the speculative
+replies used and discarded.
+
+Run with: python benchmarks/bench_turn_latency.py --turns 20 --calls 2
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from array import array
+from types import SimpleNamespace
+from typing import List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SAMPLE_RATE = 16000
+FRAME_SECONDS = 0.02
+SECONDS_PER_WORD = 0.3
+DEFAULT_VAD_SILENCE = 0.55  # silero.VAD.load's min_silence_duration
+HESITATION = "let me think"
+
+
+def build(args):
+    """The stub providers and audio I/O, defined once LiveKit can be imported."""
+    from livekit import rtc
+    from livekit.agents import APIConnectOptions, llm, stt, tokenize, tts, utils, vad
+    from livekit.agents.voice.io import AudioInput, AudioOutput
+
+    from benchmarks.fakes import AGENT_LINES, USER_LINES
+
+    phrases = USER_LINES + [HESITATION]
+
+    class ScriptedMicrophone(AudioInput):
+        """20ms frames in real time: phrase `i` is sent as samples of value i + 1, silence as zeros."""
+
+        def __init__(self):
+            self._value = 0
+            self._frames = 0
+            self._started: Optional[float] = None
+
+        def say(self, phrase: int) -> None:
+            self._value = phrase + 1
+
+        def stop(self) -> None:
+            self._value = 0
+
+        async def __anext__(self) -> rtc.AudioFrame:
+            if self._started is None:
+                self._started = time.perf_counter()
+            self._frames += 1
+            await asyncio.sleep(max(0.0, self._started + self._frames * FRAME_SECONDS - time.perf_counter()))
+            samples = int(SAMPLE_RATE * FRAME_SECONDS)
+            return rtc.AudioFrame(array("h", [self._value] * samples).tobytes(), SAMPLE_RATE, 1, samples)
+
+    class Speaker(AudioOutput):
+        """Plays each segment in real time and records when its first frame arrived."""
+
+        def __init__(self):
+            super().__init__(next_in_chain=None, sample_rate=None)
+            self.first_frame: asyncio.Future = asyncio.get_running_loop().create_future()
+            self.finished = asyncio.Event()
+            self._started: Optional[float] = None
+            self._duration = 0.0
+            self._playout: Optional[asyncio.Task] = None
+
+        def expect(self) -> None:
+            self.first_frame = asyncio.get_running_loop().create_future()
+            self.finished.clear()
+
+        async def capture_frame(self, frame: rtc.AudioFrame) -> None:
+            await super().capture_frame(frame)
+            if self._started is None:
+                self._started = time.perf_counter()
+                if not self.first_frame.done():
+                    self.first_frame.set_result(self._started)
+            self._duration += frame.samples_per_channel / frame.sample_rate
+
+        def flush(self) -> None:
+            super().flush()
+            if self._started is not None and self._playout is None:
+                self._playout = asyncio.create_task(self._play())
+
+        def clear_buffer(self) -> None:
+            if self._playout is not None:
+                self._playout.cancel()
+            if self._started is not None:
+                self._finish(interrupted=True)
+
+        async def _play(self) -> None:
+            await asyncio.sleep(max(0.0, self._started + self._duration - time.perf_counter()))
+            self._finish(interrupted=False)
+
+        def _finish(self, interrupted: bool) -> None:
+            position = min(time.perf_counter() - self._started, self._duration)
+            self._started, self._duration, self._playout = None, 0.0, None
+            self.on_playback_finished(playback_position=position, interrupted=interrupted)
+            self.finished.set()
+
+    class StubVADStream(vad.VADStream):
+        async def _main_task(self) -> None:
+            speaking, speech, silence, frames = False, 0.0, 0.0, []
+            samples = 0
+            async for frame in self._input_ch:
+                if isinstance(frame, self._FlushSentinel):
+                    continue
+                samples += frame.samples_per_channel
+                duration = frame.samples_per_channel / frame.sample_rate
+                voiced = frame.data[0] != 0
+                if voiced:
+                    speech, silence = speech + duration, 0.0
+                else:
+                    silence += duration
+                if speaking or voiced:
+                    frames.append(frame)
+                event = dict(samples_index=samples, timestamp=time.time(), speech_duration=speech,
+                             silence_duration=silence)
+                self._event_ch.send_nowait(vad.VADEvent(
+                    type=vad.VADEventType.INFERENCE_DONE, probability=1.0 if voiced else 0.0,
+                    speaking=speaking, **event,
+                ))
+                if not speaking and voiced and speech >= self._vad.min_speech:
+                    speaking = True
+                    self._event_ch.send_nowait(vad.VADEvent(
+                        type=vad.VADEventType.START_OF_SPEECH, speaking=True, frames=list(frames), **event,
+                    ))
+                elif speaking and silence >= self._vad.min_silence:
+                    speaking = False
+                    self._event_ch.send_nowait(vad.VADEvent(
+                        type=vad.VADEventType.END_OF_SPEECH, frames=frames, **event,
+                    ))
+                    speech, frames = 0.0, []
+                elif not speaking and not voiced:
+                    speech, frames = 0.0, []
+
+    class StubVAD(vad.VAD):
+        def __init__(self, min_silence: float, min_speech: float = 0.05):
+            super().__init__(capabilities=vad.VADCapabilities(update_interval=FRAME_SECONDS))
+            self.min_silence = min_silence
+            self.min_speech = min_speech
+
+        def stream(self) -> vad.VADStream:
+            return StubVADStream(self)
+
+    class StubSTT(stt.STT):
+        def __init__(self):
+            super().__init__(capabilities=stt.STTCapabilities(streaming=False, interim_results=False))
+
+        async def _recognize_impl(self, buffer, *, language=None, conn_options: APIConnectOptions):
+            heard: List[int] = []
+            for frame in buffer if isinstance(buffer, list) else [buffer]:
+                value = frame.data[0]
+                if value and (not heard or heard[-1] != value):
+                    heard.append(value)
+            await asyncio.sleep(args.stt)
+            text = " ".join(phrases[value - 1] for value in heard)
+            return stt.SpeechEvent(type=stt.SpeechEventType.FINAL_TRANSCRIPT,
+                                   alternatives=[stt.SpeechData(language="en", text=text)])
+
+    class StubLLMStream(llm.LLMStream):
+        async def _run(self) -> None:
+            self._llm.requests += 1
+            prompt = self._chat_ctx.items[-1].text_content or ""
+            reply = AGENT_LINES[sum(map(ord, prompt)) % len(AGENT_LINES)]
+            request_id = utils.shortuuid()
+            await asyncio.sleep(args.llm_ttft)
+            for index, word in enumerate(reply.split()):
+                if index:
+                    await asyncio.sleep(1 / args.llm_rate)
+                self._event_ch.send_nowait(llm.ChatChunk(
+                    id=request_id, delta=llm.ChoiceDelta(role="assistant", content=(" " if index else "") + word),
+                ))
+
+    class StubLLM(llm.LLM):
+        def __init__(self):
+            super().__init__()
+            self.requests = 0
+
+        def chat(self, *, chat_ctx, tools=None, conn_options=APIConnectOptions(), **kwargs):
+            return StubLLMStream(self, chat_ctx=chat_ctx, tools=tools or [], conn_options=conn_options)
+
+    class StubSynthesizeStream(tts.SynthesizeStream):
+        async def _run(self, output_emitter: tts.AudioEmitter) -> None:
+            output_emitter.initialize(request_id=utils.shortuuid(), sample_rate=24000, num_channels=1,
+                                      mime_type="audio/pcm", stream=True)
+            sentences = tokenize.basic.SentenceTokenizer(min_sentence_len=10).stream()
+
+            async def forward_text():
+                async for data in self._input_ch:
+                    if isinstance(data, self._FlushSentinel):
+                        sentences.flush()
+                    else:
+                        sentences.push_text(data)
+                sentences.end_input()
+
+            forwarding = asyncio.create_task(forward_text())
+            try:
+                first = True
+                async for sentence in sentences:
+                    self._mark_started()
+                    if first:
+                        output_emitter.start_segment(segment_id=utils.shortuuid())
+                        await asyncio.sleep(args.tts_ttfb)
+                        first = False
+                    seconds = len(sentence.token.split()) * SECONDS_PER_WORD
+                    output_emitter.push(bytes(int(24000 * seconds) * 2))
+                if not first:
+                    output_emitter.end_input()
+            finally:
+                await utils.aio.cancel_and_wait(forwarding)
+
+    class StubTTS(tts.TTS):
+        def __init__(self):
+            super().__init__(capabilities=tts.TTSCapabilities(streaming=True), sample_rate=24000, num_channels=1)
+
+        def synthesize(self, text, *, conn_options=APIConnectOptions()):
+            raise NotImplementedError("the stub only streams")
+
+        def stream(self, *, conn_options=APIConnectOptions()):
+            return StubSynthesizeStream(tts=self, conn_options=conn_options)
+
+    return SimpleNamespace(ScriptedMicrophone=ScriptedMicrophone, Speaker=Speaker, StubVAD=StubVAD,
+                           StubSTT=StubSTT, StubLLM=StubLLM, StubTTS=StubTTS, phrases=phrases)
+
+
+def speculative_replies() -> dict:
+    from app.core.metrics import VOICE_SPECULATIVE_REPLIES
+
+    counts = {}
+    for metric in VOICE_SPECULATIVE_REPLIES.collect():
+        for sample in metric.samples:
+            if sample.name.endswith("_total"):
+                counts[sample.labels["result"]] = sample.value
+    return counts
+
+
+async def run_call(stubs, low_latency: bool, seed: int, args) -> tuple:
+    from app.core.config import settings
+    from app.services.livekit_process import create_agent, create_session
+
+    vad_silence = settings.VOICE_SPECULATION_SILENCE if low_latency else DEFAULT_VAD_SILENCE
+    llm_client = stubs.StubLLM()
+    session = create_session(stubs.StubSTT(), llm_client, stubs.StubTTS(), stubs.StubVAD(vad_silence),
+                             low_latency=low_latency)
+    agent = create_agent("You are a collections agent.", "bench-room", SimpleNamespace(id=seed),
+                         low_latency=low_latency)
+
+    @session.on("conversation_item_added")
+    def on_conversation_item_added(event):
+        # The entrypoint's transcript, log and live event work, see record_turn
+        agent.effects.run(time.sleep, args.bookkeeping_ms / 1000)
+
+    microphone, speaker = stubs.ScriptedMicrophone(), stubs.Speaker()
+    session.input.audio = microphone
+    session.output.audio = speaker
+    await session.start(agent)
+
+    rng = random.Random(seed)
+    latencies, missed = [], 0
+    try:
+        for turn in range(args.turns):
+            line = rng.randrange(len(stubs.phrases) - 1)
+            speaker.expect()
+            if rng.random() < args.hesitations:
+                microphone.say(len(stubs.phrases) - 1)
+                await asyncio.sleep(len(HESITATION.split()) * SECONDS_PER_WORD)
+                microphone.stop()
+                await asyncio.sleep(args.pause)
+            microphone.say(line)
+            await asyncio.sleep(len(stubs.phrases[line].split()) * SECONDS_PER_WORD)
+            microphone.stop()
+            ended = time.perf_counter()
+            try:
+                first_audio = await asyncio.wait_for(asyncio.shield(speaker.first_frame), 10)
+            except asyncio.TimeoutError:
+                missed += 1
+                continue
+            latencies.append(first_audio - ended)
+            await speaker.finished.wait()
+            await asyncio.sleep(args.gap)
+    finally:
+        await session.aclose()
+    return latencies, missed, llm_client.requests
+
+
+async def run_mode(stubs, low_latency: bool, args) -> None:
+    before = speculative_replies()
+    results = await asyncio.gather(*(run_call(stubs, low_latency, seed, args) for seed in range(args.calls)))
+    latencies = [latency for call, _, _ in results for latency in call]
+    missed = sum(call_missed for _, call_missed, _ in results)
+    requests = sum(call_requests for _, _, call_requests in results)
+    turns = args.calls * args.turns
+    after = speculative_replies()
+
+    name = "low-latency" if low_latency else "default"
+    q = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else [latencies[0]] * 99
+    print(f"{name:<12} end of speech -> first audio p50={q[49] * 1000:.0f}ms p95={q[94] * 1000:.0f}ms "
+          f"({len(latencies)} turns, {missed} without a reply)")
+    print(f"{'':<12} LLM requests per turn {requests / turns:.2f}", end="")
+    if low_latency:
+        used = after.get("used", 0) - before.get("used", 0)
+        discarded = after.get("discarded", 0) - before.get("discarded", 0)
+        print(f", speculative replies used {used:.0f}, discarded {discarded:.0f}", end="")
+    print()
+
+
+async def run(args) -> None:
+    stubs = build(args)
+    for low_latency in (False, True):
+        await run_mode(stubs, low_latency, args)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=20, help="callee turns per call")
+    parser.add_argument("--calls", type=int, default=1, help="concurrent calls per mode")
+    parser.add_argument("--stt", type=float, default=0.25, help="STT seconds per utterance")
+    parser.add_argument("--llm-ttft", type=float, default=0.35, help="LLM seconds to the first token")
+    parser.add_argument("--llm-rate", type=float, default=60.0, help="LLM tokens per second after the first")
+    parser.add_argument("--tts-ttfb", type=float, default=0.15, help="TTS seconds to the first audio")
+    parser.add_argument("--hesitations", type=float, default=0.3, help="fraction of turns with a pause")
+    parser.add_argument("--pause", type=float, default=0.4,
+                        help="seconds of the pause; a turn's silence is longer")
+    parser.add_argument("--gap", type=float, default=0.5, help="seconds before the callee answers")
+    parser.add_argument("--bookkeeping-ms", type=float, default=2.0,
+                        help="event loop time spent per transcript item")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ.update({
+            "DATABASE_BACKEND": "sqlite",
+            "SQLITE_PATH": os.path.join(tmp, "unused.db"),
+            "LOG_LEVEL": "WARNING",
+        })
+        os.environ.pop("SQLALCHEMY_DATABASE_URI", None)
+        os.environ.pop("PROMETHEUS_MULTIPROC_DIR", None)
+        asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
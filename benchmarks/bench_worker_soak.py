@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Worker soak test: how per-call latency degrades as concurrent calls rise.
+
+Runs `--levels` of concurrent fake calls on one event loop, as calls share a
+worker process. Every fake call burns `--frame-cpu` ms of CPU per 20 ms audio
+frame, the way VAD and audio resampling do. Each call also runs turns that wait
+on fake STT, LLM and TTS latencies. For each level the test reports:
+  - turn latency: user end-of-speech to first agent audio, and the part of it
+    that is added on top of the provider latencies
+  - event-loop lag, as a call's job process measures it, and host CPU
+  - the load WorkerLoad would report to LiveKit from CPU alone, and whether
+    the worker would still be accepting jobs (load < 1.0)
+
+Run with: python benchmarks/bench_worker_soak.py --levels 25,50,100,200,400 --duration 10
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+FRAME = 0.02  # seconds of audio per frame
+
+
+def burn(ms: float) -> None:
+    deadline = time.perf_counter() + ms / 1000
+    while time.perf_counter() < deadline:
+        pass
+
+
+async def audio_frames(args, stop: asyncio.Event) -> None:
+    loop = asyncio.get_running_loop()
+    next_frame = loop.time()
+    while not stop.is_set():
+        burn(args.frame_cpu)
+        next_frame += FRAME
+        await asyncio.sleep(max(0.0, next_frame - loop.time()))
+
+
+async def fake_call(args, stop: asyncio.Event, latencies: list, added: list) -> None:
+    frames = asyncio.create_task(audio_frames(args, stop))
+    provider_latency = args.stt + args.llm_ttft + args.tts_ttfb
+    # Spread call starts so turns do not line up
+    await asyncio.sleep(random.uniform(0, args.think))
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(args.stt)
+        burn(args.turn_cpu)
+        await asyncio.sleep(args.llm_ttft)
+        await asyncio.sleep(args.tts_ttfb)
+        latency = time.perf_counter() - started
+        latencies.append(latency)
+        added.append(latency - provider_latency)
+        await asyncio.sleep(random.uniform(0.5, 1.5) * args.think)
+    frames.cancel()
+
+
+async def run_level(calls: int, args, load) -> None:
+    from app.services.worker_load import LoopLagMonitor
+
+    lag_monitor = LoopLagMonitor()
+    lag_monitor.start()
+    stop = asyncio.Event()
+    latencies, added = [], []
+    tasks = [asyncio.create_task(fake_call(args, stop, latencies, added)) for _ in range(calls)]
+
+    # Sample CPU off the loop while the level runs
+    await asyncio.sleep(args.duration / 2)
+    cpu = await asyncio.get_running_loop().run_in_executor(None, load._cpu_monitor.cpu_percent, 0.5)
+    lag = lag_monitor.lag
+    await asyncio.sleep(max(0.0, args.duration / 2 - 0.5))
+    stop.set()
+    await asyncio.gather(*tasks)
+    lag_monitor.stop()
+
+    reported = load.compute(calls, cpu)
+    if not latencies:
+        print(f"{calls:>5} calls: no turns completed")
+        return
+    q = statistics.quantiles(latencies, n=100)
+    q_added = statistics.quantiles(added, n=100) if len(added) > 1 else [added[0]] * 99
+    print(f"{calls:>5} calls: turns={len(latencies):>6}  latency p50={q[49] * 1000:6.0f}ms "
+          f"p95={q[94] * 1000:6.0f}ms p99={q[98] * 1000:6.0f}ms  added p95={q_added[94] * 1000:6.0f}ms  "
+          f"lag={lag * 1000:6.1f}ms cpu={cpu:4.0%}  load={reported:.2f} "
+          f"{'accepting' if reported < 1.0 else 'FULL'}")
+
+
+async def run(args) -> None:
+    from app.services.worker_load import WorkerLoad
+
+    # Job slots are left out so the report shows where CPU and lag alone would stop the worker
+    load = WorkerLoad(max_jobs=10 ** 9)
+    print(f"provider latency per turn: {(args.stt + args.llm_ttft + args.tts_ttfb) * 1000:.0f}ms, "
+          f"cpu limit {load.cpu_limit:.0%}")
+    for calls in (int(level) for level in args.levels.split(",")):
+        await run_level(calls, args, load)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--levels", default="25,50,100,200,400")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per level")
+    parser.add_argument("--frame-cpu", type=float, default=0.1, help="ms of CPU per 20ms audio frame per call")
+    parser.add_argument("--turn-cpu", type=float, default=2.0, help="ms of CPU per turn")
+    parser.add_argument("--think", type=float, default=2.0, help="seconds between turns")
+    parser.add_argument("--stt", type=float, default=0.3)
+    parser.add_argument("--llm-ttft", type=float, default=0.25)
+    parser.add_argument("--tts-ttfb", type=float, default=0.15)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DATABASE_BACKEND"] = "sqlite"
+        os.environ["SQLITE_PATH"] = os.path.join(tmp, "bench.db")
+        os.environ.pop("SQLALCHEMY_DATABASE_URI", None)
+        asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+"""
+Local stand-ins for LiveKit and the voice providers, for offline benchmarks.
+
+  - FakeLiveKitServer: an aiohttp server on 127.0.0.1 that answers the Twirp
+    CreateDispatch and CreateSIPParticipant routes, so the real DispatchClient
+    and livekit-api SIP client are exercised over HTTP
+  - FakeJobContext / run_job: the parts of JobContext the entrypoint uses, with
+    shutdown callbacks run the way the job process runs them
+  - FakeProvider: canned STT/LLM/TTS with a fixed latency and seeded jitter
+  - FakeAgentSession: stands in for AgentSession and plays a CallScript: the
+    callee's turns, the agent's replies paced by the fake providers, the
+    pipeline's metrics and state events, and the hang-up
+
+Nothing here opens a connection outside the machine.
+"""
+
+import asyncio
+import itertools
+import json
+import random
+import time
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from aiohttp import web
+from livekit import api, rtc
+from livekit.agents.metrics import EOUMetrics, LLMMetrics, TTSMetrics
+
+API_KEY = "bench-key"
+API_SECRET = "bench-secret-bench-secret-bench-secret"
+
+USER_LINES = [
+    "I can pay half of it next week",
+    "I already made the payment on Monday",
+    "I lost my job and cannot pay right now",
+    "can we talk about a settlement",
+    "I will transfer the money tonight",
+]
+AGENT_LINES = [
+    "this is a reminder about your outstanding balance",
+    "can you confirm the date of the payment",
+    "we can offer a payment plan in three installments",
+    "thank you for your time today",
+]
+
+
+@dataclass
+class CallScript:
+    """How one simulated call plays out.
+
+    `sip_status` is None for a call that is answered after `ring` seconds;
+    otherwise the dial fails with that SIP code. `hangup` is who ends an
+    answered call: "callee", "agent" or "dropped" (the callee's leg fails).
+    """
+
+    ring: float
+    sip_status: Optional[int] = None
+    turns: int = 0
+    user_speech: float = 1.0
+    agent_speech: float = 1.5
+    hangup: str = "callee"
+
+
+class FakeLiveKitServer:
+    """Answers the LiveKit server APIs the backend calls.
+
+    `on_dispatch(room, metadata)` is called for every dispatch, as LiveKit
+    would assign the job to a worker. `script_for(room)` says how the SIP
+    call to that room goes; the request is held for the ring time.
+    """
+
+    def __init__(self, on_dispatch: Callable[[str, dict], None], script_for: Callable[[str], CallScript]):
+        self.on_dispatch = on_dispatch
+        self.script_for = script_for
+        self.dial_times: Dict[str, float] = {}
+        self._runner: Optional[web.AppRunner] = None
+        self.url = ""
+
+    async def start(self, port: int = 0) -> str:
+        app = web.Application()
+        app.router.add_post("/twirp/livekit.AgentDispatchService/CreateDispatch", self._create_dispatch)
+        app.router.add_post("/twirp/livekit.SIP/CreateSIPParticipant", self._create_sip_participant)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}"
+        return self.url
+
+    async def aclose(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    async def _create_dispatch(self, request: web.Request) -> web.Response:
+        req = api.CreateAgentDispatchRequest.FromString(await request.read())
+        self.on_dispatch(req.room, json.loads(req.metadata))
+        body = api.AgentDispatch(id=f"AD_{req.room}", agent_name=req.agent_name, room=req.room)
+        return web.Response(body=body.SerializeToString(), content_type="application/protobuf")
+
+    async def _create_sip_participant(self, request: web.Request) -> web.Response:
+        req = api.CreateSIPParticipantRequest.FromString(await request.read())
+        self.dial_times[req.room_name] = time.perf_counter()
+        script = self.script_for(req.room_name)
+        await asyncio.sleep(script.ring)
+        if script.sip_status is not None:
+            return web.json_response(
+                {"code": "unavailable", "msg": f"sip status: {script.sip_status}",
+                 "meta": {"sip_status_code": str(script.sip_status)}},
+                status=503,
+            )
+        body = api.SIPParticipantInfo(participant_id=f"PA_{req.room_name}",
+                                      participant_identity=req.participant_identity, room_name=req.room_name)
+        return web.Response(body=body.SerializeToString(), content_type="application/protobuf")
+
+
+class FakeRoom:
+    def __init__(self, name: str, script: CallScript, callee_identity: str = "callee"):
+        self.name = name
+        self.script = script
+        self.callee_identity = callee_identity
+        self.job: Optional["FakeJobContext"] = None
+        self._handlers: Dict[str, List[Callable]] = {}
+
+    def on(self, event: str, callback: Optional[Callable] = None):
+        def register(fn: Callable) -> Callable:
+            self._handlers.setdefault(event, []).append(fn)
+            return fn
+        return register(callback) if callback else register
+
+    def emit(self, event: str, *args) -> None:
+        for fn in self._handlers.get(event, []):
+            fn(*args)
+
+
+class FakeJobContext:
+    """The subset of livekit.agents.JobContext used by the entrypoint."""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, room: FakeRoom, metadata: dict, lkapi: api.LiveKitAPI, userdata: Optional[dict] = None):
+        self.room = room
+        room.job = self
+        self.job = SimpleNamespace(id=f"AJ_{next(self._ids)}", metadata=json.dumps(metadata))
+        self.proc = SimpleNamespace(userdata=userdata if userdata is not None else {})
+        self.api = lkapi
+        self.shutdown_reason: Optional[str] = None
+        self._shutdown = asyncio.Event()
+        self._callbacks: List[Callable[[], Awaitable[None]]] = []
+
+    async def connect(self) -> None:
+        pass
+
+    def add_shutdown_callback(self, callback: Callable[[], Awaitable[None]]) -> None:
+        self._callbacks.append(callback)
+
+    def shutdown(self, reason: str = "") -> None:
+        if not self._shutdown.is_set():
+            self.shutdown_reason = reason
+            self._shutdown.set()
+
+
+async def run_job(entrypoint: Callable, ctx: FakeJobContext) -> float:
+    """Run a job the way the job process does: the entrypoint, then, once the job
+    is shut down, every shutdown callback concurrently. Returns the time the
+    callbacks took."""
+    await entrypoint(ctx)
+    await ctx._shutdown.wait()
+    started = time.perf_counter()
+    await asyncio.gather(*(callback() for callback in ctx._callbacks))
+    return time.perf_counter() - started
+
+
+class FakeProvider:
+    """A canned STT, LLM or TTS client: every request takes `latency` seconds,
+    plus up to `jitter` more drawn from `rng`."""
+
+    def __init__(self, latency: float, jitter: float = 0.0, rng: Optional[random.Random] = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.rng = rng or random.Random(0)
+
+    def prewarm(self) -> None:
+        pass
+
+    async def request(self) -> float:
+        delay = self.latency + self.rng.uniform(0, self.jitter)
+        await asyncio.sleep(delay)
+        return delay
+
+
+class FakeAgentSession:
+    """Plays the room's CallScript through the same events AgentSession emits.
+
+    Each turn the callee speaks for `user_speech` seconds; after the STT, LLM
+    and TTS providers' latencies the agent speaks for `agent_speech` seconds.
+    The EOU, LLM and TTS metrics of each reply carry the measured spans.
+    """
+
+    _requests = itertools.count(1)
+
+    def __init__(self, stt: FakeProvider, llm: FakeProvider, tts: FakeProvider, **options):
+        self.stt = stt
+        self.llm = llm
+        self.tts = tts
+        self._handlers: Dict[str, List[Callable]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def on(self, event: str, callback: Optional[Callable] = None):
+        def register(fn: Callable) -> Callable:
+            self._handlers.setdefault(event, []).append(fn)
+            return fn
+        return register(callback) if callback else register
+
+    def _emit(self, event: str, **fields) -> None:
+        for fn in self._handlers.get(event, []):
+            fn(SimpleNamespace(**fields))
+
+    def _item(self, role: str, text: str) -> None:
+        self._emit("conversation_item_added", item=SimpleNamespace(role=role, text_content=text))
+
+    async def start(self, agent, room: FakeRoom) -> None:
+        self._task = asyncio.create_task(self._play(room), name=f"fake-session-{room.name}")
+
+    async def _play(self, room: FakeRoom) -> None:
+        script = room.script
+        rng = random.Random(room.name)
+        for turn in range(script.turns):
+            speech_id = f"SP_{room.name}_{turn}"
+            self._emit("user_state_changed", old_state="listening", new_state="speaking")
+            await asyncio.sleep(script.user_speech)
+            self._emit("user_state_changed", old_state="speaking", new_state="listening")
+            stt = await self.stt.request()
+            self._emit("metrics_collected", metrics=EOUMetrics(
+                timestamp=time.time(), end_of_utterance_delay=stt, transcription_delay=stt,
+                on_user_turn_completed_delay=0.0, speech_id=speech_id,
+            ))
+            self._item("user", rng.choice(USER_LINES))
+
+            self._emit("agent_state_changed", old_state="listening", new_state="thinking")
+            ttft = await self.llm.request()
+            self._emit("metrics_collected", metrics=LLMMetrics(
+                label="fake", request_id=f"LR_{next(self._requests)}", timestamp=time.time(), duration=ttft,
+                ttft=ttft, cancelled=False, completion_tokens=24, prompt_tokens=400, prompt_cached_tokens=0,
+                total_tokens=424, tokens_per_second=24 / ttft if ttft else 0.0, speech_id=speech_id,
+            ))
+            ttfb = await self.tts.request()
+            self._emit("metrics_collected", metrics=TTSMetrics(
+                label="fake", request_id=f"TR_{next(self._requests)}", timestamp=time.time(), ttfb=ttfb,
+                duration=ttfb, audio_duration=script.agent_speech, cancelled=False, characters_count=60,
+                streamed=True, speech_id=speech_id,
+            ))
+            self._emit("agent_state_changed", old_state="thinking", new_state="speaking")
+            await asyncio.sleep(script.agent_speech)
+            self._item("assistant", rng.choice(AGENT_LINES))
+            self._emit("agent_state_changed", old_state="speaking", new_state="listening")
+
+        if script.hangup == "agent":
+            room.job.shutdown(reason="agent hung up")
+            return
+        reason = (rtc.DisconnectReason.SIP_TRUNK_FAILURE if script.hangup == "dropped"
+                  else rtc.DisconnectReason.CLIENT_INITIATED)
+        room.emit("participant_disconnected", SimpleNamespace(identity=room.callee_identity,
+                                                                disconnect_reason=reason))
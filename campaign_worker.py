@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Campaign Worker
+This script dials campaign contacts, dispatching them to the LiveKit worker at
+each campaign's configured rate and within its calling window.
+Run this script with: python campaign_worker.py
+"""
+
+import asyncio
+import logging
+import signal
+
+from app.core.logging import setup_logging
+from app.services.campaign_scheduler import CampaignScheduler
+from app.services.dispatch_client import DispatchClient
+
+logger = logging.getLogger(__name__)
+
+async def main():
+    dispatch_client = DispatchClient()
+    await dispatch_client.start()
+    scheduler = CampaignScheduler(dispatch_client)
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, scheduler.stop)
+    logger.info("Campaign worker running, ticking every %ss", scheduler.tick_interval)
+    try:
+        await scheduler.run()
+    finally:
+        await dispatch_client.aclose()
+
+if __name__ == "__main__":
+    setup_logging("campaign-worker")
+    asyncio.run(main())
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Transcript compaction backfill
+This script compacts the call_history rows of every call that ended before the
+cutoff into call_transcripts, batch by batch, until none are left. The summary
+worker does the same continuously for new calls; run this once after upgrading
+to compact existing data without waiting for it.
+Run this script with: python compact_transcripts.py --after 3600
+"""
+
+import argparse
+import asyncio
+import logging
+from datetime import datetime, timezone
+
+from app.core.config import settings
+from app.core.logging import setup_logging
+from app.services.transcript_compactor import TranscriptCompactor
+
+logger = logging.getLogger(__name__)
+
+async def main(args):
+    compactor = TranscriptCompactor(compact_after=args.after, batch_size=args.batch_size)
+    cutoff = datetime.now(timezone.utc)
+    total = 0
+    while True:
+        # A fixed cutoff, so calls ending while this runs are left to the summary worker
+        compacted = await compactor.run_once(now=cutoff)
+        if not compacted:
+            break
+        total += compacted
+        logger.info("Compacted %d calls so far", total)
+    logger.info("Done: compacted the transcripts of %d calls", total)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compact the transcripts of ended calls")
+    parser.add_argument("--after", type=float, default=settings.TRANSCRIPT_COMPACT_AFTER,
+                        help="only calls that ended at least this many seconds ago")
+    parser.add_argument("--batch-size", type=int, default=500)
+    setup_logging("compact-transcripts")
+    asyncio.run(main(parser.parse_args()))
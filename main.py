@@ -1,14 +1,40 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
+from app.core.logging import setup_logging
 from app.api.api_v1.api import api_router
-from app.models.base import init_db
+from app.core.metrics import render_latest
+from app.services.dispatch_client import DispatchClient
+from app.services.events import EventRelayServer, get_event_hub
 
-init_db()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Startup work lives here rather than at import, so importing the app (and
+    # every --reload) stays cheap. The schema is migrated by migrate.py, not by
+    # each API replica, unless MIGRATE_ON_STARTUP is set
+    setup_logging("api")
+    if settings.MIGRATE_ON_STARTUP:
+        from app.db.init_db import init_database
+
+        await asyncio.to_thread(init_database)
+    # One pooled LiveKit client for the lifetime of the process
+    app.state.dispatch_client = DispatchClient()
+    await app.state.dispatch_client.start()
+    # Receive live call events from the LiveKit worker processes
+    relay = EventRelayServer(get_event_hub()) if settings.EVENTS_BROKER == "socket" else None
+    if relay:
+        await relay.start()
+    yield
+    if relay:
+        await relay.aclose()
+    await app.state.dispatch_client.aclose()
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     openapi_url="/openapi.json",
+    lifespan=lifespan,
 )
 
 # Set up CORS middleware
@@ -23,3 +49,7 @@ app.add_middleware(
 # Include API router
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    data, content_type = render_latest()
+    return Response(content=data, media_type=content_type)
@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+"""
+Database migrations
+This script brings the database schema up to date with Alembic. Run it once per
+deploy, before starting the API and the workers; they no longer create or
+migrate the schema themselves.
+Run this script with: python migrate.py
+"""
+
+import logging
+
+from app.core.logging import setup_logging
+from app.db.init_db import init_database
+
+logger = logging.getLogger(__name__)
+
+if __name__ == "__main__":
+    setup_logging("migrate")
+    init_database()
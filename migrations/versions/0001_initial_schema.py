@@ -0,0 +1,54 @@
+"""initial schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "agents",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("prompt", sa.Text(), nullable=False),
+        sa.Column("agent_type", sa.String(100), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+    )
+    op.create_table(
+        "calls",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("defaulter_name", sa.String(255)),
+        sa.Column("phone_number", sa.String(20)),
+        sa.Column("agent_id", sa.Integer(), sa.ForeignKey("agents.id"), nullable=False),
+        sa.Column("duration", sa.Float()),
+        sa.Column("outcome", sa.Text()),
+        sa.Column("summary", sa.Text()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+    )
+    op.create_table(
+        "call_history",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("call_id", sa.Integer(), sa.ForeignKey("calls.id")),
+        sa.Column("role", sa.String(50)),
+        sa.Column("message", sa.Text()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("call_history")
+    op.drop_table("calls")
+    op.drop_table("agents")
@@ -0,0 +1,30 @@
+"""indexes for hot query columns
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 00:00:00
+
+"""
+from alembic import op
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_call_history_call_id_created_at", "call_history", ["call_id", "created_at"])
+    op.create_index("ix_calls_agent_id_created_at", "calls", ["agent_id", "created_at"])
+    op.create_index("ix_calls_agent_id_id", "calls", ["agent_id", "id"])
+    op.create_index("ix_calls_created_at", "calls", ["created_at"])
+    op.create_index("ix_calls_phone_number", "calls", ["phone_number"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_calls_phone_number", table_name="calls")
+    op.drop_index("ix_calls_created_at", table_name="calls")
+    op.drop_index("ix_calls_agent_id_id", table_name="calls")
+    op.drop_index("ix_calls_agent_id_created_at", table_name="calls")
+    op.drop_index("ix_call_history_call_id_created_at", table_name="call_history")
@@ -0,0 +1,43 @@
+"""summary job queue
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("calls") as batch_op:
+        batch_op.add_column(sa.Column("summary_status", sa.String(20)))
+    # Calls summarized before the queue existed must not be queued again
+    op.execute("UPDATE calls SET summary_status = 'done' WHERE summary IS NOT NULL")
+
+    op.create_table(
+        "summary_jobs",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("call_id", sa.Integer(), sa.ForeignKey("calls.id"), nullable=False, unique=True),
+        sa.Column("status", sa.String(20), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("next_attempt_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("locked_at", sa.DateTime(timezone=True)),
+        sa.Column("last_error", sa.Text()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+    )
+    op.create_index("ix_summary_jobs_status_next_attempt_at", "summary_jobs", ["status", "next_attempt_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_summary_jobs_status_next_attempt_at", table_name="summary_jobs")
+    op.drop_table("summary_jobs")
+    with op.batch_alter_table("calls") as batch_op:
+        batch_op.drop_column("summary_status")
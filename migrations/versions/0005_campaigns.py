@@ -0,0 +1,66 @@
+"""campaigns and campaign contacts
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "campaigns",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("agent_id", sa.Integer(), sa.ForeignKey("agents.id"), nullable=False),
+        sa.Column("status", sa.String(20), nullable=False),
+        sa.Column("trunk_id", sa.String(100)),
+        sa.Column("rate_per_second", sa.Float(), nullable=False),
+        sa.Column("max_concurrent", sa.Integer(), nullable=False),
+        sa.Column("window_start", sa.String(5), nullable=False),
+        sa.Column("window_end", sa.String(5), nullable=False),
+        sa.Column("timezone", sa.String(64), nullable=False),
+        sa.Column("max_attempts", sa.Integer(), nullable=False),
+        sa.Column("retry_delay_seconds", sa.Integer(), nullable=False),
+        sa.Column("retry_outcomes", sa.String(255), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+    )
+    op.create_table(
+        "campaign_contacts",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("campaign_id", sa.Integer(), sa.ForeignKey("campaigns.id"), nullable=False),
+        sa.Column("phone_number", sa.String(20), nullable=False),
+        sa.Column("defaulter_name", sa.String(255)),
+        sa.Column("status", sa.String(20), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("next_attempt_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("dialed_at", sa.DateTime(timezone=True)),
+        sa.Column("last_outcome", sa.String(50)),
+        sa.Column("last_error", sa.Text()),
+        sa.Column("call_id", sa.Integer(), sa.ForeignKey("calls.id")),
+        sa.Column("room_name", sa.String(100)),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+    )
+    op.create_index(
+        "ix_campaign_contacts_campaign_id_status_next_attempt_at",
+        "campaign_contacts",
+        ["campaign_id", "status", "next_attempt_at"],
+    )
+    op.create_index("ix_campaign_contacts_status_dialed_at", "campaign_contacts", ["status", "dialed_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_campaign_contacts_status_dialed_at", table_name="campaign_contacts")
+    op.drop_index("ix_campaign_contacts_campaign_id_status_next_attempt_at", table_name="campaign_contacts")
+    op.drop_table("campaign_contacts")
+    op.drop_table("campaigns")
@@ -0,0 +1,29 @@
+"""per-turn latency columns on call history
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+LATENCY_COLUMNS = ("eou_delay", "stt_delay", "llm_ttft", "tts_ttfb", "response_latency")
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("call_history") as batch_op:
+        for name in LATENCY_COLUMNS:
+            batch_op.add_column(sa.Column(name, sa.Float()))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("call_history") as batch_op:
+        for name in reversed(LATENCY_COLUMNS):
+            batch_op.drop_column(name)
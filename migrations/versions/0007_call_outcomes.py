@@ -0,0 +1,132 @@
+"""call timing, outcome classification and per-agent daily stats
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+calls = sa.table(
+    "calls",
+    sa.column("id", sa.Integer),
+    sa.column("agent_id", sa.Integer),
+    sa.column("duration", sa.Float),
+    sa.column("outcome", sa.Text),
+    sa.column("answered_at", sa.DateTime(timezone=True)),
+    sa.column("ended_at", sa.DateTime(timezone=True)),
+    sa.column("created_at", sa.DateTime(timezone=True)),
+    sa.column("updated_at", sa.DateTime(timezone=True)),
+)
+
+call_history = sa.table(
+    "call_history",
+    sa.column("call_id", sa.Integer),
+    sa.column("created_at", sa.DateTime(timezone=True)),
+)
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("calls") as batch_op:
+        batch_op.add_column(sa.Column("answered_at", sa.DateTime(timezone=True)))
+        batch_op.add_column(sa.Column("ended_at", sa.DateTime(timezone=True)))
+        batch_op.add_column(sa.Column("sip_status", sa.Integer()))
+        batch_op.add_column(sa.Column("disconnect_reason", sa.String(50)))
+
+    stats = op.create_table(
+        "agent_daily_stats",
+        sa.Column("agent_id", sa.Integer(), sa.ForeignKey("agents.id"), primary_key=True),
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("calls", sa.Integer(), nullable=False),
+        sa.Column("answered", sa.Integer(), nullable=False),
+        sa.Column("completed", sa.Integer(), nullable=False),
+        sa.Column("no_answer", sa.Integer(), nullable=False),
+        sa.Column("busy", sa.Integer(), nullable=False),
+        sa.Column("dropped", sa.Integer(), nullable=False),
+        sa.Column("failed", sa.Integer(), nullable=False),
+        sa.Column("talk_seconds", sa.Float(), nullable=False),
+        sa.Column("ring_seconds", sa.Float(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+
+    # Earlier workers stored the first-to-last message span in minutes, with outcome "Completed"
+    op.execute(
+        calls.update()
+        .where(calls.c.outcome == "Completed")
+        .values(outcome="completed", duration=calls.c.duration * 60)
+    )
+
+    # Every call made so far has ended; without an end time the reconciler would close them again.
+    # Calls with a transcript were answered around their first turn (the agent's greeting)
+    # and ended around their last one.
+    first_turn = (
+        sa.select(sa.func.min(call_history.c.created_at))
+        .where(call_history.c.call_id == calls.c.id)
+        .scalar_subquery()
+    )
+    last_turn = (
+        sa.select(sa.func.max(call_history.c.created_at))
+        .where(call_history.c.call_id == calls.c.id)
+        .scalar_subquery()
+    )
+    op.execute(
+        calls.update()
+        .where(calls.c.outcome == "completed")
+        .values(answered_at=sa.func.coalesce(first_turn, calls.c.created_at))
+    )
+    op.execute(
+        calls.update()
+        .where(calls.c.answered_at.is_(None))
+        .values(answered_at=first_turn)
+    )
+    op.execute(
+        calls.update()
+        .where(calls.c.ended_at.is_(None))
+        .values(ended_at=sa.func.coalesce(last_turn, calls.c.updated_at, calls.c.created_at))
+    )
+
+    # Seed the stats with the calls made so far; only completed calls were ever recorded
+    day = sa.func.date(calls.c.created_at)
+    completed = sa.func.sum(sa.case((calls.c.outcome == "completed", 1), else_=0))
+    op.execute(
+        stats.insert().from_select(
+            ["agent_id", "day", "calls", "answered", "completed", "no_answer", "busy", "dropped", "failed",
+             "talk_seconds", "ring_seconds"],
+            sa.select(
+                calls.c.agent_id,
+                day,
+                sa.func.count(),
+                completed,
+                completed,
+                sa.literal(0),
+                sa.literal(0),
+                sa.literal(0),
+                sa.literal(0),
+                sa.func.coalesce(sa.func.sum(calls.c.duration), 0.0),
+                sa.literal(0.0),
+            )
+            .where(calls.c.created_at.is_not(None))
+            .group_by(calls.c.agent_id, day),
+        )
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("agent_daily_stats")
+    op.execute(
+        calls.update()
+        .where(calls.c.outcome == "completed")
+        .values(outcome="Completed", duration=calls.c.duration / 60)
+    )
+    with op.batch_alter_table("calls") as batch_op:
+        batch_op.drop_column("disconnect_reason")
+        batch_op.drop_column("sip_status")
+        batch_op.drop_column("ended_at")
+        batch_op.drop_column("answered_at")
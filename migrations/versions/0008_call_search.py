@@ -0,0 +1,51 @@
+"""full-text search index over transcripts, summaries and names
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 00:00:00
+
+"""
+from alembic import op
+
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+# Fill the index with what is already stored
+BACKFILL = (
+    "INSERT INTO call_search (call_id, source, body) "
+    "SELECT call_id, role, message FROM call_history WHERE call_id IS NOT NULL AND message <> ''",
+    "INSERT INTO call_search (call_id, source, body) "
+    "SELECT id, 'summary', summary FROM calls WHERE summary IS NOT NULL AND summary <> ''",
+    "INSERT INTO call_search (call_id, source, body) "
+    "SELECT id, 'name', defaulter_name FROM calls WHERE defaulter_name IS NOT NULL AND defaulter_name <> ''",
+)
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("""
+            CREATE TABLE call_search (
+                id BIGSERIAL PRIMARY KEY,
+                call_id INTEGER NOT NULL REFERENCES calls (id),
+                source VARCHAR(20) NOT NULL,
+                body TEXT NOT NULL,
+                tsv TSVECTOR GENERATED ALWAYS AS (to_tsvector('english', body)) STORED
+            )
+        """)
+        op.execute("CREATE INDEX ix_call_search_tsv ON call_search USING GIN (tsv)")
+        op.execute("CREATE INDEX ix_call_search_call_id ON call_search (call_id)")
+    else:
+        # body is column 0, which snippet() highlights
+        op.execute(
+            "CREATE VIRTUAL TABLE call_search USING fts5("
+            "body, call_id UNINDEXED, source UNINDEXED, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+    for statement in BACKFILL:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE call_search")
@@ -0,0 +1,27 @@
+"""updated_at on every row and watermark indexes for exports
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18 00:00:00
+
+"""
+from alembic import op
+
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # updated_at used to be set only on update; rows never updated get their creation time
+    op.execute("UPDATE calls SET updated_at = created_at WHERE updated_at IS NULL")
+    op.execute("UPDATE call_history SET updated_at = created_at WHERE updated_at IS NULL")
+    op.create_index("ix_calls_updated_at_id", "calls", ["updated_at", "id"])
+    op.create_index("ix_call_history_updated_at_id", "call_history", ["updated_at", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_call_history_updated_at_id", table_name="call_history")
+    op.drop_index("ix_calls_updated_at_id", table_name="calls")
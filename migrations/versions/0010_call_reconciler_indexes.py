@@ -0,0 +1,30 @@
+"""partial indexes for the call finalization reconciler
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-18 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0010"
+down_revision = "0009"
+branch_labels = None
+depends_on = None
+
+OPEN = "ended_at IS NULL"
+UNSUMMARIZED = "summary_status IS NULL AND answered_at IS NOT NULL"
+
+
+def upgrade() -> None:
+    op.create_index("ix_calls_open_created_at", "calls", ["created_at"],
+                    sqlite_where=sa.text(OPEN), postgresql_where=sa.text(OPEN))
+    op.create_index("ix_calls_unsummarized_ended_at", "calls", ["ended_at"],
+                    sqlite_where=sa.text(UNSUMMARIZED), postgresql_where=sa.text(UNSUMMARIZED))
+
+
+def downgrade() -> None:
+    op.drop_index("ix_calls_unsummarized_ended_at", table_name="calls")
+    op.drop_index("ix_calls_open_created_at", table_name="calls")
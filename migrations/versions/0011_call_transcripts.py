@@ -0,0 +1,41 @@
+"""compacted call transcripts
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-18 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0011"
+down_revision = "0010"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "call_transcripts",
+        sa.Column("call_id", sa.Integer(), sa.ForeignKey("calls.id"), primary_key=True),
+        sa.Column("codec", sa.String(10), nullable=False),
+        sa.Column("turns", sa.Integer(), nullable=False),
+        sa.Column("raw_size", sa.Integer(), nullable=False),
+        sa.Column("data", sa.LargeBinary(), nullable=False),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("turns_updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_call_transcripts_turns_updated_at", "call_transcripts", ["turns_updated_at"])
+    if op.get_bind().dialect.name == "sqlite":
+        # SQLite reuses the highest rowid once it is deleted; compacted turn ids must stay unique
+        with op.batch_alter_table("call_history", recreate="always",
+                                  table_kwargs={"sqlite_autoincrement": True}):
+            pass
+
+
+def downgrade() -> None:
+    # Compacted transcripts are dropped with the table, not moved back to call_history
+    op.drop_index("ix_call_transcripts_turns_updated_at", table_name="call_transcripts")
+    op.drop_table("call_transcripts")
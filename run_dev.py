@@ -1,58 +1,47 @@
 #!/usr/bin/env python3
 """
 Development runner script
-This script runs both the FastAPI server and the LiveKit worker in parallel.
+This script applies database migrations, then runs the FastAPI server (with --reload), the LiveKit worker (in dev
+mode), the summary worker and the campaign worker, restarting any that crash. Ctrl+C stops them all.
+For production use serve.py.
 Run this script with: python run_dev.py
 """
 
+import asyncio
+import logging
+import signal
 import subprocess
 import sys
-import signal
-import time
-from threading import Thread
-
-def run_fastapi():
-    """Run the FastAPI server"""
-    print("🚀 Starting FastAPI server...")
-    subprocess.run([
-        sys.executable, "-m", "uvicorn", 
-        "main:app", 
-        "--port", "8000", 
-        "--reload"
-    ])
-
-def run_worker():
-    """Run the LiveKit worker"""
-    print("🤖 Starting LiveKit worker...")
-    # Give FastAPI a moment to start first
-    time.sleep(2)
-    subprocess.run([sys.executable, "worker.py","dev"])
-
-def signal_handler(sig, frame):
-    """Handle Ctrl+C gracefully"""
-    print("\n🛑 Shutting down...")
-    sys.exit(0)
+
+from app.core.logging import setup_logging
+from app.services.supervisor import ProcessSpec, Supervisor
+
+logger = logging.getLogger(__name__)
+
+PROCESSES = [
+    ProcessSpec(name="api", service="api", argv=[sys.executable, "-m", "uvicorn", "main:app", "--port", "8000",
+                                                 "--reload"]),
+    ProcessSpec(name="worker", service="agent-worker", argv=[sys.executable, "worker.py", "dev"]),
+    ProcessSpec(name="summary-worker", service="summary-worker", argv=[sys.executable, "summary_worker.py"]),
+    ProcessSpec(name="campaign-worker", service="campaign-worker", argv=[sys.executable, "campaign_worker.py"]),
+]
+
+async def main():
+    supervisor = Supervisor(PROCESSES)
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, supervisor.stop)
+    await supervisor.run()
 
 if __name__ == "__main__":
-    # Set up signal handler for graceful shutdown
-    signal.signal(signal.SIGINT, signal_handler)
-    
-    print("🔥 Starting development environment...")
-    print("📡 FastAPI will be available at: http://localhost:8000")
-    print("📄 API docs will be available at: http://localhost:8000/docs")
-    print("🤖 LiveKit worker will connect to your LiveKit server")
-    print("Press Ctrl+C to stop all services\n")
-    
-    # Start both services in separate threads
-    fastapi_thread = Thread(target=run_fastapi, daemon=True)
-    worker_thread = Thread(target=run_worker, daemon=True)
-    
-    fastapi_thread.start()
-    worker_thread.start()
-    
-    try:
-        # Keep main thread alive
-        while True:
-            time.sleep(1)
-    except KeyboardInterrupt:
-        print("\n�� Shutting down...") 
\ No newline at end of file
+    setup_logging("dev")
+    logger.info("Starting development environment")
+    logger.info("FastAPI will be available at: http://localhost:8000")
+    logger.info("API docs will be available at: http://localhost:8000/docs")
+    logger.info("LiveKit worker will connect to your LiveKit server")
+    logger.info("Press Ctrl+C to stop all services")
+
+    # The services expect an up-to-date schema and no longer migrate it themselves
+    subprocess.run([sys.executable, "migrate.py"], check=True)
+
+    asyncio.run(main())
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Production runner
+This script runs the API (several uvicorn processes sharing one listening
+socket), the LiveKit worker processes, the summary worker and the campaign
+worker, and restarts any of them that crash. On SIGTERM or Ctrl+C it stops the
+campaign worker, lets the LiveKit workers finish their calls (up to
+WORKER_DRAIN_TIMEOUT), then stops the API and the summary worker.
+Apply migrations with migrate.py before starting it.
+Run this script with: python serve.py --host 0.0.0.0 --port 8000
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import signal
+import socket
+import sys
+from typing import List
+
+from app.core.config import ROOT_DIR, settings
+from app.core.logging import setup_logging
+from app.services.supervisor import ProcessSpec, Supervisor
+
+logger = logging.getLogger(__name__)
+
+# Stop order: no new calls are dialed while the workers drain, and the API
+# keeps serving (and relaying the draining calls' live events) until they are done
+STOP_CAMPAIGNS, STOP_CALLS, STOP_REST = range(3)
+
+
+def default_process_count() -> int:
+    """API or LiveKit worker processes for this host: a quarter of its cores each,
+    leaving the rest to the workers' job processes, which run the calls."""
+    try:
+        cores = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cores = os.cpu_count() or 1
+    return max(1, cores // 4)
+
+
+def listen(host: str, port: int) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    return socket.create_server((host, port), family=family, backlog=2048)
+
+
+def process_specs(api_processes: int, worker_processes: int, listen_fd: int) -> List[ProcessSpec]:
+    env = {"API_PROCESSES": str(api_processes), "WORKER_PROCESSES": "1"}
+    specs = [
+        ProcessSpec(
+            name=f"api-{index}",
+            service="api",
+            argv=[
+                sys.executable, "-m", "uvicorn", "main:app", "--app-dir", ROOT_DIR, "--fd", str(listen_fd),
+                # Close open event streams early enough for the lifespan shutdown to run before the kill
+                "--timeout-graceful-shutdown", str(int(settings.SUPERVISOR_STOP_TIMEOUT // 2)),
+            ],
+            env={**env, "API_INDEX": str(index)},
+            stop_phase=STOP_REST,
+            pass_fds=(listen_fd,),
+        )
+        for index in range(api_processes)
+    ]
+    specs += [
+        ProcessSpec(
+            name=f"worker-{index}",
+            service="agent-worker",
+            argv=[sys.executable, os.path.join(ROOT_DIR, "worker.py"), "start"],
+            env={**env, "WORKER_INDEX": str(index)},
+            stop_phase=STOP_CALLS,
+            # The drain, then the shutdown hooks of the last calls
+            stop_timeout=settings.WORKER_DRAIN_TIMEOUT + settings.SUPERVISOR_STOP_TIMEOUT,
+        )
+        for index in range(worker_processes)
+    ]
+    specs += [
+        ProcessSpec(name="summary-worker", service="summary-worker",
+                    argv=[sys.executable, os.path.join(ROOT_DIR, "summary_worker.py")],
+                    env=env, stop_phase=STOP_REST),
+        ProcessSpec(name="campaign-worker", service="campaign-worker",
+                    argv=[sys.executable, os.path.join(ROOT_DIR, "campaign_worker.py")],
+                    env=env, stop_phase=STOP_CAMPAIGNS),
+    ]
+    return specs
+
+
+async def main(args):
+    sock = listen(args.host, args.port)
+    supervisor = Supervisor(process_specs(args.api_processes, args.worker_processes, sock.fileno()))
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, supervisor.stop)
+    logger.info("Serving the API on %s:%d with %d processes, %d LiveKit worker processes",
+                args.host, args.port, args.api_processes, args.worker_processes)
+    try:
+        await supervisor.run()
+    finally:
+        sock.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--api-processes", type=int, default=default_process_count())
+    parser.add_argument("--worker-processes", type=int, default=default_process_count(),
+                        help="LiveKit worker processes")
+    args = parser.parse_args()
+
+    setup_logging("supervisor")
+    asyncio.run(main(args))
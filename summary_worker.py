@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Summary Worker
+This script generates call summaries from the summary job queue, separately from
+the LiveKit worker so job teardown never waits on the LLM. It also runs the call
+reconciler, which finalizes calls whose worker shutdown never completed, and the
+transcript compactor, which moves the turns of ended calls out of call_history.
+Run this script with: python summary_worker.py
+"""
+
+import asyncio
+import logging
+import signal
+
+from app.core.logging import setup_logging
+from app.services.call_finalization import CallReconciler
+from app.services.summary_queue import SummaryWorkerPool
+from app.services.transcript_compactor import TranscriptCompactor
+
+logger = logging.getLogger(__name__)
+
+async def main():
+    pool = SummaryWorkerPool()
+    reconciler = CallReconciler()
+    compactor = TranscriptCompactor()
+
+    def stop():
+        pool.stop()
+        reconciler.stop()
+        compactor.stop()
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop)
+    logger.info("Summary worker running with concurrency %d", pool.concurrency)
+    await asyncio.gather(pool.run(), reconciler.run(), compactor.run())
+
+if __name__ == "__main__":
+    setup_logging("summary-worker")
+    asyncio.run(main())
@@ -2,15 +2,69 @@
 """
 LiveKit Agent Worker
 This script runs the LiveKit agent worker separately from the FastAPI application.
+Set WORKER_PROCESSES to run several worker processes on this host; each one
+accepts up to WORKER_MAX_CONCURRENT_CALLS calls and reports its load to LiveKit.
 Run this script with: python worker.py
 """
 
-from app.services.livekit_process import entrypoint
+import logging
+import os
+import signal
+import subprocess
+import sys
+
+from app.core.config import settings
+from app.core.logging import setup_logging
+from app.services.livekit_process import entrypoint, prewarm
+from app.services.worker_load import WorkerLoad
 from livekit.agents import cli, WorkerOptions
 
-if __name__ == "__main__":
-    # Run the LiveKit agent worker
+logger = logging.getLogger(__name__)
+
+def run_worker():
+    load = WorkerLoad()
     cli.run_app(WorkerOptions(
         entrypoint_fnc=entrypoint, 
-        agent_name="groq-call-agent"
-    )) 
\ No newline at end of file
+        prewarm_fnc=prewarm,
+        request_fnc=load.request_fnc,
+        load_fnc=load,
+        # WorkerLoad scales every limit to 1.0
+        load_threshold=1.0,
+        port=settings.WORKER_HTTP_PORT + settings.WORKER_INDEX,
+        # On SIGTERM, stop taking calls and wait this long for the active ones to end and finalize
+        drain_timeout=settings.WORKER_DRAIN_TIMEOUT,
+        # Settings come from .env too; the LiveKit CLI only looks at the environment
+        ws_url=settings.LIVEKIT_URL or "",
+        api_key=settings.LIVEKIT_API_KEY,
+        api_secret=settings.LIVEKIT_API_SECRET,
+        agent_name=settings.LIVEKIT_AGENT_NAME
+    ))
+
+def run_workers(count: int):
+    """Start `count` worker processes with the same arguments and wait for them."""
+    children = [
+        subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), *sys.argv[1:]],
+            env={**os.environ, "WORKER_PROCESSES": "1", "WORKER_INDEX": str(index)},
+        )
+        for index in range(count)
+    ]
+
+    def forward(sig, frame):
+        # Each worker drains its active calls before exiting
+        for child in children:
+            child.send_signal(sig)
+
+    signal.signal(signal.SIGINT, forward)
+    signal.signal(signal.SIGTERM, forward)
+    logger.info("Started %d LiveKit worker processes", count)
+    sys.exit(max(child.wait() for child in children))
+
+if __name__ == "__main__":
+    # The LiveKit CLI installs the log handlers; this adds call context and redaction
+    setup_logging("worker", install_handlers=settings.WORKER_PROCESSES > 1)
+    if settings.WORKER_PROCESSES > 1:
+        run_workers(settings.WORKER_PROCESSES)
+    else:
+        # Run the LiveKit agent worker
+        run_worker()